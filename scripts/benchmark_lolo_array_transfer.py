@@ -0,0 +1,95 @@
+"""
+Compare the array transfer of lolopy with the one of LoloArrayTransfer across matrix sizes.
+
+Run from the repository root:
+    python scripts/benchmark_lolo_array_transfer.py --rows 1000 5000 20000 --features 10 100
+
+Set LOLOPY_JVM_MEMORY (e.g. 4g) to raise the heap of the JVM for larger matrices.
+
+For every matrix size the following median times are printed:
+    send:    send the feature matrix to the JVM
+    receive: get a float64 array with one value per row back from the JVM, as done for predictions
+    predict: predict at most --max-predict-rows rows with the mean and the std, using a forest fitted on 100 rows
+             (larger sets exceed the default heap of the JVM, the app predicts them in chunks)
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+from lolopy.learners import RandomForestRegressor
+from lolopy.utils import send_feature_array, send_1D_array
+from py4j import protocol
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from slamd.discovery.processing.experiment.mlmodel.lolo_array_transfer import LoloArrayTransfer  # noqa: E402
+from slamd.discovery.processing.experiment.mlmodel.slamd_random_forest import SlamdRandomForest  # noqa: E402
+
+PY4J_DECODE = (lambda value, gateway_client: protocol.decode_bytearray(value))
+
+
+def measure(function, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def use_byte_decoding(decode):
+    protocol.OUTPUT_CONVERTER[protocol.BYTES_TYPE] = decode
+
+
+def benchmark_path(name, regressor, send, send_1d, decode, rows, max_predict_rows, repeats):
+    gateway = regressor.gateway
+    data_loader = gateway.jvm.io.citrine.lolo.util.LoloPyDataLoader
+    use_byte_decoding(decode)
+
+    def send_rows():
+        gateway.detach(send(gateway, rows))
+
+    values_java = send_1d(gateway, rows[:, 0])
+    receive_time = measure(lambda: np.frombuffer(data_loader.send1DArray(values_java), 'float'), repeats)
+    gateway.detach(values_java)
+
+    predict_time = measure(lambda: regressor.predict(rows[:max_predict_rows], return_std=True), repeats)
+    return name, measure(send_rows, repeats), receive_time, predict_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--features', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--max-predict-rows', type=int, default=10000)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    print(f'{"rows":>7} {"features":>9} {"path":>8} {"send [s]":>9} {"receive [s]":>12} {"predict [s]":>12}')
+    for n_features in args.features:
+        training_rows = rng.uniform(size=(100, n_features))
+        training_labels = training_rows.sum(axis=1)
+        lolopy_regressor = RandomForestRegressor().fit(training_rows, training_labels, random_seed=42)
+        slamd_regressor = SlamdRandomForest().fit(training_rows, training_labels)
+
+        for n_rows in args.rows:
+            rows = rng.uniform(size=(n_rows, n_features))
+            results = [
+                benchmark_path('lolopy', lolopy_regressor, send_feature_array,
+                               lambda gateway, values: send_1D_array(gateway, values, True), PY4J_DECODE, rows,
+                               args.max_predict_rows, args.repeats),
+                benchmark_path('slamd', slamd_regressor, LoloArrayTransfer.send_feature_array,
+                               LoloArrayTransfer.send_1d_array, LoloArrayTransfer.decode_bytes, rows,
+                               args.max_predict_rows, args.repeats),
+            ]
+            for name, send_time, receive_time, predict_time in results:
+                print(f'{n_rows:>7} {n_features:>9} {name:>8} {send_time:>9.4f} {receive_time:>12.4f} '
+                      f'{predict_time:>12.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Compare the sparse Gaussian process model with the exact one on synthetic data of growing size.
+
+Run from the repository root:
+    python scripts/benchmark_sparse_gaussian_process.py --rows 500 1000 2000 4000 --max-exact-rows 2000
+
+For every size the fit and prediction time, the RMSE on held-out rows and the coverage of the 95% intervals
+(using the predictive std plus the noise std) are printed.
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.gaussian_process.kernels import RBF, ConstantKernel
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from slamd.discovery.processing.experiment.mlmodel.slamd_gaussian_process_regressor import \
+    SlamdGaussianProcessRegressor  # noqa: E402
+from slamd.discovery.processing.experiment.mlmodel.sparse_gaussian_process_regressor import \
+    SparseGaussianProcessRegressor  # noqa: E402
+
+NOISE_STD = 0.1
+
+
+def create_data(n_rows, n_features, rng):
+    rows = rng.uniform(size=(n_rows, n_features))
+    labels = np.sin(3 * rows[:, 0]) + rows[:, 1] ** 2 + 0.5 * rows[:, 2] * rows[:, 3]
+    return rows, labels + rng.normal(0, NOISE_STD, n_rows)
+
+
+def evaluate(regressor, training_rows, training_labels, test_rows, test_labels):
+    start = time.perf_counter()
+    regressor.fit(training_rows, training_labels)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    prediction, std = regressor.predict(test_rows, return_std=True)
+    predict_time = time.perf_counter() - start
+
+    rmse = np.sqrt(np.mean((prediction - test_labels) ** 2))
+    coverage = np.mean(np.abs(prediction - test_labels) <= 1.96 * np.sqrt(std ** 2 + NOISE_STD ** 2))
+    return fit_time, predict_time, rmse, coverage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[500, 1000, 2000, 4000])
+    parser.add_argument('--features', type=int, default=6)
+    parser.add_argument('--test-rows', type=int, default=1000)
+    parser.add_argument('--max-exact-rows', type=int, default=2000,
+                        help='Skip the exact model for larger sizes, its fit grows with the cube of the rows')
+    parser.add_argument('--n-inducing', type=int, default=256)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore', category=ConvergenceWarning)
+    rng = np.random.default_rng(42)
+    test_rows, test_labels = create_data(args.test_rows, args.features, rng)
+
+    print(f'{"rows":>6} {"model":>7} {"fit [s]":>9} {"predict [s]":>12} {"RMSE":>7} {"95% coverage":>13}')
+    for n_rows in args.rows:
+        training_rows, training_labels = create_data(n_rows, args.features, rng)
+        regressors = {'sparse': SparseGaussianProcessRegressor(n_inducing=args.n_inducing, random_state=42)}
+        if n_rows <= args.max_exact_rows:
+            # Same configuration as the Gaussian process model of the MLModelFactory
+            kernel = ConstantKernel(1.0, (1e-3, 1e3)) * RBF(10, (1e-2, 1e2))
+            regressors['exact'] = SlamdGaussianProcessRegressor(kernel=kernel, n_restarts_optimizer=9,
+                                                                random_state=42)
+
+        for name, regressor in regressors.items():
+            fit_time, predict_time, rmse, coverage = evaluate(regressor, training_rows, training_labels, test_rows,
+                                                              test_labels)
+            print(f'{n_rows:>6} {name:>7} {fit_time:>9.2f} {predict_time:>12.3f} {rmse:>7.4f} {coverage:>13.1%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -4,7 +4,9 @@ from flask_wtf import CSRFProtect
 from flask_session import Session
 
 import config
-from slamd.common.error_handling import handle_404, handle_400, handle_413, handle_422, handle_403, handle_408
+from slamd.common.error_handling import handle_404, handle_400, handle_413, handle_422, handle_403, handle_408, \
+    handle_503
+from slamd.common.health_controller import health
 from slamd.common.landing_controller import landing
 from slamd.common.session_backup.session_controller import session_blueprint
 from slamd.formulations.processing.formulations_controller import formulations
@@ -12,6 +14,7 @@ from slamd.discovery.processing.discovery_controller import discovery
 from slamd.materials.processing.base_materials_controller import base_materials
 from slamd.materials.processing.blended_materials_controller import blended_materials
 from slamd.design_assistant.processing.design_assistant_controller import design_assistant
+from slamd.discovery.processing.experiment.mlmodel.lolo_gateway import LOLO_WARM_UP, LoloGateway
 
 def create_app(env=None, with_session=True, template_folder=None, static_folder=None):
     # ✅ Allow template/static override for bundled app
@@ -37,6 +40,7 @@ def create_app(env=None, with_session=True, template_folder=None, static_folder=
 
     # Register blueprints
     app.register_blueprint(landing)
+    app.register_blueprint(health)
     app.register_blueprint(session_blueprint)
     app.register_blueprint(base_materials)
     app.register_blueprint(blended_materials)
@@ -51,5 +55,9 @@ def create_app(env=None, with_session=True, template_folder=None, static_folder=
     app.register_error_handler(408, handle_408)
     app.register_error_handler(413, handle_413)
     app.register_error_handler(422, handle_422)
+    app.register_error_handler(503, handle_503)
+
+    if LOLO_WARM_UP:
+        LoloGateway.warm_up()
 
     return app
@@ -1,6 +1,6 @@
 from flask import render_template
 from werkzeug.exceptions import NotFound, BadRequest, RequestEntityTooLarge, UnprocessableEntity, Forbidden, \
-    RequestTimeout
+    RequestTimeout, Conflict, ServiceUnavailable
 
 
 def handle_404(err):
@@ -45,6 +45,13 @@ def handle_408(err):
         return render_template('408.html', message='LLM not available.'), 408
 
 
+def handle_503(err):
+    try:
+        return render_template('503.html', message=err.message), 503
+    except AttributeError:
+        return render_template('503.html', message='The service is busy. Please try again later.'), 503
+
+
 class MaterialNotFoundException(NotFound):
 
     def __init__(self, message):
@@ -66,6 +73,13 @@ class DatasetNotFoundException(NotFound):
         self.message = message
 
 
+class ExperimentJobNotFoundException(NotFound):
+
+    def __init__(self, message):
+        super().__init__()
+        self.message = message
+
+
 class ValueNotSupportedException(BadRequest):
 
     def __init__(self, message):
@@ -101,3 +115,24 @@ class LLMNotRespondingException(RequestTimeout):
     def __init__(self, message):
         super().__init__()
         self.message = message
+
+
+class ExperimentCancelledException(Conflict):
+
+    def __init__(self, message):
+        super().__init__()
+        self.message = message
+
+
+class LoloNotAvailableException(UnprocessableEntity):
+
+    def __init__(self, message):
+        super().__init__()
+        self.message = message
+
+
+class ExperimentQueueFullException(ServiceUnavailable):
+
+    def __init__(self, message):
+        super().__init__()
+        self.message = message
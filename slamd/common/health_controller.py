@@ -0,0 +1,10 @@
+from flask import Blueprint, jsonify
+
+from slamd.discovery.processing.experiment.mlmodel.lolo_gateway import LoloGateway
+
+health = Blueprint('health', __name__)
+
+
+@health.route('/health', methods=['GET'])
+def health_status():
+    return jsonify({'status': 'ok', 'lolo_jvm': LoloGateway.get_status()}), 200
@@ -105,7 +105,6 @@ class SessionService:
         """
         all_materials = MaterialsPersistence.find_all_materials()
         all_processes = MaterialsPersistence.find_all_processes()
-        all_datasets = DiscoveryPersistence.find_all_datasets()
 
         for mat_list in all_materials:
             for mat in mat_list:
@@ -114,10 +113,8 @@ class SessionService:
         for proc in all_processes:
             MaterialsPersistence.delete_by_type_and_uuid(proc.type, str(proc.uuid))
 
-        for dataset in all_datasets:
-            DiscoveryPersistence.delete_dataset_by_name(dataset.name)
-
-        DiscoveryPersistence.delete_tsne_plot_data()
+        # Removes the datasets and the results of the last experiment from disk
+        DiscoveryPersistence.delete_session_store()
         DesignAssistantService.delete_design_assistant_session()
 
     @classmethod
@@ -1,3 +1,6 @@
+import os
+import stat
+
 from slamd.common.error_handling import ValueNotSupportedException, SlamdUnprocessableEntityException
 
 
@@ -71,3 +74,22 @@ def write_dict_into_object(dictionary, target_object):
                                                             f'keys {list(dictionary.keys())}')
 
         target_object.__dict__[key] = dictionary[key]
+
+
+def create_private_directory(path):
+    """
+    Create the directory with the given path so that only the user running the app can access it.
+    Raise a PermissionError if it exists but belongs to another user or is no directory, e.g. a symbolic link.
+    Files in such a directory could have been planted by someone else and must not be unpickled.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    status = os.lstat(path)
+    if not stat.S_ISDIR(status.st_mode):
+        raise PermissionError(f'{path} is not a directory')
+    # Windows has no user IDs. Its temporary and working directories are private to the user by default.
+    if hasattr(os, 'getuid'):
+        if status.st_uid != os.getuid():
+            raise PermissionError(f'{path} belongs to another user')
+        if status.st_mode & 0o077:
+            os.chmod(path, 0o700)
+    return path
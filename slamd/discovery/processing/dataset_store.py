@@ -0,0 +1,178 @@
+import copy
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from slamd.common.slamd_utils import create_private_directory
+
+# Directory containing one subdirectory per session with the pickled datasets and experiment results. It is only
+# accessible by the user running the app. Like the Flask-Session files, it is placed in the working directory.
+STORE_DIRECTORY = os.getenv('SLAMD_DATASET_STORE_DIR', os.path.join(os.getcwd(), 'slamd_data', 'datasets'))
+# Number of unpickled objects kept in memory across all sessions. Set to 0 to always read from disk.
+MAX_CACHED_OBJECTS = int(os.getenv('SLAMD_DATASET_CACHE_SIZE', 16))
+# Stores that were not used for this long are removed, e.g. those of expired sessions. The default is the lifetime
+# of Flask sessions.
+MAX_STORE_AGE_SECONDS = float(os.getenv('SLAMD_DATASET_STORE_MAX_AGE_SECONDS', 31 * 24 * 60 * 60))
+# Minimum time between two searches for old stores in a process
+STORE_CLEANUP_INTERVAL_SECONDS = float(os.getenv('SLAMD_DATASET_STORE_CLEANUP_INTERVAL_SECONDS', 60 * 60))
+
+
+class DatasetStore:
+    """
+    Stores datasets and other large discovery objects on disk instead of in the session. The session only keeps
+    their IDs, so the filesystem session does not pickle and unpickle all dataframes on every request.
+
+    Objects are pickled to one file per object in a directory per session and read lazily. Recently used objects
+    are kept in a bounded LRU cache. The modification time of the file is checked on every access so that an
+    object saved by another process is read again. The cache holds its own copies, so objects returned by load can
+    be modified without affecting other requests. They must be saved again to keep the changes.
+
+    Only directories owned by the user running the app are used, because load unpickles the files it finds there.
+
+    Every access marks the directory of the store as used. Saving an object removes the stores that were not used
+    for MAX_STORE_AGE_SECONDS, at most once every STORE_CLEANUP_INTERVAL_SECONDS.
+    """
+
+    _entries = OrderedDict()
+    _lock = threading.Lock()
+    _last_cleanup = None
+    _verified_directory = None
+
+    @classmethod
+    def save(cls, store_id, object_id, obj):
+        path = cls._path(store_id, object_id)
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+
+        # Write to a temporary file first so that readers never see a partially written object
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'wb') as file:
+                pickle.dump(obj, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+        cls._cache(store_id, object_id, os.stat(path).st_mtime_ns, obj)
+        cls._remove_old_stores_if_due()
+
+    @classmethod
+    def load(cls, store_id, object_id):
+        """
+        Return the object with the given ID or None if it does not exist. The object is a copy owned by the caller.
+        """
+        path = cls._path(store_id, object_id)
+        try:
+            modification_time = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            cls._uncache(store_id, object_id)
+            return None
+
+        cls._mark_used(store_id)
+        with cls._lock:
+            entry = cls._entries.get((store_id, object_id))
+            if entry is not None and entry[0] == modification_time:
+                cls._entries.move_to_end((store_id, object_id))
+                cached = entry[1]
+            else:
+                cached = None
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+        with open(path, 'rb') as file:
+            obj = pickle.load(file)
+        cls._cache(store_id, object_id, modification_time, obj)
+        return obj
+
+    @classmethod
+    def delete(cls, store_id, object_id):
+        cls._uncache(store_id, object_id)
+        try:
+            os.remove(cls._path(store_id, object_id))
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def delete_store(cls, store_id):
+        with cls._lock:
+            for key in [key for key in cls._entries if key[0] == store_id]:
+                del cls._entries[key]
+        shutil.rmtree(os.path.join(cls._directory(), store_id), ignore_errors=True)
+
+    @classmethod
+    def remove_old_stores(cls, max_age_seconds=None):
+        """
+        Remove the stores that were not used for the given time and return their IDs.
+        """
+        max_age_seconds = MAX_STORE_AGE_SECONDS if max_age_seconds is None else max_age_seconds
+        oldest_allowed = time.time() - max_age_seconds
+        try:
+            entries = list(os.scandir(cls._directory()))
+        except FileNotFoundError:
+            return []
+
+        removed = []
+        for entry in entries:
+            try:
+                if entry.is_dir() and entry.stat().st_mtime < oldest_allowed:
+                    cls.delete_store(entry.name)
+                    removed.append(entry.name)
+            except FileNotFoundError:
+                # Removed by another process in the meantime
+                pass
+        return removed
+
+    @classmethod
+    def clear_cache(cls):
+        with cls._lock:
+            cls._entries.clear()
+
+    @classmethod
+    def _cache(cls, store_id, object_id, modification_time, obj):
+        if MAX_CACHED_OBJECTS <= 0:
+            return
+        # The caller keeps obj and may modify it
+        obj = copy.deepcopy(obj)
+        with cls._lock:
+            cls._entries[(store_id, object_id)] = (modification_time, obj)
+            cls._entries.move_to_end((store_id, object_id))
+            while len(cls._entries) > MAX_CACHED_OBJECTS:
+                cls._entries.popitem(last=False)
+
+    @classmethod
+    def _uncache(cls, store_id, object_id):
+        with cls._lock:
+            cls._entries.pop((store_id, object_id), None)
+
+    @classmethod
+    def _mark_used(cls, store_id):
+        try:
+            os.utime(os.path.join(cls._directory(), store_id))
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def _remove_old_stores_if_due(cls):
+        with cls._lock:
+            now = time.monotonic()
+            if cls._last_cleanup is not None and now - cls._last_cleanup < STORE_CLEANUP_INTERVAL_SECONDS:
+                return
+            cls._last_cleanup = now
+        cls.remove_old_stores()
+
+    @classmethod
+    def _path(cls, store_id, object_id):
+        # The IDs are created by the application and never contain path separators
+        return os.path.join(cls._directory(), store_id, f'{object_id}.pkl')
+
+    @classmethod
+    def _directory(cls):
+        # Check the directory once per process instead of on every access
+        if cls._verified_directory != STORE_DIRECTORY:
+            create_private_directory(STORE_DIRECTORY)
+            cls._verified_directory = STORE_DIRECTORY
+        return STORE_DIRECTORY
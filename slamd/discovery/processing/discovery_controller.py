@@ -114,6 +114,57 @@ def run_experiment(dataset):
 
 
 
+@discovery.route('/<dataset>/rerank', methods=['POST'])
+def rerank_experiment(dataset):
+    request_body = json.loads(request.data)
+    dataframe, scatter_plot = DiscoveryService.rerank_experiment(dataset, request_body)
+
+    html_dataframe = dataframe.to_html(index=False,
+                                       table_id='formulations_dataframe',
+                                       classes='table table-bordered table-striped table-hover topscroll-table')
+
+    body = {'template': render_template('experiment_result.html',
+                                        df=html_dataframe,
+                                        scatter_plot=scatter_plot)}
+    return make_response(jsonify(body), 200)
+
+
+@discovery.route('/<dataset>/jobs', methods=['POST'])
+def submit_experiment(dataset):
+    request_body = json.loads(request.data)
+    job_id = DiscoveryService.submit_experiment(dataset, request_body)
+    return make_response(jsonify({'job_id': job_id}), 202)
+
+
+@discovery.route('/experiment_jobs/<job_id>', methods=['GET'])
+def experiment_job_status(job_id):
+    return make_response(jsonify(DiscoveryService.get_experiment_job_status(job_id)), 200)
+
+
+@discovery.route('/experiment_jobs/<job_id>', methods=['DELETE'])
+def cancel_experiment_job(job_id):
+    DiscoveryService.cancel_experiment_job(job_id)
+    return make_response(jsonify(DiscoveryService.get_experiment_job_status(job_id)), 200)
+
+
+@discovery.route('/experiment_jobs/<job_id>/result', methods=['GET'])
+def experiment_job_result(job_id):
+    result = DiscoveryService.collect_experiment_job_result(job_id)
+    if result is None:
+        # Not finished yet - the client should keep polling
+        return make_response(jsonify(DiscoveryService.get_experiment_job_status(job_id)), 202)
+
+    dataframe, scatter_plot = result
+    html_dataframe = dataframe.to_html(index=False,
+                                       table_id='formulations_dataframe',
+                                       classes='table table-bordered table-striped table-hover topscroll-table')
+
+    body = {'template': render_template('experiment_result.html',
+                                        df=html_dataframe,
+                                        scatter_plot=scatter_plot)}
+    return make_response(jsonify(body), 200)
+
+
 @discovery.route('/<dataset>/download', methods=['GET'])
 def download_dataset(dataset):
     dataset_content = DiscoveryService.download_dataset(dataset)
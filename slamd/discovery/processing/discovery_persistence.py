@@ -1,16 +1,26 @@
+import uuid
+
 from flask import session
 
+from slamd.discovery.processing.dataset_store import DatasetStore
+
 
 class DiscoveryPersistence:
+    """
+    Datasets and the results of the last experiment are kept in the DatasetStore. The session only contains their
+    IDs and the ID of the store of the session.
+    """
 
     @classmethod
     def save_dataset(cls, dataset):
         before = cls.get_session_property()
+        dataset_id = before.get(dataset.name) or cls._create_object_id()
+        DatasetStore.save(cls.get_session_store_id(), dataset_id, dataset)
 
         if not before:
-            cls.set_session_property({dataset.name: dataset})
+            cls.set_session_property({dataset.name: dataset_id})
         else:
-            cls.extend_session_property(dataset)
+            cls.extend_session_property(dataset.name, dataset_id)
 
     @classmethod
     def save_prediction(cls, prediction):
@@ -20,23 +30,51 @@ class DiscoveryPersistence:
     def save_tsne_plot_data(cls, tsne_plot_data):
         cls.set_session_tsne_plot_data(tsne_plot_data)
 
+    @classmethod
+    def save_experiment(cls, experiment):
+        cls.set_session_experiment(experiment)
+
     @classmethod
     def set_session_prediction(cls, prediction):
-        session['sequential_learning_predictions'] = prediction
+        cls._set_stored_object('sequential_learning_predictions', prediction)
 
     @classmethod
     def set_session_tsne_plot_data(cls, tsne_plot_data):
-        session['tsne_plot_data'] = tsne_plot_data
+        cls._set_stored_object('tsne_plot_data', tsne_plot_data)
 
     @classmethod
     def delete_tsne_plot_data(cls):
-        if 'tsne_plot_data' in session:
-            del session['tsne_plot_data']
+        cls._delete_stored_object('tsne_plot_data')
+
+    @classmethod
+    def set_session_experiment(cls, experiment):
+        cls._set_stored_object('last_experiment', experiment)
+
+    @classmethod
+    def delete_experiment(cls):
+        cls._delete_stored_object('last_experiment')
+
+    @classmethod
+    def delete_session_store(cls):
+        """
+        Remove the datasets and experiment results of the session together with the directory of its store.
+        """
+        for session_key in ('datasets', 'sequential_learning_predictions', 'tsne_plot_data', 'last_experiment'):
+            session.pop(session_key, None)
+        if 'dataset_store_id' in session:
+            DatasetStore.delete_store(session.pop('dataset_store_id'))
 
     @classmethod
     def delete_dataset_by_name(cls, dataset_name):
+        """
+        Remove the dataset with the given name and return its ID.
+        Return None if no matching dataset was found.
+        """
         datasets = cls.get_session_property()
-        return datasets.pop(dataset_name, None)
+        dataset_id = datasets.pop(dataset_name, None)
+        if dataset_id is not None:
+            DatasetStore.delete(cls.get_session_store_id(), dataset_id)
+        return dataset_id
 
     @classmethod
     def query_dataset_by_name(cls, dataset_name):
@@ -45,7 +83,10 @@ class DiscoveryPersistence:
         Return None if no matching element was found.
         """
         datasets = cls.get_session_property()
-        return datasets.get(dataset_name, None)
+        dataset_id = datasets.get(dataset_name, None)
+        if dataset_id is None:
+            return None
+        return DatasetStore.load(cls.get_session_store_id(), dataset_id)
 
     @classmethod
     def query_prediction(cls):
@@ -55,30 +96,99 @@ class DiscoveryPersistence:
         """
         return cls.get_session_prediction()
 
+    @classmethod
+    def query_experiment(cls):
+        """
+        Return the experiment of the last prediction including its predictions, uncertainties and novelty.
+        Return None if no experiment was run yet.
+        """
+        return cls.get_session_experiment()
+
     @classmethod
     def find_all_datasets(cls):
         datasets = cls.get_session_property()
-        return list(datasets.values())
+        store_id = cls.get_session_store_id()
+        all_datasets = [DatasetStore.load(store_id, dataset_id) for dataset_id in datasets.values()]
+        return [dataset for dataset in all_datasets if dataset is not None]
+
+    @classmethod
+    def _set_stored_object(cls, session_key, obj):
+        object_id = session.get(session_key) or cls._create_object_id()
+        DatasetStore.save(cls.get_session_store_id(), object_id, obj)
+        session[session_key] = object_id
+
+    @classmethod
+    def _get_stored_object(cls, session_key, default):
+        object_id = session.get(session_key)
+        if object_id is None:
+            return default
+        if not isinstance(object_id, str):
+            # Sessions created before the DatasetStore existed contain the object itself
+            obj = session.pop(session_key)
+            cls._set_stored_object(session_key, obj)
+            return obj
+        obj = DatasetStore.load(cls.get_session_store_id(), object_id)
+        return default if obj is None else obj
+
+    @classmethod
+    def _delete_stored_object(cls, session_key):
+        object_id = session.pop(session_key, None)
+        if isinstance(object_id, str):
+            DatasetStore.delete(cls.get_session_store_id(), object_id)
+
+    @classmethod
+    def _move_datasets_to_store(cls, datasets):
+        """
+        Sessions created before the DatasetStore existed map the dataset names to the datasets themselves.
+        Save these datasets to the store and keep only their IDs in the session.
+        """
+        store_id = cls.get_session_store_id()
+        dataset_ids = {}
+        for dataset_name, dataset in datasets.items():
+            if isinstance(dataset, str):
+                dataset_ids[dataset_name] = dataset
+            else:
+                dataset_ids[dataset_name] = cls._create_object_id()
+                DatasetStore.save(store_id, dataset_ids[dataset_name], dataset)
+        session['datasets'] = dataset_ids
+        return dataset_ids
+
+    @classmethod
+    def _create_object_id(cls):
+        return uuid.uuid4().hex
 
     # Wrappers for session logic. This way we can easily mock the methods in tests without any need for creating a proper
     # context and session. Check test_discovery_persistence for examples.
 
+    @classmethod
+    def get_session_store_id(cls):
+        if 'dataset_store_id' not in session:
+            session['dataset_store_id'] = uuid.uuid4().hex
+        return session['dataset_store_id']
+
     @classmethod
     def get_session_property(cls):
-        return session.get('datasets', {})
+        datasets = session.get('datasets', {})
+        if any(not isinstance(dataset_id, str) for dataset_id in datasets.values()):
+            datasets = cls._move_datasets_to_store(datasets)
+        return datasets
 
     @classmethod
     def get_session_prediction(cls):
-        return session.get('sequential_learning_predictions', {})
+        return cls._get_stored_object('sequential_learning_predictions', {})
 
     @classmethod
     def get_session_tsne_plot_data(cls):
-        return session.get('tsne_plot_data', {})
+        return cls._get_stored_object('tsne_plot_data', {})
+
+    @classmethod
+    def get_session_experiment(cls):
+        return cls._get_stored_object('last_experiment', None)
 
     @classmethod
     def set_session_property(cls, datasets):
         session['datasets'] = datasets
 
     @classmethod
-    def extend_session_property(cls, dataset):
-        session['datasets'][dataset.name] = dataset
+    def extend_session_property(cls, dataset_name, dataset_id):
+        session['datasets'][dataset_name] = dataset_id
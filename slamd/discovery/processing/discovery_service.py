@@ -1,21 +1,32 @@
+import copy
 from datetime import datetime
 
 import numpy as np
 import pandas as pd
 from werkzeug.datastructures import CombinedMultiDict
+from werkzeug.exceptions import HTTPException
 
-from slamd.common.error_handling import DatasetNotFoundException, PlotDataNotFoundException
+from slamd.common.error_handling import DatasetNotFoundException, PlotDataNotFoundException, \
+    SequentialLearningException
 from slamd.common.slamd_utils import empty, float_if_not_empty
 from slamd.discovery.processing.discovery_persistence import DiscoveryPersistence
 from slamd.discovery.processing.experiment.experiment_conductor import ExperimentConductor
 from slamd.discovery.processing.experiment.experiment_data import ExperimentData
+from slamd.discovery.processing.experiment.experiment_job_runner import ExperimentJobRunner, FAILED, FINISHED, \
+    CANCELLED
+from slamd.discovery.processing.experiment.experiment_preprocessor import ExperimentPreprocessor
 from slamd.discovery.processing.experiment.plot_generator import PlotGenerator
+from slamd.discovery.processing.experiment.tsne_embedding_cache import TSNEEmbeddingCache
 from slamd.discovery.processing.forms.discovery_form import DiscoveryForm
 from slamd.discovery.processing.forms.upload_dataset_form import UploadDatasetForm
 from slamd.discovery.processing.models.prediction import Prediction
 from slamd.discovery.processing.strategies.csv_strategy import CsvStrategy
 from slamd.discovery.processing.strategies.excel_strategy import ExcelStrategy
 
+# Parts of the experiment configuration which change the preprocessed data or the fitted model.
+# If any of them differ from the last run, the experiment cannot be reranked and must be run again.
+FIT_CONFIGURATION_KEYS = ('model', 'materials_data_input', 'target_properties', 'a_priori_information')
+
 
 class DiscoveryService:
 
@@ -70,15 +81,104 @@ class DiscoveryService:
         if empty(dataset):
             raise DatasetNotFoundException('Dataset with given name not found')
 
-        experiment = cls._initialize_experiment(dataset.dataframe, request_body)
+        experiment = cls._initialize_experiment(dataset, request_body)
         df_with_predictions, scatter_plot, tsne_plot_data = ExperimentConductor.run(experiment)
 
-        prediction = Prediction(dataset_name, df_with_predictions, request_body)
-        DiscoveryPersistence.save_prediction(prediction)
-        DiscoveryPersistence.save_tsne_plot_data(tsne_plot_data)
+        cls._save_experiment_results(dataset.name, dataset.fingerprint, request_body, experiment,
+                                     df_with_predictions, tsne_plot_data)
+
+        return df_with_predictions, scatter_plot
+
+    @classmethod
+    def submit_experiment(cls, dataset_name, request_body):
+        """
+        Start the experiment in the background and return the ID of its job. Use get_experiment_job_status to poll
+        the progress and collect_experiment_job_result to get the result once it is finished.
+        """
+        dataset = DiscoveryPersistence.query_dataset_by_name(dataset_name)
+        if empty(dataset):
+            raise DatasetNotFoundException('Dataset with given name not found')
+
+        experiment = cls._initialize_experiment(dataset, request_body)
+        return ExperimentJobRunner.submit(DiscoveryPersistence.get_session_store_id(), dataset.name,
+                                          dataset.fingerprint, request_body, experiment)
+
+    @classmethod
+    def get_experiment_job_status(cls, job_id):
+        return ExperimentJobRunner.get_status(DiscoveryPersistence.get_session_store_id(), job_id)
+
+    @classmethod
+    def cancel_experiment_job(cls, job_id):
+        ExperimentJobRunner.cancel(DiscoveryPersistence.get_session_store_id(), job_id)
+
+    @classmethod
+    def collect_experiment_job_result(cls, job_id):
+        """
+        Return the output table and scatter plot of a finished job and save its results like run_experiment.
+        Return None if the job has not finished yet and raise the error of the job if it failed.
+        """
+        job = ExperimentJobRunner.find_job(DiscoveryPersistence.get_session_store_id(), job_id)
+        if job.status in (FAILED, CANCELLED):
+            if isinstance(job.error, HTTPException):
+                raise job.error
+            raise SequentialLearningException('There was an unknown error while running the experiment.')
+        if job.status != FINISHED:
+            return None
+
+        cls._save_experiment_results(job.dataset_name, job.dataset_fingerprint, job.request_body, job.experiment,
+                                     job.dataframe, job.tsne_plot_data)
+        return job.dataframe, job.scatter_plot
+
+    @classmethod
+    def rerank_experiment(cls, dataset_name, request_body):
+        """
+        Recompute only the utility of the last experiment with the new curiosity, weights and thresholds.
+        Falls back to running the full experiment if the dataset or the fit configuration changed since then.
+        """
+        dataset = DiscoveryPersistence.query_dataset_by_name(dataset_name)
+        if empty(dataset):
+            raise DatasetNotFoundException('Dataset with given name not found')
+
+        last_experiment = DiscoveryPersistence.query_experiment()
+        if not cls._can_rerank(dataset, request_body, last_experiment):
+            return cls.run_experiment(dataset_name, request_body)
+
+        # The stored experiment may be shared with the cache of the DatasetStore and must stay unchanged
+        # if the new configuration turns out to be invalid
+        experiment = copy.copy(last_experiment)
+        experiment.derived_views = dict(last_experiment.derived_views)
+        for key, value in cls._parse_utility_configuration(request_body).items():
+            setattr(experiment, key, value)
+        ExperimentPreprocessor.validate_experiment(experiment)
+        df_with_predictions, scatter_plot, tsne_plot_data = ExperimentConductor.rerank(experiment)
+
+        cls._save_experiment_results(dataset.name, dataset.fingerprint, request_body, experiment,
+                                     df_with_predictions, tsne_plot_data)
 
         return df_with_predictions, scatter_plot
 
+    @classmethod
+    def _can_rerank(cls, dataset, request_body, experiment):
+        prediction = DiscoveryPersistence.query_prediction()
+        if empty(experiment) or not prediction:
+            return False
+        if prediction.dataset_used_for_prediction != dataset.name or \
+                prediction.dataset_fingerprint != dataset.fingerprint:
+            return False
+        if any(prediction.metadata[key] != request_body[key] for key in FIT_CONFIGURATION_KEYS):
+            return False
+        # The a priori thresholds filter rows during preprocessing
+        return cls._parse_utility_configuration(prediction.metadata)['apriori_thresholds'] == \
+            cls._parse_utility_configuration(request_body)['apriori_thresholds']
+
+    @classmethod
+    def _save_experiment_results(cls, dataset_name, dataset_fingerprint, request_body, experiment,
+                                 df_with_predictions, tsne_plot_data):
+        prediction = Prediction(dataset_name, df_with_predictions, request_body, dataset_fingerprint)
+        DiscoveryPersistence.save_prediction(prediction)
+        DiscoveryPersistence.save_tsne_plot_data(tsne_plot_data)
+        DiscoveryPersistence.save_experiment(experiment)
+
     @classmethod
     def download_dataset(cls, dataset_name):
         dataset = DiscoveryPersistence.query_dataset_by_name(dataset_name)
@@ -102,7 +202,21 @@ class DiscoveryService:
         return f'predictions-{dataset_of_prediction.name}-{datetime.now()}.xlsx', output
 
     @classmethod
-    def _initialize_experiment(cls, dataframe, request_body):
+    def _initialize_experiment(cls, dataset, request_body):
+        return ExperimentData(
+            dataframe=dataset.dataframe,
+            model=request_body['model'],
+            # Datasets keep their name when targets are added, but names are only unique within a session
+            dataset_lineage=f'{DiscoveryPersistence.get_session_store_id()}/{dataset.name}',
+            # The preprocessor removes names from these lists, so they must not be the lists of the request
+            feature_names=list(request_body['materials_data_input']),
+            target_names=list(request_body['target_properties']),
+            apriori_names=list(request_body['a_priori_information']),
+            **cls._parse_utility_configuration(request_body)
+        )
+
+    @classmethod
+    def _parse_utility_configuration(cls, request_body):
         target_weights = [float(conf['weight']) for conf in request_body['target_configurations']]
         target_thresholds = [float_if_not_empty(conf['threshold']) for conf in request_body['target_configurations']]
         target_max_or_min = [conf['max_or_min'] for conf in request_body['target_configurations']]
@@ -112,22 +226,17 @@ class DiscoveryService:
                               for conf in request_body['a_priori_information_configurations']]
         apriori_max_or_min = [conf['max_or_min'] for conf in request_body['a_priori_information_configurations']]
 
-        return ExperimentData(
-            dataframe=dataframe,
-            model=request_body['model'],
-            curiosity=float(request_body['curiosity']),
-            feature_names=request_body['materials_data_input'],
-
-            target_names=request_body['target_properties'],
-            target_weights=target_weights,
-            target_thresholds=target_thresholds,
-            target_max_or_min=target_max_or_min,
-
-            apriori_names=request_body['a_priori_information'],
-            apriori_weights=apriori_weights,
-            apriori_thresholds=apriori_thresholds,
-            apriori_max_or_min=apriori_max_or_min,
-        )
+        return {
+            'curiosity': float(request_body['curiosity']),
+
+            'target_weights': target_weights,
+            'target_thresholds': target_thresholds,
+            'target_max_or_min': target_max_or_min,
+
+            'apriori_weights': apriori_weights,
+            'apriori_thresholds': apriori_thresholds,
+            'apriori_max_or_min': apriori_max_or_min,
+        }
 
     @classmethod
     def create_tsne_plot(cls):
@@ -135,10 +244,15 @@ class DiscoveryService:
         if not tsne_plot_data:
             raise PlotDataNotFoundException('Cannot find data to create TSNE plot!')
 
-        plot_df = tsne_plot_data.features_df.copy()
-        features_std = plot_df.std().replace(0, 1)
-        features_mean = plot_df.mean()
-        plot_df = (plot_df - features_mean) / features_std
+        embedding = TSNEEmbeddingCache.get(tsne_plot_data.embedding_key)
+        if embedding is None:
+            # The embedding was removed from the cache or computed by another process.
+            # Compute it again from the features of the experiment it belongs to.
+            experiment = DiscoveryPersistence.query_experiment()
+            if empty(experiment):
+                raise PlotDataNotFoundException('Cannot find data to create TSNE plot!')
+            embedding = TSNEEmbeddingCache.embed(experiment.normalized_features_df)
+        plot_df = pd.DataFrame(embedding, index=tsne_plot_data.index, columns=['t-SNE-1', 't-SNE-2'])
 
         plot_df['is_train_data'] = 'Predicted'
         plot_df.loc[tsne_plot_data.index_all_labelled, 'is_train_data'] = 'Labelled'
@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+from joblib import Parallel, delayed
+
+# Number of rows predicted at once. Bounds the memory of the cross-covariance matrix of Gaussian processes
+# (chunk size x number of training rows) and the size of the arrays sent to the JVM for lolo models.
+PREDICTION_CHUNK_SIZE = int(os.getenv('SLAMD_PREDICTION_CHUNK_SIZE', 4096))
+# Number of chunks predicted concurrently. Every worker holds the intermediate results of one chunk.
+MAX_PREDICTION_WORKERS = int(os.getenv('SLAMD_PREDICTION_WORKERS', 1))
+
+
+class ChunkedPredictor:
+    """
+    Predicts large sets of rows in chunks of at most PREDICTION_CHUNK_SIZE rows.
+
+    The prediction and uncertainty of a row only depend on the row itself, so predicting chunk by chunk yields
+    the same result as predicting all rows at once (up to floating point rounding in the linear algebra), while
+    the peak memory only grows with the chunk size.
+    Chunks are predicted in threads: numpy and the JVM of lolo release the GIL for the heavy lifting.
+    """
+
+    @classmethod
+    def predict(cls, regressor, rows, chunk_size=None, n_jobs=None):
+        """
+        Return the prediction and the uncertainty of every row as flat arrays.
+        """
+        chunk_size = chunk_size or PREDICTION_CHUNK_SIZE
+        n_jobs = n_jobs or MAX_PREDICTION_WORKERS
+
+        if len(rows) <= chunk_size:
+            return cls._predict_chunk(regressor, rows)
+
+        starts = range(0, len(rows), chunk_size)
+        results = Parallel(n_jobs=n_jobs, prefer='threads', return_as='generator')(
+            delayed(cls._predict_chunk)(regressor, rows[start:start + chunk_size]) for start in starts
+        )
+
+        prediction = np.empty(len(rows))
+        uncertainty = np.empty(len(rows))
+        for start, (chunk_prediction, chunk_uncertainty) in zip(starts, results):
+            prediction[start:start + chunk_size] = chunk_prediction
+            uncertainty[start:start + chunk_size] = chunk_uncertainty
+        return prediction, uncertainty
+
+    @classmethod
+    def _predict_chunk(cls, regressor, rows):
+        if len(rows) == 0:
+            return np.empty(0), np.empty(0)
+        prediction, uncertainty = regressor.predict(rows, return_std=True)
+        return np.ravel(prediction), np.ravel(uncertainty)
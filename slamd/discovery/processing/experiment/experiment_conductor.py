@@ -1,12 +1,19 @@
 # Adapted from the original Sequential Learning App
 # https://github.com/BAMresearch/SequentialLearningApp
+import os
 import warnings
 import numpy as np
 import pandas as pd
-from scipy.spatial import distance_matrix
+from joblib import Parallel, delayed, parallel_config
+from scipy.spatial import cKDTree, distance_matrix, minkowski_distance
+from sklearn.base import clone
 from sklearn.exceptions import ConvergenceWarning
 
 from slamd.common.error_handling import SequentialLearningException
+from slamd.discovery.processing.experiment.chunked_predictor import ChunkedPredictor
+from slamd.discovery.processing.experiment.experiment_model import ExperimentModel
+from slamd.discovery.processing.experiment.fitted_model_cache import CachedFit, FittedModelCache
+from slamd.discovery.processing.experiment.kernel_warm_start_store import KernelWarmStartStore
 from slamd.discovery.processing.experiment.experiment_postprocessor import ExperimentPostprocessor
 from slamd.discovery.processing.experiment.experiment_preprocessor import ExperimentPreprocessor
 from slamd.discovery.processing.experiment.mlmodel.mlmodel_factory import MLModelFactory
@@ -14,55 +21,174 @@ from slamd.discovery.processing.experiment.mlmodel.mlmodel_factory import MLMode
 # Attention - suppressing expected Gaussian Regressor warnings
 warnings.filterwarnings('ignore', category=ConvergenceWarning)
 
+# Maximum number of targets that are fitted concurrently. Set to 1 to fit all targets one after another.
+# Every worker process uses its share of the cores for BLAS, and the models fit without further parallelism.
+MAX_TARGET_WORKERS = int(os.getenv('SLAMD_MAX_TARGET_WORKERS', min(4, os.cpu_count() or 1)))
+
+# Nearest neighbour queries with a KD-tree are only faster than brute force for few dimensions
+NOVELTY_KDTREE_MAX_DIMENSIONS = 16
+# Upper bound for the number of distances held in memory at once when computing the novelty by brute force
+NOVELTY_CHUNK_SIZE = 2 ** 22
+
+# Stages of an experiment in the order in which they are run, as reported to report_progress
+EXPERIMENT_STAGES = ['preprocess', 'fit', 'utility', 'novelty', 'plots']
+
+
+def _ignore_progress(stage, completed, total):
+    pass
+
 
 class ExperimentConductor:
 
     @classmethod
-    def run(cls, exp):
+    def run(cls, exp, report_progress=_ignore_progress, tuning_budget=None):
+        """
+        Run the experiment. report_progress(stage, completed, total) is called whenever a stage starts or finishes.
+        For the 'fit' stage, completed and total count the targets, all other stages consist of a single step.
+        The optional TuningBudget limits the time spent on tuning the model and allows cancelling the tuning.
+        """
+        report_progress('preprocess', 0, 1)
         ExperimentPreprocessor.preprocess(exp)
-        cls._fit_model_and_predict(exp)
+        report_progress('preprocess', 1, 1)
+
+        cls._fit_model_and_predict(exp, report_progress, tuning_budget)
+
+        report_progress('utility', 0, 1)
         cls._calculate_utility(exp)
+        report_progress('utility', 1, 1)
+
+        report_progress('novelty', 0, 1)
         cls._calculate_novelty(exp)
+        report_progress('novelty', 1, 1)
+
+        report_progress('plots', 0, 1)
+        result = ExperimentPostprocessor.postprocess(exp)
+        report_progress('plots', 1, 1)
+        return result
+
+    @classmethod
+    def rerank(cls, exp):
+        """
+        Recompute the utility of an experiment that has already been run and produce a new output.
+        Predictions, uncertainties and novelty do not depend on the utility parameters and are reused as they are.
+        """
+        cls._calculate_utility(exp)
 
         return ExperimentPostprocessor.postprocess(exp)
 
     @classmethod
-    def _fit_model_and_predict(cls, exp):
-        regressor = MLModelFactory.initialize_model(exp)
-
-        predictions = pd.DataFrame(columns=exp.target_names, index=exp.index_predicted, dtype=np.float64)
-        uncertainties = pd.DataFrame(columns=exp.target_names, index=exp.index_predicted, dtype=np.float64)
-        for target in exp.target_names:
-            # Train the model for every target with the corresponding rows and labels
-            index_labelled = exp.targets_df.index[exp.targets_df[target].notnull()]
-            index_unlabelled = exp.targets_df.index[exp.targets_df[target].isnull()]
-
-            training_rows = exp.features_df.loc[index_labelled].values
-            training_labels = exp.targets_df.loc[index_labelled, target].values.reshape(-1, 1)
-
-            try:
-                regressor.fit(training_rows, training_labels)
-            except:
+    def _fit_model_and_predict(cls, exp, report_progress=_ignore_progress, tuning_budget=None):
+        # Work on plain ndarrays: the label mask for every target is computed once and all per-target
+        # slicing happens with boolean masks instead of repeated pandas index lookups.
+        features = exp.feature_matrix
+        targets = exp.targets_df.to_numpy(dtype=np.float64)
+
+        # The fit only depends on the data, the model and the selected features. Changing curiosity, weights
+        # or thresholds of the targets can reuse the previous fit.
+        cache_key = FittedModelCache.create_key(exp.model, exp.feature_names, exp.target_names, features, targets)
+        n_targets = len(exp.target_names)
+        report_progress('fit', 0, n_targets)
+        fit = FittedModelCache.get(cache_key)
+        if fit is None:
+            fit = cls._fit_all_targets(exp, features, targets, report_progress, tuning_budget)
+            # A model found by a truncated search must not be reused by experiments with more time
+            if exp.tuning_summary is None or not exp.tuning_summary.truncated:
+                FittedModelCache.put(cache_key, fit)
+        report_progress('fit', n_targets, n_targets)
+
+        exp.prediction = pd.DataFrame(fit.predictions, columns=exp.target_names, index=exp.index_predicted)
+        exp.uncertainty = pd.DataFrame(fit.uncertainties, columns=exp.target_names, index=exp.index_predicted)
+
+    @classmethod
+    def _fit_all_targets(cls, exp, features, targets, report_progress=_ignore_progress, tuning_budget=None):
+        regressor = MLModelFactory.initialize_model(exp, tuning_budget)
+
+        label_mask = ~np.isnan(targets)
+        predicted_mask = ~label_mask.all(axis=1)
+        # Position of every predicted row inside the (n_predicted x n_targets) result arrays
+        predicted_labels_mask = label_mask[predicted_mask]
+
+        predictions = np.full(predicted_labels_mask.shape, np.nan)
+        uncertainties = np.full(predicted_labels_mask.shape, np.nan)
+
+        # The targets are independent of each other and can be fitted concurrently. Every target gets its own
+        # copy of the regressor; with a fixed random_state this yields the same result as fitting serially.
+        n_jobs = max(1, min(MAX_TARGET_WORKERS, len(exp.target_names)))
+        if n_jobs > 1:
+            regressor = cls._without_nested_parallelism(regressor)
+        # Lolo models talk to a single JVM through py4j, so threads are sufficient and avoid starting
+        # one JVM per worker process.
+        if exp.model in ExperimentModel.get_lolo_models():
+            backend = {'backend': 'threading'}
+        else:
+            backend = {'backend': 'loky', 'inner_max_num_threads': max(1, (os.cpu_count() or 1) // n_jobs)}
+        # The kernel optimization of Gaussian processes starts from the optimum of the previous run on the dataset
+        warm_start_keys = [KernelWarmStartStore.create_key(exp.dataset_lineage, exp.model, exp.feature_names, target)
+                           for target in exp.target_names]
+        n_training_rows = label_mask.sum(axis=0)
+        # The results are returned in order as soon as they are available, which allows reporting the progress
+        with parallel_config(**backend):
+            results = Parallel(n_jobs=n_jobs, return_as='generator')(
+                delayed(cls._fit_and_predict_target)(
+                    KernelWarmStartStore.warm_start(warm_start_keys[i], clone(regressor, safe=False),
+                                                    features[label_mask[:, i]]),
+                    # Train the model for every target with the corresponding rows and labels
+                    features[label_mask[:, i]],
+                    targets[label_mask[:, i], i].reshape(-1, 1),
+                    features[~label_mask[:, i]]
+                )
+                for i in range(len(exp.target_names))
+            )
+
+        fitted_regressors = []
+        for i, result in enumerate(results):
+            if result is None:
                 raise SequentialLearningException(message=f'There was an unknown error while trying to fit '
                                                           f'the regressor using {exp.model}. Please verify '
                                                           f'your dataset.')
+            fitted_regressor, prediction, uncertainty = result
+            fitted_regressors.append(fitted_regressor)
+            KernelWarmStartStore.remember(warm_start_keys[i], fitted_regressor, n_training_rows[i])
+            report_progress('fit', i + 1, len(exp.target_names))
 
-            # Predict the label for the remaining rows
-            rows_to_predict = exp.features_df.loc[index_unlabelled].values
-            prediction, uncertainty = regressor.predict(rows_to_predict, return_std=True)
+            # Every row that is unlabelled for the current target is a predicted row
+            predictions[~predicted_labels_mask[:, i], i] = prediction
+            uncertainties[~predicted_labels_mask[:, i], i] = uncertainty
 
-            predictions.loc[index_unlabelled, target] = prediction
-            uncertainties.loc[index_unlabelled, target] = uncertainty
+            # Rows for which the current target is labelled, but others aren't: add these known values
+            # to the prediction with uncertainty 0, for the utility calculation
+            predictions[predicted_labels_mask[:, i], i] = targets[predicted_mask & label_mask[:, i], i]
+            uncertainties[predicted_labels_mask[:, i], i] = 0
 
-            # Determine rows for which the current target is labelled, but others aren't
-            index_only_curr_labelled = exp.index_partially_labelled.intersection(index_labelled)
+        return CachedFit(fitted_regressors, predictions, uncertainties)
 
-            # Add these known values to the prediction with uncertainty 0, for the utility calculation
-            predictions.loc[index_only_curr_labelled, target] = exp.targets_df.loc[index_only_curr_labelled, target]
-            uncertainties.loc[index_only_curr_labelled, target] = 0
+    @classmethod
+    def _without_nested_parallelism(cls, regressor):
+        """
+        Return a copy of the regressor whose estimators, e.g. the restarts of the Gaussian process or the
+        cross-validation of the tuned models, run with a single worker. The targets already run in parallel.
+        """
+        if not hasattr(regressor, 'get_params'):
+            return regressor
+        n_jobs_params = {name: 1 for name in regressor.get_params(deep=True)
+                         if name == 'n_jobs' or name.endswith('__n_jobs')}
+        return clone(regressor, safe=False).set_params(**n_jobs_params) if n_jobs_params else regressor
 
-        exp.prediction = predictions
-        exp.uncertainty = uncertainties
+    @classmethod
+    def _fit_and_predict_target(cls, regressor, training_rows, training_labels, rows_to_predict):
+        """
+        Fit the regressor for a single target and predict the remaining rows.
+        Returns None if fitting failed: this may run in a worker process, and our HTTP exceptions
+        cannot be pickled back to the caller.
+        """
+        try:
+            regressor.fit(training_rows, training_labels)
+        except Exception:
+            return None
+
+        # Predict the label for the remaining rows, in chunks to bound the memory for large candidate sets
+        prediction, uncertainty = ChunkedPredictor.predict(regressor, rows_to_predict)
+        return regressor, prediction, uncertainty
 
     @classmethod
     def _calculate_utility(cls, exp):
@@ -93,8 +219,7 @@ class ExperimentConductor:
         clipped_prediction = cls.clip_prediction(exp)
 
         # Norm - use 1 as standard deviation instead of 0 to avoid division by 0 (unlikely)
-        labels_std = exp.targets_df.std(skipna=True).replace(0, 1)
-        labels_mean = exp.targets_df.mean(skipna=True)
+        labels_mean, labels_std = exp.target_stats
         normed_uncertainty = exp.uncertainty / labels_std
         normed_prediction = (clipped_prediction - labels_mean) / labels_std
 
@@ -119,10 +244,8 @@ class ExperimentConductor:
             return 0
 
         # Norm - use 1 as standard deviation instead of 0 to avoid division by 0
-        normed_apriori_df = exp.apriori_df.copy()
-        apriori_std = normed_apriori_df.std().replace(0, 1)
-        apriori_mean = normed_apriori_df.mean()
-        normed_apriori_df = (normed_apriori_df - apriori_mean) / apriori_std
+        apriori_mean, apriori_std = exp.apriori_stats
+        normed_apriori_df = (exp.apriori_df - apriori_mean) / apriori_std
 
         apriori_for_predicted_rows = normed_apriori_df.loc[exp.index_predicted]
 
@@ -149,17 +272,11 @@ class ExperimentConductor:
             # Novelty can only be calculated if there are points that are fully labelled
             return
 
-        # Normalize first
-        norm_features_df = exp.features_df.copy()
-        features_std = norm_features_df.std().replace(0, 1)
-        features_mean = norm_features_df.mean()
-        norm_features_df = (norm_features_df - features_mean) / features_std
-
-        features_of_predicted_rows = norm_features_df.loc[exp.index_predicted]
-        features_of_known_rows = norm_features_df.loc[exp.index_all_labelled]
+        norm_features_df = exp.normalized_features_df
+        features_of_predicted_rows = norm_features_df.loc[exp.index_predicted].to_numpy()
+        features_of_known_rows = norm_features_df.loc[exp.index_all_labelled].to_numpy()
 
-        distance = distance_matrix(features_of_predicted_rows, features_of_known_rows)
-        min_distances = distance.min(axis=1)
+        min_distances = cls._calculate_min_distances(features_of_predicted_rows, features_of_known_rows)
         max_of_min_distances = min_distances.max()
 
         novelty_as_array = min_distances * (1 / max_of_min_distances)
@@ -169,6 +286,27 @@ class ExperimentConductor:
             index=exp.index_predicted
         )
 
+    @classmethod
+    def _calculate_min_distances(cls, points, reference_points):
+        """
+        Return the euclidean distance of every point to its nearest reference point.
+
+        The full distance matrix between both sets is never built. For few dimensions a KD-tree finds the nearest
+        reference points, otherwise the distance matrix is computed in chunks of rows. Either way, the distances are
+        exactly those of distance_matrix.
+        """
+        if points.shape[1] <= NOVELTY_KDTREE_MAX_DIMENSIONS:
+            _, nearest = cKDTree(reference_points).query(points, k=1)
+            # The distances of the tree are summed up in another order and differ in the last bits
+            return minkowski_distance(points, reference_points[nearest])
+
+        chunk_size = max(1, NOVELTY_CHUNK_SIZE // len(reference_points))
+        min_distances = np.empty(len(points))
+        for start in range(0, len(points), chunk_size):
+            chunk = points[start:start + chunk_size]
+            min_distances[start:start + chunk_size] = distance_matrix(chunk, reference_points).min(axis=1)
+        return min_distances
+
     @classmethod
     def clip_prediction(cls, exp):
         clipped_prediction = exp.prediction.copy()
@@ -1,12 +1,16 @@
 from dataclasses import dataclass, field
 from pandas import DataFrame, Index
 
+from slamd.discovery.processing.models.tuning_summary import TuningSummary
+
 
 @dataclass
 class ExperimentData:
     orig_data: DataFrame = None
     dataframe: DataFrame = None
     model: str = None
+    # Identifies the dataset across experiments, also after labels were added. Used to warm start the model fit.
+    dataset_lineage: str = None
     curiosity: float = None
 
     target_names: list[str] = field(default_factory=list)
@@ -28,10 +32,25 @@ class ExperimentData:
     uncertainty: DataFrame = None
     utility: DataFrame = None
     novelty: DataFrame = None
+    # Only set for tuned models that were fitted with a time budget
+    tuning_summary: TuningSummary = None
+
+    # Views derived from dataframe are computed on first access and cached here.
+    # Call invalidate_derived_views after changing dataframe, feature_names, target_names or apriori_names.
+    derived_views: dict = field(default_factory=dict, init=False, repr=False, compare=False)
 
     def __post_init__(self):
-        self.orig_data = self.dataframe.copy()
-        self.dataframe = self.dataframe.copy()  # otherwise, dataset object in session gets overwritten
+        # The dataframe is shared with the dataset and must never be modified in place. The preprocessor replaces
+        # dataframe with new objects instead, so neither the dataset nor orig_data change during an experiment.
+        self.orig_data = self.dataframe
+
+    def invalidate_derived_views(self):
+        self.derived_views.clear()
+
+    def _derived_view(self, name, compute):
+        if name not in self.derived_views:
+            self.derived_views[name] = compute()
+        return self.derived_views[name]
 
     @property
     def features_df(self):
@@ -47,16 +66,70 @@ class ExperimentData:
 
     @property
     def index_none_labelled(self):
-        return self.dataframe.index[self.targets_df.isnull().all(axis=1)]
+        return self._derived_view('index_none_labelled',
+                                  lambda: self.dataframe.index[self._target_label_masks['none_labelled']])
 
     @property
     def index_partially_labelled(self):
-        return self.dataframe.index.difference(self.index_all_labelled).difference(self.index_none_labelled)
+        return self._derived_view(
+            'index_partially_labelled',
+            lambda: self.dataframe.index.difference(self.index_all_labelled).difference(self.index_none_labelled))
 
     @property
     def index_all_labelled(self):
-        return self.dataframe.index[self.targets_df.notnull().all(axis=1)]
+        return self._derived_view('index_all_labelled',
+                                  lambda: self.dataframe.index[self._target_label_masks['all_labelled']])
 
     @property
     def index_predicted(self):
-        return self.index_none_labelled.union(self.index_partially_labelled)
+        return self._derived_view('index_predicted',
+                                  lambda: self.index_none_labelled.union(self.index_partially_labelled))
+
+    @property
+    def feature_matrix(self):
+        """
+        Read-only float64 array of the features, e.g. for fitting the models.
+        """
+        def create_matrix():
+            matrix = self.features_df.to_numpy(dtype='float64')
+            matrix.flags.writeable = False
+            return matrix
+
+        return self._derived_view('feature_matrix', create_matrix)
+
+    @property
+    def feature_stats(self):
+        """
+        Mean and standard deviation of every feature. A standard deviation of 0 is replaced by 1 to avoid
+        division by 0 when normalizing.
+        """
+        return self._derived_view('feature_stats', lambda: self._column_stats(self.features_df))
+
+    @property
+    def normalized_features_df(self):
+        def normalize():
+            features_mean, features_std = self.feature_stats
+            return (self.features_df - features_mean) / features_std
+
+        return self._derived_view('normalized_features_df', normalize)
+
+    @property
+    def apriori_stats(self):
+        return self._derived_view('apriori_stats', lambda: self._column_stats(self.apriori_df))
+
+    @property
+    def target_stats(self):
+        return self._derived_view('target_stats', lambda: self._column_stats(self.targets_df))
+
+    @property
+    def _target_label_masks(self):
+        def compute_masks():
+            # A single scan of the target columns gives both masks
+            missing_labels = self.targets_df.isnull().to_numpy()
+            return {'none_labelled': missing_labels.all(axis=1), 'all_labelled': ~missing_labels.any(axis=1)}
+
+        return self._derived_view('target_label_masks', compute_masks)
+
+    @staticmethod
+    def _column_stats(dataframe):
+        return dataframe.mean(), dataframe.std().replace(0, 1)
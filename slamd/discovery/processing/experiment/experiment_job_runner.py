@@ -0,0 +1,147 @@
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.exceptions import HTTPException
+
+from slamd.common.error_handling import ExperimentJobNotFoundException, ExperimentCancelledException, \
+    ExperimentQueueFullException
+from slamd.discovery.processing.experiment.experiment_conductor import ExperimentConductor, EXPERIMENT_STAGES
+from slamd.discovery.processing.experiment.mlmodel import budgeted_grid_search
+from slamd.discovery.processing.experiment.mlmodel.budgeted_grid_search import TuningBudget
+from slamd.discovery.processing.models.experiment_job import ExperimentJob, QUEUED, RUNNING, FINISHED, FAILED, \
+    CANCELLED
+
+# Number of experiments that run at the same time. Further jobs wait in a queue.
+MAX_EXPERIMENT_JOB_WORKERS = int(os.getenv('SLAMD_EXPERIMENT_JOB_WORKERS', 2))
+# Number of jobs kept in memory. When exceeded, the oldest finished, failed or cancelled jobs are removed.
+MAX_EXPERIMENT_JOBS = int(os.getenv('SLAMD_MAX_EXPERIMENT_JOBS', 32))
+# Number of queued and running jobs. Every job holds its experiment data, so further jobs are rejected.
+MAX_ACTIVE_EXPERIMENT_JOBS = int(os.getenv('SLAMD_MAX_ACTIVE_EXPERIMENT_JOBS', 8))
+
+
+class ExperimentJobRunner:
+    """
+    Runs experiments in a bounded pool of background threads of the current process, so that long running
+    experiments do not block the request that started them. Jobs are identified by a random ID and can only be
+    accessed by the session that submitted them.
+    """
+
+    _jobs = OrderedDict()
+    _lock = threading.Lock()
+    _executor = None
+
+    @classmethod
+    def submit(cls, owner, dataset_name, dataset_fingerprint, request_body, experiment):
+        progress = {stage: {'completed': 0, 'total': 1} for stage in EXPERIMENT_STAGES}
+        progress['fit']['total'] = len(experiment.target_names)
+        job = ExperimentJob(job_id=uuid.uuid4().hex, owner=owner, dataset_name=dataset_name,
+                            dataset_fingerprint=dataset_fingerprint, request_body=request_body,
+                            experiment=experiment, progress=progress,
+                            tuning_budget=TuningBudget(budgeted_grid_search.TUNING_TIME_BUDGET_SECONDS))
+
+        with cls._lock:
+            n_active_jobs = sum(1 for other_job in cls._jobs.values() if other_job.status in (QUEUED, RUNNING))
+            if n_active_jobs >= MAX_ACTIVE_EXPERIMENT_JOBS:
+                raise ExperimentQueueFullException('Too many experiments are waiting to be run. '
+                                                   'Please try again later.')
+            cls._jobs[job.job_id] = job
+            cls._remove_old_jobs()
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=MAX_EXPERIMENT_JOB_WORKERS,
+                                                   thread_name_prefix='experiment-job')
+            executor = cls._executor
+
+        executor.submit(cls._run, job)
+        return job.job_id
+
+    @classmethod
+    def find_job(cls, owner, job_id):
+        with cls._lock:
+            job = cls._jobs.get(job_id)
+        if job is None or job.owner != owner:
+            raise ExperimentJobNotFoundException('The requested experiment could not be found!')
+        return job
+
+    @classmethod
+    def get_status(cls, owner, job_id):
+        job = cls.find_job(owner, job_id)
+        with cls._lock:
+            return {
+                'job_id': job.job_id,
+                'status': job.status,
+                'stages': [{'name': stage, **job.progress[stage]} for stage in EXPERIMENT_STAGES],
+                'error': cls._error_message(job.error) if job.error is not None else None,
+                'tuning': asdict(job.experiment.tuning_summary) if job.experiment.tuning_summary else None
+            }
+
+    @classmethod
+    def cancel(cls, owner, job_id):
+        """
+        Ask the job to stop. A queued job never starts, a running job stops at the next stage or, while tuning a
+        model, after the current cross-validation split.
+        """
+        job = cls.find_job(owner, job_id)
+        job.tuning_budget.cancel()
+        with cls._lock:
+            if job.status == QUEUED:
+                job.error = ExperimentCancelledException('The experiment was cancelled.')
+                job.status = CANCELLED
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._jobs.clear()
+
+    @classmethod
+    def _run(cls, job):
+        with cls._lock:
+            if job.status == CANCELLED:
+                return
+            job.status = RUNNING
+        # Only the time the job runs counts towards its budget, not the time it waited in the queue
+        job.tuning_budget.start()
+
+        try:
+            dataframe, scatter_plot, tsne_plot_data = ExperimentConductor.run(
+                job.experiment,
+                lambda stage, completed, total: cls._update_progress(job, stage, completed, total),
+                job.tuning_budget
+            )
+        except ExperimentCancelledException as error:
+            with cls._lock:
+                job.error = error
+                job.status = CANCELLED
+            return
+        except Exception as error:
+            with cls._lock:
+                job.error = error
+                job.status = FAILED
+            return
+
+        with cls._lock:
+            job.dataframe = dataframe
+            job.scatter_plot = scatter_plot
+            job.tsne_plot_data = tsne_plot_data
+            job.status = FINISHED
+
+    @classmethod
+    def _update_progress(cls, job, stage, completed, total):
+        with cls._lock:
+            job.progress[stage] = {'completed': completed, 'total': total}
+        job.tuning_budget.raise_if_cancelled()
+
+    @classmethod
+    def _remove_old_jobs(cls):
+        done_job_ids = [job_id for job_id, job in cls._jobs.items() if job.status in (FINISHED, FAILED, CANCELLED)]
+        for job_id in done_job_ids[:max(0, len(cls._jobs) - MAX_EXPERIMENT_JOBS)]:
+            del cls._jobs[job_id]
+
+    @classmethod
+    def _error_message(cls, error):
+        if isinstance(error, HTTPException):
+            return getattr(error, 'message', error.description)
+        return 'There was an unknown error while running the experiment.'
@@ -7,6 +7,8 @@ class ExperimentModel(Enum):
     GAUSSIAN_PROCESS = 'Gaussian Process Regression (Statistics-based model)'
     PCA_GAUSSIAN_PROCESS = 'Gaussian Process Regression with PCA'
     PCA_RANDOM_FOREST = 'lolo Random Forest with PCA'
+    SPARSE_GAUSSIAN_PROCESS = 'Sparse Gaussian Process Regression (for large datasets)'
+    JACKKNIFE_RANDOM_FOREST = 'Random Forest with jackknife uncertainty (runs without Java)'
     TUNED_GAUSSIAN_PROCESS = 'tuned Gaussian Process Regression (under development)'
     TUNED_RANDOM_FOREST = 'tuned lolo Random Forest (under development)'
 
@@ -19,3 +21,8 @@ class ExperimentModel(Enum):
     @ classmethod
     def get_tuned_models(cls):
         return [ExperimentModel.TUNED_GAUSSIAN_PROCESS.value, ExperimentModel.TUNED_RANDOM_FOREST.value]
+
+    @classmethod
+    def get_lolo_models(cls):
+        return [ExperimentModel.RANDOM_FOREST.value, ExperimentModel.PCA_RANDOM_FOREST.value,
+                ExperimentModel.TUNED_RANDOM_FOREST.value]
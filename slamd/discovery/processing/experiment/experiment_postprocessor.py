@@ -1,4 +1,5 @@
 from slamd.discovery.processing.experiment.plot_generator import PlotGenerator
+from slamd.discovery.processing.experiment.tsne_embedding_cache import TSNEEmbeddingCache
 from slamd.discovery.processing.models.tsne_plot_data import TSNEPlotData
 
 
@@ -8,7 +9,8 @@ class ExperimentPostprocessor:
     def postprocess(cls, exp):
         # Construct dataframe for output
 
-        df = exp.orig_data.loc[exp.index_predicted].copy()
+        # Selecting the rows already creates a new dataframe, orig_data itself stays unchanged
+        df = exp.orig_data.loc[exp.index_predicted]
         # Add the columns with utility and novelty values
         df['Utility'] = exp.utility.round(6)
         if exp.novelty is not None:
@@ -21,7 +23,10 @@ class ExperimentPostprocessor:
         df = cls.process_dataframe_for_output_table(df, exp)
         scatter_plot = cls.plot_output_space(df, exp)
 
-        tsne_plot_data = TSNEPlotData(utility=exp.utility, features_df=exp.features_df,
+        # Only the key of the embedding is kept, the embedding is computed in the background
+        tsne_plot_data = TSNEPlotData(utility=exp.utility,
+                                      embedding_key=TSNEEmbeddingCache.submit(exp.normalized_features_df),
+                                      index=exp.normalized_features_df.index,
                                       index_all_labelled=exp.index_all_labelled,
                                       index_none_labelled=exp.index_none_labelled,
                                       index_partially_labelled=exp.index_partially_labelled)
@@ -1,3 +1,5 @@
+import pandas as pd
+
 from slamd.common.error_handling import SequentialLearningException, ValueNotSupportedException, \
     SlamdUnprocessableEntityException
 from slamd.discovery.processing.experiment.experiment_model import ExperimentModel
@@ -48,14 +50,16 @@ class ExperimentPreprocessor:
     @classmethod
     def _validate_target_labels(cls, exp):
         for target, count in zip(exp.target_names, exp.targets_df.count()):
-            if exp.model == ExperimentModel.RANDOM_FOREST.value and count <= 1:
+            if exp.model in [ExperimentModel.RANDOM_FOREST.value, ExperimentModel.JACKKNIFE_RANDOM_FOREST.value] \
+                    and count <= 1:
                 raise ValueNotSupportedException(
                     message=f'Not enough labelled values for target: {target}. The Random Forest Regressor '
                             f'requires at least 2 labelled values, but only {count} was/were found. '
                             f'Please ensure that there are at least 2 data points that are not filtered out '
                             f'by the a priori thresholds.'
                 )
-            if exp.model == ExperimentModel.GAUSSIAN_PROCESS.value and count < 1:
+            if exp.model in [ExperimentModel.GAUSSIAN_PROCESS.value, ExperimentModel.SPARSE_GAUSSIAN_PROCESS.value] \
+                    and count < 1:
                 raise ValueNotSupportedException(
                     message=f'Not enough labelled values for target: {target}. The Gaussian Process Regressor '
                             f'requires at least 1 labelled value, but none were found. '
@@ -75,39 +79,43 @@ class ExperimentPreprocessor:
     @classmethod
     def encode_categoricals(cls, exp):
         non_numeric_features = exp.features_df.select_dtypes(exclude='number').columns
+        if len(non_numeric_features) == 0:
+            return
 
+        # Replace the columns in a shallow copy. The original columns are still shared with orig_data.
+        exp.dataframe = exp.dataframe.copy(deep=False)
         for feature in non_numeric_features:
             exp.dataframe[feature], _ = exp.dataframe[feature].factorize()
+        exp.invalidate_derived_views()
 
     @classmethod
     def filter_missing_inputs(cls, exp):
-        for col in exp.feature_names.copy():
-            if exp.dataframe[col].isna().values.any():
-                exp.dataframe.drop(col, axis=1, inplace=True)
-                exp.feature_names.remove(col)
+        # Features with missing values are only removed from the feature names, the dataframe is not changed
+        features_with_missing_values = exp.features_df.columns[exp.features_df.isna().any(axis=0).to_numpy()]
+        for col in features_with_missing_values:
+            exp.feature_names.remove(col)
+        exp.invalidate_derived_views()
 
     @classmethod
     def filter_apriori_with_thresholds_and_update_orig_data(cls, exp):
-        # In the future this function could be handled "live" and non-destructively in index_all_labelled and index_none_labelled
+        """
+        Remove the rows without any label which do not satisfy the thresholds of the a priori information.
+        The thresholds of all columns are combined into a single row mask, so the data is copied at most once.
+        """
+        # index of rows in which all target columns are nan
+        nodata_mask = exp.targets_df.isna().all(axis=1)
+        rows_to_keep = pd.Series(True, index=exp.dataframe.index)
         for (column, value, threshold) in zip(exp.apriori_names, exp.apriori_max_or_min, exp.apriori_thresholds):
             if threshold is None:
                 continue
 
-            # index of rows in which all target columns are nan
-            nodata_index = exp.targets_df.isna().all(axis=1)
             if value == 'max':
-                # Get dataframe mask based on threshold value and nodata_index.
-                # Apply mask to dataframe. Get index of values to drop.
-                # Use new index to drop values from original dataframe.
-                exp.dataframe.drop(
-                    exp.dataframe[(exp.dataframe[column] < threshold) & nodata_index].index,
-                    inplace=True
-                )
+                rows_to_keep &= ~((exp.dataframe[column] < threshold) & nodata_mask)
             else:
-                exp.dataframe.drop(
-                    exp.dataframe[(exp.dataframe[column] > threshold) & nodata_index].index,
-                    inplace=True
-                )
+                rows_to_keep &= ~((exp.dataframe[column] > threshold) & nodata_mask)
 
-        exp.dataframe.reset_index(drop=True, inplace=True)
-        exp.orig_data = exp.dataframe.copy()
+        has_default_index = exp.dataframe.index.equals(pd.RangeIndex(len(exp.dataframe.index)))
+        if not rows_to_keep.all() or not has_default_index:
+            exp.dataframe = exp.dataframe[rows_to_keep].reset_index(drop=True)
+        exp.orig_data = exp.dataframe
+        exp.invalidate_derived_views()
@@ -0,0 +1,87 @@
+import json
+from base64 import b64encode
+from collections import Counter
+
+import numpy as np
+
+# Data types of the typed arrays supported by plotly.js, see https://plotly.com/javascript/reference/
+TYPED_ARRAY_DTYPES = {
+    np.dtype('int8'): 'i1',
+    np.dtype('uint8'): 'u1',
+    np.dtype('int16'): 'i2',
+    np.dtype('uint16'): 'u2',
+    np.dtype('int32'): 'i4',
+    np.dtype('uint32'): 'u4',
+    np.dtype('float32'): 'f4',
+    np.dtype('float64'): 'f8',
+}
+
+
+class FigureJsonEncoder:
+    """
+    Serializes plotly figures that are built as plain dicts.
+
+    Numeric arrays are written as base64 typed arrays ({'dtype': 'f8', 'bdata': ...}), which plotly.js decodes
+    since version 2.28. They are written without a Python loop over the values and are smaller than decimal JSON text.
+    Typed arrays that occur in several traces, e.g. the utility that colors every subplot of a scatter matrix, are
+    written once to 'sharedArrays' and referenced as {'sharedArray': index}. resolveSharedArrays in discovery_utils.js
+    puts them back in place before plotting.
+    The figure dicts are not validated by plotly.py, so they must only use valid attributes.
+    """
+
+    @classmethod
+    def typed_array(cls, values):
+        array = np.asarray(values)
+        if array.dtype not in TYPED_ARRAY_DTYPES:
+            int32 = np.iinfo(np.int32)
+            if array.dtype.kind in 'iu' and (array.size == 0 or int32.min <= array.min() and array.max() <= int32.max):
+                array = array.astype(np.int32)
+            else:
+                array = array.astype(np.float64)
+        # plotly.js reads typed arrays in little-endian byte order
+        array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+
+        typed_array = {'dtype': TYPED_ARRAY_DTYPES[array.dtype.newbyteorder('=')],
+                       'bdata': b64encode(array.tobytes()).decode('ascii')}
+        if array.ndim > 1:
+            typed_array['shape'] = ','.join(str(size) for size in array.shape)
+        return typed_array
+
+    @classmethod
+    def dumps(cls, figure):
+        counts = Counter()
+        cls._visit_typed_arrays(figure['data'], lambda typed_array: counts.update([cls._key(typed_array)]))
+
+        shared_arrays, shared_indices = [], {}
+
+        def share(typed_array):
+            key = cls._key(typed_array)
+            if counts[key] < 2:
+                return typed_array
+            if key not in shared_indices:
+                shared_indices[key] = len(shared_arrays)
+                shared_arrays.append(typed_array)
+            return {'sharedArray': shared_indices[key]}
+
+        figure = dict(figure, data=cls._visit_typed_arrays(figure['data'], share))
+        if shared_arrays:
+            figure['sharedArrays'] = shared_arrays
+        # The arrays are already strings, so the standard library only walks the few remaining attributes
+        return json.dumps(figure, separators=(',', ':'))
+
+    @classmethod
+    def _visit_typed_arrays(cls, value, function):
+        """
+        Return a copy of the value with every typed array replaced by the result of the function.
+        """
+        if isinstance(value, dict):
+            if 'bdata' in value:
+                return function(value)
+            return {key: cls._visit_typed_arrays(item, function) for key, item in value.items()}
+        if isinstance(value, list):
+            return [cls._visit_typed_arrays(item, function) for item in value]
+        return value
+
+    @classmethod
+    def _key(cls, typed_array):
+        return typed_array['dtype'], typed_array['bdata'], typed_array.get('shape')
@@ -0,0 +1,79 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# Number of fitted experiments kept in memory. Set to 0 to disable caching.
+MAX_CACHED_FITS = int(os.getenv('SLAMD_FITTED_MODEL_CACHE_SIZE', 8))
+
+
+@dataclass
+class CachedFit:
+    regressors: list = field(default_factory=list)
+    predictions: np.ndarray = None
+    uncertainties: np.ndarray = None
+
+
+class FittedModelCache:
+    """
+    Bounded LRU cache of fitted regressors and their predictions.
+
+    Curiosity, weights and thresholds only influence the utility, not the fit. Re-running an experiment
+    on the same data with the same model and features can therefore reuse the previous fit.
+    """
+
+    _entries = OrderedDict()
+    _lock = threading.Lock()
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def create_key(cls, model, feature_names, target_names, features, targets):
+        digest = hashlib.sha256()
+        digest.update(repr((model, list(feature_names), list(target_names))).encode())
+        for array in (features, targets):
+            array = np.ascontiguousarray(array)
+            digest.update(repr((array.shape, array.dtype.str)).encode())
+            digest.update(array.tobytes())
+        return digest.hexdigest()
+
+    @classmethod
+    def get(cls, key):
+        """
+        Return a copy of the cached fit for the given key or None if it is not cached.
+        The arrays are copied so that callers cannot modify the cached values.
+        """
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry is None:
+                cls.misses += 1
+                return None
+            cls._entries.move_to_end(key)
+            cls.hits += 1
+        return CachedFit(entry.regressors, entry.predictions.copy(), entry.uncertainties.copy())
+
+    @classmethod
+    def put(cls, key, cached_fit):
+        if MAX_CACHED_FITS <= 0:
+            return
+        with cls._lock:
+            cls._entries[key] = CachedFit(cached_fit.regressors, cached_fit.predictions.copy(),
+                                          cached_fit.uncertainties.copy())
+            cls._entries.move_to_end(key)
+            while len(cls._entries) > MAX_CACHED_FITS:
+                cls._entries.popitem(last=False)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
+            cls.hits = 0
+            cls.misses = 0
+
+    @classmethod
+    def stats(cls):
+        with cls._lock:
+            return {'hits': cls.hits, 'misses': cls.misses, 'size': len(cls._entries)}
@@ -0,0 +1,114 @@
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.pipeline import Pipeline
+
+# Number of optimized kernels kept in memory. Set to 0 to disable warm starts.
+MAX_WARM_STARTS = int(os.getenv('SLAMD_KERNEL_WARM_START_STORE_SIZE', 64))
+# Up to this fraction of new labelled rows, the data counts as only slightly changed since the previous fit
+WARM_START_MAX_NEW_ROWS_FRACTION = float(os.getenv('SLAMD_WARM_START_MAX_NEW_ROWS_FRACTION', 0.2))
+# Number of random optimizer restarts used in addition to the warm start if the data only changed slightly
+WARM_START_RESTARTS = int(os.getenv('SLAMD_WARM_START_RESTARTS', 1))
+
+
+@dataclass
+class KernelWarmStart:
+    theta: np.ndarray = None
+    n_training_rows: int = 0
+
+
+class KernelWarmStartStore:
+    """
+    Bounded LRU store of the optimized kernel hyperparameters of Gaussian process fits.
+
+    Users run experiments on the same dataset again and again, adding a few labels in between. The optimum of
+    the previous run is then a good starting point for the kernel optimization. The hyperparameters are stored
+    per dataset lineage, model, features and target. The lineage stays the same when labels are added to a
+    dataset, while the fitted model cache only matches identical data.
+
+    The Gaussian process can also be the final step of a pipeline, e.g. after a PCA. Its hyperparameters are
+    additionally stored per number of features it is fitted with, because the PCA may keep a different number of
+    components when labels are added.
+    """
+
+    _entries = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def create_key(cls, dataset_lineage, model, feature_names, target_name):
+        if dataset_lineage is None:
+            return None
+        return dataset_lineage, model, tuple(feature_names), target_name
+
+    @classmethod
+    def warm_start(cls, key, regressor, training_rows):
+        """
+        Start the kernel optimization of the regressor from the hyperparameters stored for the key.
+        If the number of labelled rows only grew slightly, fewer random restarts are used.
+        Regressors other than Gaussian processes with hyperparameters to optimize are left unchanged.
+        """
+        gaussian_process, prefix = cls._find_gaussian_process(regressor)
+        if key is None or not cls._has_optimized_kernel(gaussian_process):
+            return regressor
+
+        with cls._lock:
+            if not any(entry_key[0] == key for entry_key in cls._entries):
+                return regressor
+        if isinstance(regressor, Pipeline):
+            # Only fit the steps before the Gaussian process if there is something to warm start
+            n_features = clone(regressor[:-1]).fit_transform(training_rows).shape[1]
+        else:
+            n_features = training_rows.shape[1]
+
+        with cls._lock:
+            entry = cls._entries.get((key, n_features))
+            if entry is None:
+                return regressor
+            cls._entries.move_to_end((key, n_features))
+
+        if entry.theta.shape != gaussian_process.kernel.theta.shape:
+            return regressor
+
+        params = {f'{prefix}kernel': gaussian_process.kernel.clone_with_theta(entry.theta)}
+        new_rows = len(training_rows) - entry.n_training_rows
+        if 0 <= new_rows <= max(1, WARM_START_MAX_NEW_ROWS_FRACTION * entry.n_training_rows):
+            params[f'{prefix}n_restarts_optimizer'] = min(gaussian_process.n_restarts_optimizer,
+                                                           WARM_START_RESTARTS)
+        return regressor.set_params(**params)
+
+    @classmethod
+    def remember(cls, key, fitted_regressor, n_training_rows):
+        gaussian_process, _ = cls._find_gaussian_process(fitted_regressor)
+        if key is None or MAX_WARM_STARTS <= 0 or not cls._has_optimized_kernel(gaussian_process):
+            return
+
+        entry_key = (key, gaussian_process.n_features_in_)
+        with cls._lock:
+            cls._entries[entry_key] = KernelWarmStart(gaussian_process.kernel_.theta.copy(), n_training_rows)
+            cls._entries.move_to_end(entry_key)
+            while len(cls._entries) > MAX_WARM_STARTS:
+                cls._entries.popitem(last=False)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
+
+    @classmethod
+    def _find_gaussian_process(cls, regressor):
+        """
+        Return the regressor or the final step of a pipeline together with the prefix of its parameter names.
+        """
+        if isinstance(regressor, Pipeline):
+            return regressor.steps[-1][1], f'{regressor.steps[-1][0]}__'
+        return regressor, ''
+
+    @classmethod
+    def _has_optimized_kernel(cls, regressor):
+        return isinstance(regressor, GaussianProcessRegressor) and regressor.kernel is not None and \
+            regressor.optimizer is not None and regressor.kernel.n_dims > 0
@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterGrid, check_cv
+
+from slamd.common.error_handling import ExperimentCancelledException, SlamdUnprocessableEntityException
+from slamd.discovery.processing.models.tuning_summary import TuningSummary
+
+# Wall-clock budget in seconds for tuning a model during an experiment job. Set to 0 for no time limit.
+TUNING_TIME_BUDGET_SECONDS = float(os.getenv('SLAMD_TUNING_TIME_BUDGET', 0))
+
+
+class TuningBudget:
+    """
+    Deadline and cancellation flag shared between a running experiment and the code that started it.
+    Both are checked cooperatively: work that has already started is finished, but no new work is started once
+    the deadline has passed or the budget was cancelled.
+
+    The deadline is only set by start, so that the time a job waits in a queue does not count towards its budget.
+    """
+
+    def __init__(self, seconds=None):
+        self.seconds = seconds
+        self.deadline = None
+        self._cancelled = threading.Event()
+
+    def start(self):
+        self.deadline = None if not self.seconds else time.monotonic() + self.seconds
+        return self
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def expired(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def raise_if_cancelled(self):
+        if self.cancelled():
+            raise ExperimentCancelledException('The experiment was cancelled.')
+
+
+class BudgetedGridSearch:
+    """
+    Replacement for GridSearchCV(refit=False) that respects a TuningBudget.
+
+    The candidates of the grid are evaluated one after another, ordered by the expected cost given by cost_key,
+    and the search stops as soon as the deadline has passed. The best candidate found so far is returned together
+    with a TuningSummary. If the deadline passed before any candidate was evaluated, there is no such candidate and
+    a SlamdUnprocessableEntityException is raised. Without a deadline all candidates are evaluated and the best parameters are the same as
+    those found by GridSearchCV with the same cv and scoring.
+    """
+
+    @classmethod
+    def search(cls, estimator, param_grid, training_rows, training_labels, budget, cost_key,
+               scoring='r2', cv=4, n_jobs=1):
+        # Remember the position in the grid: ties are resolved in grid order like GridSearchCV does
+        candidates = sorted(enumerate(ParameterGrid(param_grid)), key=lambda candidate: cost_key(candidate[1]))
+        splits = list(check_cv(cv, training_labels, classifier=False).split(training_rows, training_labels))
+        scorer = get_scorer(scoring)
+
+        summary = TuningSummary(total_candidates=len(candidates))
+        best_position, best_params = None, None
+        for position, params in candidates:
+            budget.raise_if_cancelled()
+            if budget.expired():
+                summary.truncated = True
+                break
+
+            score = cls._evaluate_candidate(estimator, params, training_rows, training_labels, splits, scorer,
+                                            budget, n_jobs)
+            if score is None:
+                # The budget ran out while the candidate was evaluated, its score is incomplete
+                budget.raise_if_cancelled()
+                summary.truncated = True
+                break
+
+            summary.evaluated_candidates += 1
+            if np.isnan(score):
+                continue
+            if summary.best_score is None or score > summary.best_score or \
+                    (score == summary.best_score and position < best_position):
+                summary.best_score, best_position, best_params = score, position, params
+
+        if summary.evaluated_candidates == 0:
+            raise SlamdUnprocessableEntityException(
+                'The time budget for tuning the model ran out before any of its configurations could be evaluated. '
+                'Increase the tuning time budget or choose a model without tuning.')
+        if best_params is None:
+            # Every evaluated candidate failed. Use the cheapest one, which was evaluated first.
+            best_params = candidates[0][1]
+        return best_params, summary
+
+    @classmethod
+    def _evaluate_candidate(cls, estimator, params, training_rows, training_labels, splits, scorer, budget,
+                            n_jobs):
+        """
+        Return the mean score of the candidate over all splits, or None if the budget ran out in between.
+        """
+        scores = Parallel(n_jobs=n_jobs, return_as='generator')(
+            delayed(cls._score_split)(clone(estimator).set_params(**params), training_rows, training_labels,
+                                      train, test, scorer)
+            for train, test in splits
+        )
+
+        completed_scores = []
+        for score in scores:
+            completed_scores.append(score)
+            if len(completed_scores) < len(splits) and (budget.cancelled() or budget.expired()):
+                return None
+        return float(np.mean(completed_scores))
+
+    @classmethod
+    def _score_split(cls, estimator, training_rows, training_labels, train, test, scorer):
+        try:
+            estimator.fit(training_rows[train], training_labels[train])
+            return scorer(estimator, training_rows[test], training_labels[test])
+        except Exception:
+            # Same as error_score=np.nan in GridSearchCV
+            return np.nan
@@ -0,0 +1,43 @@
+import os
+import shutil
+
+from joblib import Memory
+
+from slamd.common.slamd_utils import create_private_directory
+
+# Directory for the fitted feature selectors of the tuned models. It is shared by all worker processes and only
+# accessible by the user running the app, because the cached selectors are unpickled from there.
+FEATURE_SELECTION_CACHE_DIRECTORY = os.getenv('SLAMD_FEATURE_SELECTION_CACHE_DIR',
+                                              os.path.join(os.getcwd(), 'slamd_data', 'feature_selection'))
+# Upper bound for the size of the cache on disk. The least recently used entries are removed first.
+# Set to 0 to disable caching.
+MAX_FEATURE_SELECTION_CACHE_BYTES = int(os.getenv('SLAMD_FEATURE_SELECTION_CACHE_BYTES', 256 * 1024 * 1024))
+
+
+class FeatureSelectionCache:
+    """
+    Memoizes the sequential feature selection of the tuned models.
+
+    The tuned models pass the joblib Memory returned by memory() to their Pipeline. The pipeline then caches
+    every fitted selector, keyed by a hash of its parameters and of the rows and labels it was fitted with.
+    Grid points that only differ in the parameters of the final estimator reuse the selection of each fold.
+    The search only fits on the folds, so the final fit of the chosen model on all labelled rows runs the selection
+    once more. That selection is cached as well and reused when the model is fitted again on the same data, e.g. in
+    a later experiment.
+    """
+
+    @classmethod
+    def memory(cls):
+        if MAX_FEATURE_SELECTION_CACHE_BYTES <= 0:
+            return None
+        return Memory(location=create_private_directory(FEATURE_SELECTION_CACHE_DIRECTORY), verbose=0)
+
+    @classmethod
+    def reduce_size(cls):
+        memory = cls.memory()
+        if memory is not None:
+            memory.reduce_size(bytes_limit=MAX_FEATURE_SELECTION_CACHE_BYTES)
+
+    @classmethod
+    def clear(cls):
+        shutil.rmtree(FEATURE_SELECTION_CACHE_DIRECTORY, ignore_errors=True)
@@ -0,0 +1,100 @@
+import os
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.tree import DecisionTreeRegressor
+from sklearn.utils import check_random_state
+from sklearn.utils.validation import check_is_fitted
+
+# Number of trees that are built or evaluated concurrently
+MAX_TREE_WORKERS = int(os.getenv('SLAMD_RANDOM_FOREST_WORKERS', os.cpu_count() or 1))
+# The jackknife estimates need many trees; lolo uses one tree per training row
+MIN_TREES = 64
+
+
+class JackknifeRandomForest(RegressorMixin, BaseEstimator):
+    """
+    Random forest of sklearn trees whose std is estimated like lolo's, without a JVM.
+
+    Every tree is fitted on a bootstrap sample of the training rows, which is given to the tree as sample weights
+    so that the number of times every row was drawn is known. The variance of the mean prediction is then estimated
+    from the predictions of the single trees with the bias-corrected jackknife-after-bootstrap and infinitesimal
+    jackknife estimates of Wager, Hastie and Efron (2014). Like lolo, the average of both estimates is used.
+    All estimates are computed with matrix products over trees, training rows and predicted rows.
+
+    By default there are as many trees as training rows (at least MIN_TREES), as in lolo.
+    """
+
+    def __init__(self, n_estimators=None, max_features=1.0, min_samples_leaf=1, max_depth=None, n_jobs=None,
+                 random_state=None):
+        self.n_estimators = n_estimators
+        self.max_features = max_features
+        self.min_samples_leaf = min_samples_leaf
+        self.max_depth = max_depth
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+
+    def fit(self, X, y):
+        X, y = self._validate_data(X, y, y_numeric=True, multi_output=True)
+        y = np.ravel(y)
+        rng = check_random_state(self.random_state)
+        n_rows = len(X)
+        n_estimators = self.n_estimators or max(MIN_TREES, n_rows)
+
+        # Draw all bootstrap samples and tree seeds up front: the forest does not depend on the number of workers
+        self.in_bag_counts_ = np.stack([np.bincount(rng.randint(n_rows, size=n_rows), minlength=n_rows)
+                                        for _ in range(n_estimators)]).astype(np.float64)
+        seeds = rng.randint(np.iinfo(np.int32).max, size=n_estimators)
+
+        self.estimators_ = Parallel(n_jobs=self._n_jobs(), prefer='threads')(
+            delayed(self._fit_tree)(X, y, counts, seed) for counts, seed in zip(self.in_bag_counts_, seeds)
+        )
+        return self
+
+    def predict(self, X, return_std=False):
+        check_is_fitted(self, 'estimators_')
+        X = self._validate_data(X, reset=False)
+
+        # Predictions of all trees, shape (n_trees, n_rows)
+        tree_predictions = np.stack(Parallel(n_jobs=self._n_jobs(), prefer='threads')(
+            delayed(tree.predict)(X) for tree in self.estimators_
+        ))
+        prediction = tree_predictions.mean(axis=0)
+
+        if not return_std:
+            return prediction
+        return prediction, np.sqrt(self._jackknife_variance(tree_predictions))
+
+    def _jackknife_variance(self, tree_predictions):
+        n_trees, n_training_rows = self.in_bag_counts_.shape
+        prediction = tree_predictions.mean(axis=0)
+        deviations = tree_predictions - prediction
+        # Monte Carlo noise of the finite forest, used for the bias corrections
+        tree_variance = np.einsum('bj,bj->j', deviations, deviations) / n_trees ** 2
+
+        # Infinitesimal jackknife: covariance between the in-bag counts of every training row and the predictions
+        count_deviations = self.in_bag_counts_ - self.in_bag_counts_.mean(axis=0)
+        covariances = count_deviations.T @ deviations / n_trees
+        variance_ij = np.einsum('ij,ij->j', covariances, covariances) - n_training_rows * tree_variance
+
+        # Jackknife-after-bootstrap: mean prediction of the trees that did not see a training row
+        out_of_bag = (self.in_bag_counts_ == 0).astype(np.float64)
+        n_out_of_bag = out_of_bag.sum(axis=0)
+        seen_by_all = n_out_of_bag == 0
+        out_of_bag_deviations = (out_of_bag.T @ deviations)[~seen_by_all] / n_out_of_bag[~seen_by_all, None]
+        n_jackknife_rows = len(out_of_bag_deviations)
+        variance_j = (n_jackknife_rows - 1) / max(n_jackknife_rows, 1) * \
+            np.einsum('ij,ij->j', out_of_bag_deviations, out_of_bag_deviations) - \
+            (np.e - 1) * n_training_rows * tree_variance
+
+        # The bias corrections can overshoot for very stable predictions
+        return np.clip((variance_ij + variance_j) / 2, 0, None)
+
+    def _fit_tree(self, X, y, counts, seed):
+        tree = DecisionTreeRegressor(max_features=self.max_features, min_samples_leaf=self.min_samples_leaf,
+                                     max_depth=self.max_depth, random_state=seed)
+        return tree.fit(X, y, sample_weight=counts)
+
+    def _n_jobs(self):
+        return self.n_jobs or MAX_TREE_WORKERS
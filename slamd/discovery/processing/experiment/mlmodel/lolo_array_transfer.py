@@ -0,0 +1,71 @@
+import threading
+from base64 import standard_b64decode
+from contextlib import contextmanager
+
+import numpy as np
+from py4j import protocol
+
+
+class LoloArrayTransfer:
+    """
+    Bulk transfer of float64 arrays between numpy and the lolo JVM behind the py4j gateway of lolopy.
+
+    Arrays are sent as one byte array per call that LoloPyDataLoader decodes with a ByteBuffer on the JVM side.
+    Every array is converted once into a contiguous little-endian float64 buffer, instead of being copied by
+    np.array, serialized again with tobytes and wrapped in a DataFrame on the way. Byte arrays returned by the JVM
+    (predictions, uncertainties and serialized models) are decoded by py4j with a Python loop over every single
+    byte. Within fast_byte_decoding, this loop is replaced by a single base64 decode that returns the same bytes.
+    The py4j converter is global to the process, so all other py4j calls, also those of other threads, keep using
+    the decoding of py4j. py4j reads the answer to a call in the thread that made the call.
+    """
+
+    _scope = threading.local()
+    _installed = False
+    _install_lock = threading.Lock()
+
+    @classmethod
+    def encode(cls, array):
+        return np.ascontiguousarray(array, dtype='<f8').tobytes()
+
+    @classmethod
+    def send_feature_array(cls, gateway, rows):
+        rows = np.asarray(rows)
+        return gateway.jvm.io.citrine.lolo.util.LoloPyDataLoader.getFeatureArray(
+            cls.encode(rows), rows.shape[1], False)
+
+    @classmethod
+    def send_1d_array(cls, gateway, values):
+        return gateway.jvm.io.citrine.lolo.util.LoloPyDataLoader.get1DArray(cls.encode(np.ravel(values)), True, False)
+
+    @classmethod
+    def decode_bytes(cls, encoded, gateway_client=None):
+        return standard_b64decode(encoded)
+
+    @classmethod
+    @contextmanager
+    def fast_byte_decoding(cls):
+        """
+        Decode the byte arrays returned by the JVM to the current thread with a single base64 decode.
+        """
+        cls._install_converter()
+        previous = getattr(cls._scope, 'active', False)
+        cls._scope.active = True
+        try:
+            yield
+        finally:
+            cls._scope.active = previous
+
+    @classmethod
+    def _install_converter(cls):
+        with cls._install_lock:
+            if cls._installed:
+                return
+            py4j_converter = protocol.OUTPUT_CONVERTER[protocol.BYTES_TYPE]
+
+            def convert(encoded, gateway_client):
+                if getattr(cls._scope, 'active', False):
+                    return cls.decode_bytes(encoded, gateway_client)
+                return py4j_converter(encoded, gateway_client)
+
+            protocol.OUTPUT_CONVERTER[protocol.BYTES_TYPE] = convert
+            cls._installed = True
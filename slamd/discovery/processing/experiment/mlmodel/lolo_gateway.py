@@ -0,0 +1,125 @@
+import logging
+import os
+import sys
+import threading
+import time
+
+import lolopy.learners
+import lolopy.loloserver
+from py4j.java_gateway import JavaGateway, find_jar_path
+
+from slamd.common.error_handling import LoloNotAvailableException
+
+logger = logging.getLogger(__name__)
+
+# Jars shipped with the app, used if lolopy or py4j cannot find their own jars (e.g. in the PyInstaller bundle)
+SLAMD_JARS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..', 'jars'))
+BUNDLED_LOLO_JAR = os.path.join(SLAMD_JARS_DIR, 'lolo-0.7.3.jar')
+BUNDLED_PY4J_JAR = os.path.join(SLAMD_JARS_DIR, 'py4j-0.10.9.7.jar')
+# Start the JVM in a background thread when the app starts instead of on the first lolo model
+LOLO_WARM_UP = os.getenv('SLAMD_LOLO_WARM_UP', 'false').lower() == 'true'
+
+STOPPED = 'stopped'
+STARTING = 'starting'
+RUNNING = 'running'
+FAILED = 'failed'
+
+
+class LoloGateway:
+    """
+    The py4j gateway to the JVM running lolo, shared by all lolo models of the process.
+
+    The JVM is only started when the first lolo model is created or unpickled, so app starts, test runs and worker
+    processes that never use a lolo model do not pay for it. With SLAMD_LOLO_WARM_UP=true the JVM is started in a
+    background thread when the app starts instead. py4j gateways can be used from several threads; the lock only
+    guarantees that a single JVM is started. If the start fails, the next lolo model tries again.
+    """
+
+    _gateway = None
+    _state = STOPPED
+    _error = None
+    _startup_seconds = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def install(cls):
+        """
+        Let lolopy use this gateway instead of launching its own one.
+        """
+        lolopy.learners.get_java_gateway = cls.get
+
+    @classmethod
+    def get(cls, *args, **kwargs):
+        if cls._gateway is not None:
+            return cls._gateway
+
+        with cls._lock:
+            if cls._gateway is None:
+                cls._start()
+        if cls._gateway is None:
+            raise LoloNotAvailableException(
+                message=f'The lolo Random Forest is not available because Java could not be started: {cls._error}. '
+                        f'Please choose another model, e.g. the Random Forest that runs without Java.')
+        return cls._gateway
+
+    @classmethod
+    def warm_up(cls):
+        thread = threading.Thread(target=cls._warm_up, name='lolo-warm-up', daemon=True)
+        thread.start()
+        return thread
+
+    @classmethod
+    def get_status(cls):
+        return {
+            'state': cls._state,
+            'startup_seconds': cls._startup_seconds,
+            'error': cls._error,
+        }
+
+    @classmethod
+    def shutdown(cls):
+        with cls._lock:
+            if cls._gateway is not None:
+                cls._gateway.shutdown()
+            cls._gateway = None
+            lolopy.loloserver._lolopy_gateway = None
+            cls._state, cls._error, cls._startup_seconds = STOPPED, None, None
+
+    @classmethod
+    def _warm_up(cls):
+        try:
+            cls.get()
+        except LoloNotAvailableException:
+            logger.warning('Warming up the lolo JVM failed', exc_info=True)
+
+    @classmethod
+    def _start(cls):
+        cls._state, cls._error = STARTING, None
+        start = time.perf_counter()
+        try:
+            lolo_jar = cls._find_lolo_jar()
+            java_options = []
+            if 'LOLOPY_JVM_MEMORY' in os.environ:
+                java_options.append('-Xmx' + os.environ['LOLOPY_JVM_MEMORY'])
+            logger.info(f'Starting the lolo JVM with {lolo_jar}')
+            gateway = JavaGateway.launch_gateway(jarpath=find_jar_path() or BUNDLED_PY4J_JAR, classpath=lolo_jar,
+                                                 javaopts=java_options, redirect_stdout=sys.stdout,
+                                                 die_on_exit=True)
+        except Exception as e:
+            logger.exception('Starting the lolo JVM failed')
+            cls._state, cls._error, cls._startup_seconds = FAILED, str(e), None
+            return
+
+        cls._gateway = gateway
+        # Also share the gateway with parts of lolopy that do not use the learners, e.g. lolopy.metrics
+        lolopy.loloserver._lolopy_gateway = gateway
+        cls._state, cls._startup_seconds = RUNNING, time.perf_counter() - start
+
+    @classmethod
+    def _find_lolo_jar(cls):
+        if os.getenv('SLAMD_LOLO_JAR'):
+            return os.path.abspath(os.getenv('SLAMD_LOLO_JAR'))
+        try:
+            return lolopy.loloserver.find_lolo_jar(skip_devel_version=True)
+        except RuntimeError:
+            return BUNDLED_LOLO_JAR
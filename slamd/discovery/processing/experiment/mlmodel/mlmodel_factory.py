@@ -1,28 +1,28 @@
 import numpy as np
-from sklearn.gaussian_process import GaussianProcessRegressor
 from sklearn.gaussian_process.kernels import RBF, ConstantKernel
 from sklearn.decomposition import PCA
 from sklearn.pipeline import Pipeline
 
 from slamd.common.error_handling import ValueNotSupportedException
+from slamd.discovery.processing.experiment.mlmodel.jackknife_random_forest import JackknifeRandomForest
+from slamd.discovery.processing.experiment.mlmodel.slamd_gaussian_process_regressor import SlamdGaussianProcessRegressor
 from slamd.discovery.processing.experiment.mlmodel.slamd_random_forest import SlamdRandomForest
+from slamd.discovery.processing.experiment.mlmodel.sparse_gaussian_process_regressor import \
+    SparseGaussianProcessRegressor
 from slamd.discovery.processing.experiment.mlmodel.tuned_gaussian_process_regressor import TunedGaussianProcessRegressor
 from slamd.discovery.processing.experiment.mlmodel.tuned_random_forest import TunedRandomForest
 from slamd.discovery.processing.experiment.experiment_model import ExperimentModel
-import os
-
-
-# Ensure Lolo jar path is available for lolopy
-os.environ['LOLO_JAR_PATH'] = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'libs', 'lolo-0.7.3.jar')
 
 
 class MLModelFactory:
 
     @classmethod
-    def initialize_model(cls, exp):
+    def initialize_model(cls, exp, tuning_budget=None):
         """
         Initialize the model given by the user. Return a sklearn Regressor.
         The model must be one of the entries defined in ExperimentModel.
+        If a TuningBudget is given, tuned models stop searching when it runs out and the summary of the search is
+        stored in exp.tuning_summary.
         """
       
         if exp.model == ExperimentModel.RANDOM_FOREST.value:
@@ -60,16 +60,22 @@ class MLModelFactory:
         elif exp.model == ExperimentModel.GAUSSIAN_PROCESS.value:
             # Hyperparameters from previous implementation of the app (Jupyter notebook).
             kernel = ConstantKernel(1.0, (1e-3, 1e3)) * RBF(10, (1e-2, 1e2))
-            regressor = GaussianProcessRegressor(kernel=kernel, n_restarts_optimizer=9, random_state=42)
+            regressor = SlamdGaussianProcessRegressor(kernel=kernel, n_restarts_optimizer=9, random_state=42)
         elif exp.model == ExperimentModel.PCA_GAUSSIAN_PROCESS.value:
             # These hyperparameters were found to be potentially interesting by running local experiments.
-            predictor = GaussianProcessRegressor(n_restarts_optimizer=3, random_state=42)
+            predictor = SlamdGaussianProcessRegressor(n_restarts_optimizer=3, random_state=42)
             pca = PCA(n_components=0.99)
             regressor = Pipeline([('pca', pca), ('pred', predictor)])
         elif exp.model == ExperimentModel.PCA_RANDOM_FOREST.value:
             predictor = SlamdRandomForest()
             pca = PCA(n_components=0.99)
             regressor = Pipeline([('pca', pca), ('pred', predictor)])
+        elif exp.model == ExperimentModel.SPARSE_GAUSSIAN_PROCESS.value:
+            # Exact Gaussian processes become impractical for a few thousand labelled rows
+            regressor = SparseGaussianProcessRegressor(random_state=42)
+        elif exp.model == ExperimentModel.JACKKNIFE_RANDOM_FOREST.value:
+            # Same uncertainty estimate as lolo, but without starting a JVM and copying the data to it
+            regressor = JackknifeRandomForest(random_state=42)
         elif exp.model in ExperimentModel.get_tuned_models():
             # These models only support one target for now. Validated user input in ExperimentPreprocessor.
             target = exp.target_names[0]
@@ -77,10 +83,13 @@ class MLModelFactory:
             training_rows = exp.features_df.loc[index_labelled].values
             training_labels = exp.targets_df.loc[index_labelled, target].values.reshape(-1, 1)
 
-            if exp.model == ExperimentModel.TUNED_GAUSSIAN_PROCESS.value:
-                regressor = TunedGaussianProcessRegressor.find_best_model(training_rows, training_labels)
+            tuned_model = TunedGaussianProcessRegressor \
+                if exp.model == ExperimentModel.TUNED_GAUSSIAN_PROCESS.value else TunedRandomForest
+            if tuning_budget is None:
+                regressor = tuned_model.find_best_model(training_rows, training_labels)
             else:
-                regressor = TunedRandomForest.find_best_model(training_rows, training_labels)
+                regressor, exp.tuning_summary = tuned_model.find_best_model_within_budget(
+                    training_rows, training_labels, tuning_budget)
         else:
             raise ValueNotSupportedException(message=f'Invalid model: {exp.model}')
 
@@ -0,0 +1,82 @@
+import os
+import warnings
+from functools import partial
+from numbers import Integral
+
+import numpy as np
+import scipy.optimize
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.utils import check_random_state
+
+# Maximum number of optimizer runs of a single fit that are performed concurrently. The ExperimentConductor sets
+# n_jobs=1 when it fits several targets in parallel.
+MAX_RESTART_WORKERS = int(os.getenv('SLAMD_GP_RESTART_WORKERS', min(4, os.cpu_count() or 1)))
+
+
+class SlamdGaussianProcessRegressor(GaussianProcessRegressor):
+    """
+    GaussianProcessRegressor that runs the optimizer restarts concurrently in a pool of threads.
+
+    sklearn draws the initial hyperparameters of every restart from the random state and optimizes one after
+    another. Here, the initial hyperparameters are drawn up front in the same order, and every run is a separate
+    fit without restarts whose optimizer starts from exactly these hyperparameters. The fit with the best
+    log-marginal likelihood is kept, choosing the first one on ties like sklearn. Only the public API of sklearn is
+    used and the runs use the same BLAS settings as a serial fit, so the result is identical to
+    GaussianProcessRegressor for a given random_state. Threads are used so that no data has to be copied to other
+    processes.
+    """
+
+    _parameter_constraints = {**GaussianProcessRegressor._parameter_constraints, 'n_jobs': [None, Integral]}
+
+    def __init__(self, kernel=None, *, alpha=1e-10, optimizer='fmin_l_bfgs_b', n_restarts_optimizer=0,
+                 normalize_y=False, copy_X_train=True, n_targets=None, random_state=None, n_jobs=None):
+        super().__init__(kernel=kernel, alpha=alpha, optimizer=optimizer, n_restarts_optimizer=n_restarts_optimizer,
+                         normalize_y=normalize_y, copy_X_train=copy_X_train, n_targets=n_targets,
+                         random_state=random_state)
+        self.n_jobs = n_jobs
+
+    def fit(self, X, y):
+        n_jobs = min(self.n_jobs or MAX_RESTART_WORKERS, self.n_restarts_optimizer + 1)
+        # Without a kernel, sklearn uses one with fixed hyperparameters that are not optimized.
+        # sklearn raises for infinite bounds when restarting.
+        if n_jobs <= 1 or self.kernel is None or self.optimizer is None or self.kernel.n_dims == 0 or \
+                not np.isfinite(self.kernel.bounds).all():
+            return super().fit(X, y)
+
+        # The first run starts from the hyperparameters of the kernel, the others from random ones drawn like sklearn
+        rng = check_random_state(self.random_state)
+        bounds = self.kernel.bounds
+        initial_thetas = [self.kernel.theta] + [rng.uniform(bounds[:, 0], bounds[:, 1])
+                                                for _ in range(self.n_restarts_optimizer)]
+        fits = Parallel(n_jobs=n_jobs, prefer='threads')(
+            delayed(self._fit_from)(X, y, initial_theta) for initial_theta in initial_thetas
+        )
+
+        best_fit = fits[int(np.argmax([fit.log_marginal_likelihood_value_ for fit in fits]))]
+        params = self.get_params(deep=False)
+        for name, value in vars(best_fit).items():
+            if name not in params:
+                setattr(self, name, value)
+        return self
+
+    def _fit_from(self, X, y, initial_theta):
+        # Setting the hyperparameters of the kernel would round them, so the optimizer gets them directly
+        regressor = clone(self).set_params(optimizer=partial(self._optimize, initial_theta=initial_theta),
+                                           n_restarts_optimizer=0, n_jobs=1)
+        return regressor.fit(X, y)
+
+    def _optimize(self, obj_func, kernel_theta, bounds, initial_theta):
+        if callable(self.optimizer):
+            return self.optimizer(obj_func, initial_theta, bounds=bounds)
+        if self.optimizer != 'fmin_l_bfgs_b':
+            raise ValueError(f'Unknown optimizer {self.optimizer}.')
+
+        # Same optimization as sklearn performs for fmin_l_bfgs_b
+        result = scipy.optimize.minimize(obj_func, initial_theta, method='L-BFGS-B', jac=True, bounds=bounds)
+        if not result.success:
+            warnings.warn(f'lbfgs failed to converge (status={result.status}): {result.message}',
+                          ConvergenceWarning, stacklevel=2)
+        return result.x, result.fun
@@ -1,25 +1,54 @@
 import numpy as np
-import pandas as pd
-import os
 
 from lolopy.learners import RandomForestRegressor
+from sklearn.base import BaseEstimator
 
-# 🧠 Force PyInstaller to detect jpype even if it's indirectly used
-import jpype
-from jpype import startJVM, isJVMStarted
+from slamd.discovery.processing.experiment.mlmodel.lolo_array_transfer import LoloArrayTransfer
+from slamd.discovery.processing.experiment.mlmodel.lolo_gateway import LoloGateway
 
-LOLO_JAR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'jars', 'lolo-0.7.3.jar'))
-
-if not isJVMStarted():
-    print(f"🧪 Starting JVM with: {LOLO_JAR}")
-    startJVM(classpath=[LOLO_JAR])
+# The JVM is started by the first SlamdRandomForest, not on import
+LoloGateway.install()
 
 LOLOPY_MINIMUM_DATA_POINTS = 8
 
 class SlamdRandomForest(RandomForestRegressor):
     def fit(self, X, y, weights=None, random_seed=42):
+        X = np.asarray(X)
+        y = np.ravel(y)
         if y.shape[0] < LOLOPY_MINIMUM_DATA_POINTS:
             X = np.tile(X, (4, 1))
-            y = np.tile(y, (4, 1))
-        y = pd.DataFrame(y)
-        return super().fit(X, y, weights, random_seed)
+            y = np.tile(y, 4)
+            weights = None if weights is None else np.tile(weights, 4)
+        with LoloArrayTransfer.fast_byte_decoding():
+            return super().fit(X, y, weights, random_seed)
+
+    def predict(self, X, return_std=False, return_cov_matrix=False):
+        with LoloArrayTransfer.fast_byte_decoding():
+            return super().predict(X, return_std, return_cov_matrix)
+
+    def _convert_training_data(self, X, y, weights=None):
+        # Send every array as one contiguous buffer instead of using the conversions of lolopy
+        if weights is None:
+            weights = np.ones(len(y))
+        X_java = LoloArrayTransfer.send_feature_array(self.gateway, X)
+        y_java = LoloArrayTransfer.send_1d_array(self.gateway, y)
+        w_java = LoloArrayTransfer.send_1d_array(self.gateway, weights)
+
+        training_data = self.gateway.jvm.io.citrine.lolo.util.LoloPyDataLoader.buildTrainingRows(X_java, y_java, w_java)
+        for array_java in [X_java, y_java, w_java]:
+            self.gateway.detach(array_java)
+        return training_data
+
+    def _convert_run_data(self, X):
+        return LoloArrayTransfer.send_feature_array(self.gateway, X)
+
+    def __getstate__(self):
+        # Same as in lolopy, but on a copy of the state: since Python 3.11 the state returned by BaseEstimator is
+        # the __dict__ of the learner itself, and lolopy would delete the gateway of the pickled learner.
+        state = dict(BaseEstimator.__getstate__(self))
+        del state['gateway']
+        if self.model_ is not None:
+            with LoloArrayTransfer.fast_byte_decoding():
+                state['model_'] = self.gateway.jvm.io.citrine.lolo.util.LoloPyDataLoader.serializeObject(
+                    self.model_, self._compress_level)
+        return state
@@ -0,0 +1,118 @@
+import numpy as np
+from scipy.linalg import cholesky, solve_triangular
+from sklearn.base import BaseEstimator, RegressorMixin, clone
+from sklearn.cluster import KMeans
+from sklearn.gaussian_process.kernels import RBF, ConstantKernel, WhiteKernel
+from sklearn.utils import check_random_state
+from sklearn.utils.validation import check_is_fitted
+
+from slamd.discovery.processing.experiment.mlmodel.slamd_gaussian_process_regressor import \
+    SlamdGaussianProcessRegressor
+
+# Added to the diagonal of the covariance of the inducing points for numerical stability
+JITTER = 1e-8
+
+
+class SparseGaussianProcessRegressor(RegressorMixin, BaseEstimator):
+    """
+    Gaussian process with inducing points for large labelled sets.
+
+    An exact Gaussian process needs O(n^3) time and O(n^2) memory for n labelled rows. This regressor summarizes
+    the labelled rows by n_inducing inducing points, placed at the k-means cluster centres of the rows, and needs
+    O(n m^2) time and O(n m) memory for m inducing points:
+
+    1. The kernel hyperparameters and the noise level are optimized with an exact Gaussian process on a random
+       subset of at most n_hyperparameter_rows rows.
+    2. The posterior is computed with the variational approximation of Titsias (2009), also known as SGPR.
+
+    The predictive std contains the part of the prior variance that the inducing points cannot explain, so it
+    grows back to the prior std far away from the inducing points instead of collapsing like a plain Nystroem or
+    subset-of-regressors approximation. Like the exact model, the std is that of the latent function without
+    the noise. With at least as many inducing points as rows, the prediction equals that of an exact Gaussian
+    process with the same kernel and noise level.
+    """
+
+    def __init__(self, kernel=None, n_inducing=256, n_hyperparameter_rows=512, n_restarts_optimizer=3,
+                 normalize_y=True, random_state=None):
+        self.kernel = kernel
+        self.n_inducing = n_inducing
+        self.n_hyperparameter_rows = n_hyperparameter_rows
+        self.n_restarts_optimizer = n_restarts_optimizer
+        self.normalize_y = normalize_y
+        self.random_state = random_state
+
+    def fit(self, X, y):
+        X, y = self._validate_data(X, y, y_numeric=True, multi_output=True)
+        y = y.reshape(len(y), -1)
+        if y.shape[1] != 1:
+            raise ValueError('SparseGaussianProcessRegressor only supports a single target.')
+        y = y[:, 0]
+        rng = check_random_state(self.random_state)
+
+        if self.normalize_y:
+            self._y_train_mean = y.mean()
+            self._y_train_std = y.std() if y.std() > 0 else 1.0
+        else:
+            self._y_train_mean, self._y_train_std = 0.0, 1.0
+        y = (y - self._y_train_mean) / self._y_train_std
+
+        self.kernel_, self.noise_level_ = self._optimize_hyperparameters(X, y, rng)
+        self.inducing_points_ = self._select_inducing_points(X, rng)
+        self._compute_posterior(X, y)
+        return self
+
+    def predict(self, X, return_std=False):
+        check_is_fitted(self, 'inducing_points_')
+        X = self._validate_data(X, reset=False)
+
+        # See the fit for the notation
+        projection = solve_triangular(self._L_mm, self.kernel_(self.inducing_points_, X), lower=True)
+        posterior_projection = solve_triangular(self._L_b, projection, lower=True)
+        y_mean = posterior_projection.T @ self._c * self._y_train_std + self._y_train_mean
+
+        if not return_std:
+            return y_mean
+
+        y_var = self.kernel_.diag(X) - np.einsum('ij,ij->j', projection, projection) + \
+            np.einsum('ij,ij->j', posterior_projection, posterior_projection)
+        y_std = np.sqrt(np.clip(y_var, 0, None)) * self._y_train_std
+        return y_mean, y_std
+
+    def _optimize_hyperparameters(self, X, y, rng):
+        kernel = ConstantKernel(1.0, (1e-3, 1e3)) * RBF(10, (1e-2, 1e2)) if self.kernel is None else self.kernel
+        noise_kernel = WhiteKernel(1e-2, (1e-8, 1e1))
+
+        rows = np.arange(len(X))
+        if len(X) > self.n_hyperparameter_rows:
+            rows = np.sort(rng.choice(len(X), self.n_hyperparameter_rows, replace=False))
+
+        gpr = SlamdGaussianProcessRegressor(kernel=clone(kernel) + noise_kernel, alpha=0,
+                                            n_restarts_optimizer=self.n_restarts_optimizer,
+                                            random_state=rng.randint(np.iinfo(np.int32).max))
+        gpr.fit(X[rows], y[rows])
+        return gpr.kernel_.k1, gpr.kernel_.k2.noise_level
+
+    def _select_inducing_points(self, X, rng):
+        unique_rows = np.unique(X, axis=0)
+        if len(unique_rows) <= self.n_inducing:
+            return unique_rows
+        k_means = KMeans(n_clusters=self.n_inducing, n_init=1, random_state=rng.randint(np.iinfo(np.int32).max))
+        return k_means.fit(X).cluster_centers_
+
+    def _compute_posterior(self, X, y):
+        """
+        With K_mm the covariance of the inducing points, K_mn the covariance between inducing points and rows
+        and the noise variance s2:
+            L_mm = chol(K_mm), A = L_mm^-1 K_mn / sqrt(s2), L_b = chol(I + A A^T), c = L_b^-1 A y / sqrt(s2)
+        The predictive mean at X* is then (L_b^-1 L_mm^-1 K_m*)^T c.
+        """
+        noise_std = np.sqrt(self.noise_level_)
+        k_mm = self.kernel_(self.inducing_points_)
+        k_mm[np.diag_indices_from(k_mm)] += JITTER * max(1.0, np.mean(np.diag(k_mm)))
+        self._L_mm = cholesky(k_mm, lower=True)
+
+        a = solve_triangular(self._L_mm, self.kernel_(self.inducing_points_, X), lower=True) / noise_std
+        b = a @ a.T
+        b[np.diag_indices_from(b)] += 1
+        self._L_b = cholesky(b, lower=True)
+        self._c = solve_triangular(self._L_b, a @ y, lower=True) / noise_std
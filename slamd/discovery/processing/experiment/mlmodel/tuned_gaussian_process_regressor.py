@@ -4,18 +4,15 @@ from sklearn.gaussian_process.kernels import RBF, ConstantKernel
 from sklearn.model_selection import GridSearchCV
 from sklearn.pipeline import Pipeline
 
+from slamd.discovery.processing.experiment.mlmodel.budgeted_grid_search import BudgetedGridSearch
+from slamd.discovery.processing.experiment.mlmodel.feature_selection_cache import FeatureSelectionCache
+
 
 class TunedGaussianProcessRegressor:
 
     @classmethod
     def find_best_model(cls, training_rows, training_labels):
-        sfs_gr_testing = SequentialFeatureSelector(estimator=cls._create_baseline_gpr_for_further_tuning(),
-                                                   forward=True,
-                                                   floating=False,
-                                                   scoring='r2',
-                                                   cv=None)
-        pipe = Pipeline([('sfs', sfs_gr_testing),
-                         ('gp2', cls._create_baseline_gpr_for_further_tuning())])
+        pipe = cls._create_pipeline()
         grid_search_cv = GridSearchCV(estimator=pipe,
                                       param_grid=cls._create_parameters_for_grid_search(),
                                       scoring='r2',
@@ -23,9 +20,42 @@ class TunedGaussianProcessRegressor:
                                       cv=4,
                                       refit=False)
         grid_search_cv = grid_search_cv.fit(training_rows, training_labels)
+        FeatureSelectionCache.reduce_size()
         # Return the best model found
         return pipe.set_params(**grid_search_cv.best_params_)
 
+    @classmethod
+    def find_best_model_within_budget(cls, training_rows, training_labels, budget):
+        """
+        Like find_best_model, but stop searching when the budget runs out.
+        Return the best model found so far and the TuningSummary of the search.
+        """
+        pipe = cls._create_pipeline()
+        best_params, summary = BudgetedGridSearch.search(pipe, cls._create_parameters_for_grid_search(),
+                                                         training_rows, training_labels, budget,
+                                                         cost_key=cls._estimate_cost, scoring='r2', cv=4, n_jobs=-1)
+        FeatureSelectionCache.reduce_size()
+        return pipe.set_params(**best_params), summary
+
+    @classmethod
+    def _create_pipeline(cls):
+        sfs_gr_testing = SequentialFeatureSelector(estimator=cls._create_baseline_gpr_for_further_tuning(),
+                                                   forward=True,
+                                                   floating=False,
+                                                   scoring='r2',
+                                                   cv=None)
+        return Pipeline([('sfs', sfs_gr_testing),
+                         ('gp2', cls._create_baseline_gpr_for_further_tuning())],
+                        memory=FeatureSelectionCache.memory())
+
+    @classmethod
+    def _estimate_cost(cls, params):
+        """
+        Forward selection dominates the cost and grows with the number of selected features.
+        An anisotropic kernel has one length scale per feature to optimize and is more expensive than an isotropic one.
+        """
+        return params['sfs__k_features'], params['gp2__kernel'].k2.anisotropic
+
     @classmethod
     def _create_baseline_gpr_for_further_tuning(cls):
         """
@@ -2,6 +2,8 @@ from mlxtend.feature_selection import SequentialFeatureSelector
 from sklearn.model_selection import GridSearchCV
 from sklearn.pipeline import Pipeline
 
+from slamd.discovery.processing.experiment.mlmodel.budgeted_grid_search import BudgetedGridSearch
+from slamd.discovery.processing.experiment.mlmodel.feature_selection_cache import FeatureSelectionCache
 from slamd.discovery.processing.experiment.mlmodel.slamd_random_forest import SlamdRandomForest
 
 
@@ -9,13 +11,7 @@ class TunedRandomForest:
 
     @classmethod
     def find_best_model(cls, training_rows, training_labels):
-        sfs_rf_testing = SequentialFeatureSelector(estimator=SlamdRandomForest(),
-                                                   forward=True,
-                                                   floating=False,
-                                                   scoring='r2',
-                                                   cv=None)
-        pipe = Pipeline([('sfs', sfs_rf_testing),
-                        ('rf2', SlamdRandomForest())])
+        pipe = cls._create_pipeline()
         grid_search_cv = GridSearchCV(estimator=pipe,
                                       param_grid=cls._create_parameters_for_grid_search(),
                                       scoring='r2',
@@ -24,9 +20,39 @@ class TunedRandomForest:
                                       refit=False)
 
         grid_search_cv = grid_search_cv.fit(training_rows, training_labels)
+        FeatureSelectionCache.reduce_size()
         # Return the best model found
         return pipe.set_params(**grid_search_cv.best_params_)
 
+    @classmethod
+    def find_best_model_within_budget(cls, training_rows, training_labels, budget):
+        """
+        Like find_best_model, but stop searching when the budget runs out.
+        Return the best model found so far and the TuningSummary of the search.
+        """
+        pipe = cls._create_pipeline()
+        best_params, summary = BudgetedGridSearch.search(pipe, cls._create_parameters_for_grid_search(),
+                                                         training_rows, training_labels, budget,
+                                                         cost_key=cls._estimate_cost, scoring='r2', cv=4, n_jobs=1)
+        FeatureSelectionCache.reduce_size()
+        return pipe.set_params(**best_params), summary
+
+    @classmethod
+    def _create_pipeline(cls):
+        sfs_rf_testing = SequentialFeatureSelector(estimator=SlamdRandomForest(),
+                                                   forward=True,
+                                                   floating=False,
+                                                   scoring='r2',
+                                                   cv=None)
+        return Pipeline([('sfs', sfs_rf_testing),
+                        ('rf2', SlamdRandomForest())],
+                        memory=FeatureSelectionCache.memory())
+
+    @classmethod
+    def _estimate_cost(cls, params):
+        # Forward selection dominates the cost and grows with the number of selected features
+        return params['sfs__k_features'], params['rf2__max_depth']
+
     @classmethod
     def _create_parameters_for_grid_search(cls):
         """
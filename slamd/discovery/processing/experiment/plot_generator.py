@@ -1,38 +1,62 @@
-import json
+import os
+from itertools import cycle
+
 import numpy as np
 import pandas as pd
-import plotly
-import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from sklearn.manifold import TSNE
+
+from slamd.discovery.processing.experiment.figure_json_encoder import FigureJsonEncoder
 
 UNCERTAINTY_COLUMN_PREFIX = 'Uncertainty ('
+# Named colorscales are resolved by the validation of plotly, which the traces skip
+PLASMA_COLORSCALE = go.scatter.Marker(colorscale='Plasma').to_plotly_json()['colorscale']
+# Larger sets of rows are downsampled to about this many points per subplot
+PLOT_POINT_BUDGET = int(os.getenv('SLAMD_PLOT_POINT_BUDGET', 5000))
+# Number of rows with the highest utility that are always plotted
+PLOT_TOP_UTILITY_ROWS = int(os.getenv('SLAMD_PLOT_TOP_UTILITY_ROWS', 500))
+# Traces with more points are drawn with WebGL
+WEBGL_POINT_THRESHOLD = int(os.getenv('SLAMD_PLOT_WEBGL_POINT_THRESHOLD', 2000))
 
 
 class PlotGenerator:
+    """
+    Creates the plots of the experiment results as JSON for plotly.js.
+
+    Only the layouts are built with plotly figure objects. The traces, which hold the data, are built as dicts
+    without the validation of plotly and serialized as typed arrays by the FigureJsonEncoder.
+
+    Browsers struggle with more than a few thousand points per subplot, so large sets of rows are plotted with a
+    level of detail: the rows with the highest utility and the labelled rows are always shown, the other rows are
+    thinned out on a grid over the plotted dimensions, which keeps the outline of the point cloud. Every subplot
+    shows the same rows, which keep their row numbers in the customdata.
+    """
 
     @classmethod
-    def create_target_scatter_plot(cls, plot_df):
+    def create_target_scatter_plot(cls, plot_df, point_budget=None):
         dimensions = [col for col in plot_df.columns if not col.startswith(UNCERTAINTY_COLUMN_PREFIX)]
         dimensions.remove('Utility')
         dimensions.remove('Row number')
 
+        n_rows = len(plot_df)
+        plot_df = cls._select_level_of_detail(plot_df, dimensions + ['Utility'], cls._top_utility_rows(plot_df),
+                                              point_budget or PLOT_POINT_BUDGET)
+        trace_type = cls._select_trace_type(len(plot_df))
+
         if len(dimensions) == 1:
             # Generate a simple scatter plot if there is only one target property.
             # We include the Utility color-coded for aesthetic reasons.
             fig = go.Figure()
-            scatter_plot = cls._create_scatter_plot(
+            traces = [cls._create_scatter_plot(
                 x=plot_df[dimensions[0]],
                 y=plot_df['Utility'],
                 color=plot_df['Utility'],
                 customdata=plot_df['Row number'],
-                error_x=cls._select_error_col_if_available(plot_df, dimensions[0])
-            )
-            fig.add_trace(scatter_plot)
-            fig.update_layout(title='Scatter plot of target properties')
-            fig.update_xaxes(title_text=dimensions[0])
-            fig.update_yaxes(title_text='Utility')
+                error_x=cls._select_error_col_if_available(plot_df, dimensions[0]),
+                trace_type=trace_type
+            )]
+            fig.update_layout(title='Scatter plot of target properties', xaxis_title_text=dimensions[0],
+                              yaxis_title_text='Utility')
         else:
             # General case
             # For n target properties and a priori information columns, we need a (n-1) x (n-1) matrix
@@ -50,6 +74,7 @@ class PlotGenerator:
             row_indices += 1
             col_indices += 1
 
+            traces = []
             for (row, col) in zip(row_indices, col_indices):
                 column_name = dimensions[col - 1]
                 row_name = dimensions[row]
@@ -60,6 +85,7 @@ class PlotGenerator:
                     customdata=plot_df['Row number'],
                     error_x=cls._select_error_col_if_available(plot_df, column_name),
                     error_y=cls._select_error_col_if_available(plot_df, row_name),
+                    trace_type=trace_type
                 )
                 if row == matrix_size:
                     # If on the bottom edge of the matrix
@@ -67,40 +93,68 @@ class PlotGenerator:
                 if col == 1:
                     # If on the left edge of the matrix
                     fig.update_yaxes(title_text=row_name, row=row, col=col)
-                # Add subplot at given position
-                fig.add_trace(scatter_plot, row=row, col=col)
+                # Add subplot at given position, e.g. the axes 'x2' and 'y2' for the layout axes 'xaxis2' and 'yaxis2'
+                subplot = fig.get_subplot(int(row), int(col))
+                scatter_plot['xaxis'] = subplot.xaxis.plotly_name.replace('axis', '')
+                scatter_plot['yaxis'] = subplot.yaxis.plotly_name.replace('axis', '')
+                traces.append(scatter_plot)
 
         fig.update_layout(height=1000)
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        if len(plot_df) < n_rows:
+            fig.update_layout(title_text=f'{fig.layout.title.text} ({len(plot_df)} of {n_rows} rows shown)')
+        return FigureJsonEncoder.dumps({'data': traces, 'layout': fig.layout.to_plotly_json()})
 
     @classmethod
-    def create_tsne_input_space_plot(cls, plot_df):
-        # The perplexity must be less than the number of data points (the length of the dataframe).
-        # Handle this edge case by picking the smallest of the two.
-        tsne = TSNE(n_components=2, verbose=1, perplexity=min(20, len(plot_df) - 1),
-                    n_iter=350, random_state=42, init='pca', learning_rate=100)
-        # Exclude the columns that do not belong to the features
-        tsne_result = tsne.fit_transform(plot_df.drop(columns=['Row number', 'Utility', 'is_train_data']))
-
-        tsne_result_df = pd.DataFrame(
-            {'Row number': plot_df['Row number'],
-             't-SNE-1': tsne_result[:, 0],
-             't-SNE-2': tsne_result[:, 1],
-             'Utility': plot_df['Utility'],
-             'is_train_data': plot_df['is_train_data']}
-        )
-        fig = px.scatter(tsne_result_df, x='t-SNE-1', y='t-SNE-2', color='Utility', symbol='is_train_data',
-                         custom_data=['Row number'],
-                         title='Materials data in t-SNE coordinates: train data and targets',
-                         symbol_sequence=['circle', 'cross'], render_mode="svg")
-        fig.update_traces(
-            hovertemplate='Row number: %{customdata}, Utility: %{marker.color:.2f}',
-            marker=dict(size=7)
-        )
+    def create_tsne_input_space_plot(cls, tsne_result_df, point_budget=None):
+        """
+        Plot the rows in the coordinates 't-SNE-1' and 't-SNE-2' computed by the TSNEEmbeddingCache.
+        The dataframe also contains the columns 'Row number', 'Utility' and 'is_train_data'.
+        """
+        n_rows = len(tsne_result_df)
+        keep = cls._top_utility_rows(tsne_result_df) | (tsne_result_df['is_train_data'] == 'Labelled').to_numpy()
+        tsne_result_df = cls._select_level_of_detail(tsne_result_df, ['t-SNE-1', 't-SNE-2'], keep,
+                                                     point_budget or PLOT_POINT_BUDGET)
+        trace_type = cls._select_trace_type(len(tsne_result_df))
+        title = 'Materials data in t-SNE coordinates: train data and targets'
+        if len(tsne_result_df) < n_rows:
+            title += f' ({len(tsne_result_df)} of {n_rows} rows shown)'
+
+        # Same figure as px.scatter(tsne_result_df, x='t-SNE-1', y='t-SNE-2', color='Utility', symbol='is_train_data',
+        # custom_data=['Row number'], symbol_sequence=['circle', 'cross']): one trace per value of is_train_data
+        traces = []
+        for symbol, (name, group) in zip(cycle(['circle', 'cross']),
+                                         tsne_result_df.groupby('is_train_data', sort=False)):
+            traces.append({
+                'type': trace_type,
+                'mode': 'markers',
+                'name': name,
+                'legendgroup': name,
+                'showlegend': True,
+                'orientation': 'v',
+                'x': FigureJsonEncoder.typed_array(group['t-SNE-1']),
+                'y': FigureJsonEncoder.typed_array(group['t-SNE-2']),
+                'xaxis': 'x',
+                'yaxis': 'y',
+                'customdata': FigureJsonEncoder.typed_array(group[['Row number']]),
+                'marker': {
+                    'color': FigureJsonEncoder.typed_array(group['Utility']),
+                    'coloraxis': 'coloraxis',
+                    'symbol': symbol,
+                    'size': 7
+                },
+                'hovertemplate': 'Row number: %{customdata}, Utility: %{marker.color:.2f}'
+            })
+
+        fig = go.Figure()
         fig.update_layout(
+            title=title,
             height=1000,
-            legend_title_text='',
+            xaxis=dict(anchor='y', domain=[0.0, 1.0], title_text='t-SNE-1'),
+            yaxis=dict(anchor='x', domain=[0.0, 1.0], title_text='t-SNE-2'),
+            coloraxis=dict(colorbar_title_text='Utility', colorscale=PLASMA_COLORSCALE),
             legend=dict(
+                title_text='',
+                tracegroupgap=0,
                 yanchor='top',
                 y=0.99,
                 xanchor='left',
@@ -108,44 +162,88 @@ class PlotGenerator:
             )
         )
 
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return FigureJsonEncoder.dumps({'data': traces, 'layout': fig.layout.to_plotly_json()})
 
     @classmethod
-    def _create_scatter_plot(cls, x=None, y=None, color=None, customdata=None, error_x=None, error_y=None):
-        return go.Scatter(
-            x=x,
-            y=y,
-            mode='markers',
+    def _create_scatter_plot(cls, x=None, y=None, color=None, customdata=None, error_x=None, error_y=None,
+                             trace_type='scatter'):
+        return {
+            'type': trace_type,
+            'x': FigureJsonEncoder.typed_array(x),
+            'y': FigureJsonEncoder.typed_array(y),
+            'mode': 'markers',
             # Manually configure marker size and legend and use the default colorscale for px
-            marker=dict(
-                size=7,
-                color=color,
-                colorbar=dict(
-                    title='Utility'
-                ),
-                colorscale='Plasma'
-            ),
-            customdata=customdata,
+            'marker': {
+                'size': 7,
+                'color': FigureJsonEncoder.typed_array(color),
+                'colorbar': {'title': {'text': 'Utility'}},
+                'colorscale': PLASMA_COLORSCALE
+            },
+            'customdata': FigureJsonEncoder.typed_array(customdata),
             # Add light gray error bars for both dimensions
-            error_x=dict(
-                type='data',
-                array=error_x,
-                color='lightgray',
-                thickness=1,
-            ),
-            error_y=dict(
-                type='data',
-                array=error_y,
-                color='lightgray',
-                thickness=1,
-            ),
+            'error_x': cls._create_error_bars(error_x),
+            'error_y': cls._create_error_bars(error_y),
             # Format tooltips for all cases rounding the displayed values to two decimal places.
-            hovertemplate='Row number: %{customdata}, X: %{x:.2f}, Y: %{y:.2f}, Utility: %{marker.color:.2f}',
+            'hovertemplate': 'Row number: %{customdata}, X: %{x:.2f}, Y: %{y:.2f}, Utility: %{marker.color:.2f}',
             # Make hover label have a black background
-            hoverlabel=dict(bgcolor='black'),
+            'hoverlabel': {'bgcolor': 'black'},
             # Remove default name 'trace0', 'trace1', ...
-            name=''
-        )
+            'name': ''
+        }
+
+    @classmethod
+    def _select_trace_type(cls, n_points):
+        return 'scattergl' if n_points > WEBGL_POINT_THRESHOLD else 'scatter'
+
+    @classmethod
+    def _top_utility_rows(cls, plot_df):
+        keep = np.zeros(len(plot_df), dtype=bool)
+        keep[np.argsort(-plot_df['Utility'].to_numpy(), kind='stable')[:PLOT_TOP_UTILITY_ROWS]] = True
+        return keep
+
+    @classmethod
+    def _select_level_of_detail(cls, plot_df, dimensions, keep, point_budget):
+        """
+        Return the rows to plot: all rows if they fit into the point budget. Otherwise the rows to keep and, for the
+        remaining budget, the row with the highest utility in every cell of a grid over the given dimensions.
+        The number of grid cells per dimension is the largest one with at most as many occupied cells as budget left.
+        """
+        if len(plot_df) <= point_budget:
+            return plot_df
+
+        rest = np.flatnonzero(~keep)
+        budget = point_budget - np.count_nonzero(keep)
+        selected = keep.copy()
+        if budget > 0 and len(rest) > 0:
+            points = plot_df[dimensions].to_numpy(dtype=float)[rest]
+            low, high = np.nanmin(points, axis=0), np.nanmax(points, axis=0)
+            points = np.nan_to_num((points - low) / np.where(high > low, high - low, 1))
+            # Sorted by utility, the first row of every cell is the one with the highest utility
+            order = np.argsort(-plot_df['Utility'].to_numpy()[rest], kind='stable')
+            points = points[order]
+
+            best_rows = order[:budget]
+            low_bins, high_bins = 1, budget
+            while low_bins <= high_bins:
+                bins = (low_bins + high_bins) // 2
+                cells = pd.DataFrame(np.minimum((points * bins).astype(np.int64), bins - 1))
+                # Hashing finds the first row of every cell without sorting the rows
+                first_rows = np.flatnonzero(~cells.duplicated().to_numpy())
+                if len(first_rows) <= budget:
+                    best_rows = order[first_rows]
+                    low_bins = bins + 1
+                else:
+                    high_bins = bins - 1
+            selected[rest[best_rows]] = True
+
+        return plot_df[selected]
+
+    @classmethod
+    def _create_error_bars(cls, errors):
+        error_bars = {'type': 'data', 'color': 'lightgray', 'thickness': 1}
+        if errors is not None:
+            error_bars['array'] = FigureJsonEncoder.typed_array(errors)
+        return error_bars
 
     @classmethod
     def _select_error_col_if_available(cls, plot_df, column_name=None):
@@ -0,0 +1,114 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+import numpy as np
+from sklearn.manifold import TSNE
+
+# Number of t-SNE embeddings kept in memory. Set to 0 to disable caching and background computation.
+MAX_CACHED_EMBEDDINGS = int(os.getenv('SLAMD_TSNE_CACHE_SIZE', 8))
+# Number of embeddings computed at the same time. Further embeddings wait in a queue.
+MAX_TSNE_WORKERS = int(os.getenv('SLAMD_TSNE_WORKERS', 1))
+
+
+class TSNEEmbeddingCache:
+    """
+    Bounded LRU cache of the 2-D t-SNE embeddings of normalized feature matrices.
+
+    The embedding only depends on the features, not on the predictions or the utility. Experiments submit their
+    features when they finish, so the embedding is computed in a background thread while the user looks at the
+    results. Reranking an experiment or running it again with other targets reuses the cached embedding.
+    Entries are futures, so a request for an embedding that is still being computed waits for it.
+    """
+
+    _entries = OrderedDict()
+    _lock = threading.Lock()
+    _executor = None
+
+    @classmethod
+    def create_key(cls, features):
+        features = cls._to_matrix(features)
+        digest = hashlib.sha256()
+        digest.update(repr((features.shape, features.dtype.str)).encode())
+        digest.update(features.tobytes())
+        return digest.hexdigest()
+
+    @classmethod
+    def submit(cls, features):
+        """
+        Start computing the embedding of the features in the background unless it is cached already.
+        Return the key to get the embedding with.
+        """
+        features = cls._to_matrix(features)
+        key = cls.create_key(features)
+        if MAX_CACHED_EMBEDDINGS <= 0:
+            return key
+
+        with cls._lock:
+            if key in cls._entries:
+                cls._entries.move_to_end(key)
+                return key
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=MAX_TSNE_WORKERS, thread_name_prefix='tsne')
+            cls._entries[key] = cls._executor.submit(cls.compute, features)
+            while len(cls._entries) > MAX_CACHED_EMBEDDINGS:
+                # An embedding that has not started yet would only delay the ones still in the cache
+                cls._entries.popitem(last=False)[1].cancel()
+        return key
+
+    @classmethod
+    def get(cls, key):
+        """
+        Return a copy of the embedding for the given key, waiting for it if it is still being computed.
+        Return None if it is not cached or was removed from the cache before it was computed. If computing the
+        embedding failed, the error is raised and the entry removed, so that the next request tries again.
+        """
+        with cls._lock:
+            future = cls._entries.get(key)
+            if future is None:
+                return None
+            cls._entries.move_to_end(key)
+
+        try:
+            return future.result().copy()
+        except CancelledError:
+            # Evicted or cleared while waiting, the embedding was never computed
+            return None
+        except Exception:
+            with cls._lock:
+                if cls._entries.get(key) is future:
+                    del cls._entries[key]
+            raise
+
+    @classmethod
+    def embed(cls, features):
+        """
+        Return the embedding of the features, from the cache if possible.
+        """
+        features = cls._to_matrix(features)
+        embedding = cls.get(cls.submit(features))
+        if embedding is None:
+            embedding = cls.compute(features)
+        return embedding
+
+    @classmethod
+    def compute(cls, features):
+        features = cls._to_matrix(features)
+        # The perplexity must be less than the number of data points (the length of the dataframe).
+        # Handle this edge case by picking the smallest of the two.
+        tsne = TSNE(n_components=2, verbose=1, perplexity=min(20, len(features) - 1),
+                    n_iter=350, random_state=42, init='pca', learning_rate=100)
+        return tsne.fit_transform(features)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            for future in cls._entries.values():
+                future.cancel()
+            cls._entries.clear()
+
+    @classmethod
+    def _to_matrix(cls, features):
+        return np.ascontiguousarray(features, dtype=np.float64)
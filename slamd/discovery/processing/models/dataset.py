@@ -1,4 +1,7 @@
+import hashlib
 from dataclasses import dataclass, field
+
+import pandas as pd
 from pandas import DataFrame
 
 
@@ -11,3 +14,13 @@ class Dataset:
     @property
     def columns(self):
         return list(self.dataframe.columns)
+
+    @property
+    def fingerprint(self):
+        """
+        Hash of the column names and the content of the dataframe. Changes whenever the data changes,
+        for instance after adding new target values.
+        """
+        digest = hashlib.sha256(repr(self.columns).encode())
+        digest.update(pd.util.hash_pandas_object(self.dataframe, index=True).values.tobytes())
+        return digest.hexdigest()
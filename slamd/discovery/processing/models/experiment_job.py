@@ -0,0 +1,34 @@
+from dataclasses import dataclass, field
+
+from pandas import DataFrame
+
+from slamd.discovery.processing.experiment.experiment_data import ExperimentData
+from slamd.discovery.processing.experiment.mlmodel.budgeted_grid_search import TuningBudget
+from slamd.discovery.processing.models.tsne_plot_data import TSNEPlotData
+
+QUEUED = 'queued'
+RUNNING = 'running'
+FINISHED = 'finished'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+
+@dataclass
+class ExperimentJob:
+    job_id: str = None
+    # ID of the dataset store of the session that submitted the job. Other sessions cannot access the job.
+    owner: str = None
+    dataset_name: str = None
+    dataset_fingerprint: str = None
+    request_body: dict = None
+    status: str = QUEUED
+    # For every stage of the experiment the number of completed and total steps
+    progress: dict = field(default_factory=dict)
+    error: Exception = None
+    # Time limit for tuning the model, also used to cancel the job
+    tuning_budget: TuningBudget = None
+
+    experiment: ExperimentData = None
+    dataframe: DataFrame = None
+    scatter_plot: str = None
+    tsne_plot_data: TSNEPlotData = None
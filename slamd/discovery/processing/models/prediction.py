@@ -8,3 +8,4 @@ class Prediction:
     dataset_used_for_prediction: str = ''
     dataframe: DataFrame = None
     metadata: dict = None
+    dataset_fingerprint: str = None
@@ -1,13 +1,16 @@
 from dataclasses import dataclass
 
-from pandas import DataFrame, Index, Series
+from pandas import Index, Series
 
 
 @dataclass
 class TSNEPlotData:
 
     utility: Series = None
-    features_df: DataFrame = None
+    # Key of the embedding of the normalized features in the TSNEEmbeddingCache
+    embedding_key: str = None
+    # Rows of the embedding
+    index: Index = None
     index_all_labelled: Index = None
     index_none_labelled: Index = None
-    index_partially_labelled: Index = None
\ No newline at end of file
+    index_partially_labelled: Index = None
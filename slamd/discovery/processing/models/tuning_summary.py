@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class TuningSummary:
+    evaluated_candidates: int = 0
+    total_candidates: int = 0
+    # True if the time budget ran out before all candidates of the grid were evaluated
+    truncated: bool = False
+    best_score: float = None
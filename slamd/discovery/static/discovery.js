@@ -72,7 +72,7 @@ async function tsnePlotListener() {
 
     if (response.ok) {
         const tsnePlotData = await response.json();
-        Plotly.plot("tsne-plot-placeholder", tsnePlotData.data, tsnePlotData.layout, {responsive: true});
+        Plotly.newPlot("tsne-plot-placeholder", resolveSharedArrays(tsnePlotData), tsnePlotData.layout, {responsive: true});
     } else {
         const error = await response.text();
         document.write(error);
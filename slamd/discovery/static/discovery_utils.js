@@ -81,8 +81,31 @@ function createRunExperimentRequest() {
     };
 }
 
+/**
+ * Arrays that occur in several traces are sent once in plotJson.sharedArrays and referenced as {sharedArray: index}.
+ * Put them back in place so that plotly.js can read the traces.
+ */
+function resolveSharedArrays(plotJson) {
+    const sharedArrays = plotJson.sharedArrays || [];
+
+    function resolve(value) {
+        if (Array.isArray(value)) {
+            return value.map(resolve);
+        }
+        if (value !== null && typeof value === "object") {
+            if (value.sharedArray !== undefined) {
+                return sharedArrays[value.sharedArray];
+            }
+            return Object.fromEntries(Object.entries(value).map(([key, item]) => [key, resolve(item)]));
+        }
+        return value;
+    }
+
+    return resolve(plotJson.data);
+}
+
 function plotJsonDataInPlaceholder(placeholderId) {
     const plotJson = JSON.parse(document.getElementById(placeholderId).textContent);
     removeInnerHtmlFromPlaceholder(placeholderId);
-    Plotly.plot(placeholderId, plotJson.data, plotJson.layout, {responsive: true});
+    Plotly.newPlot(placeholderId, resolveSharedArrays(plotJson), plotJson.layout, {responsive: true});
 }
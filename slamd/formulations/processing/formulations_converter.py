@@ -1,60 +1,166 @@
+import math
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
 from slamd.materials.processing.materials_facade import MaterialsFacade
 from slamd.common.ml_utils import from_list_of_dicts
 
 
 class FormulationsConverter:
     """
-    The parameter material_combinations is a list of tuples where each element in the list represents a variation of one
-    of the materials for a given type. E.g. if two powders P1 and P2, one liquid L and one aggregate A were chosen,
-    this list would contain two elements [(P1, L, A), (P2, L, A)]
+    The parameter materials is a list of lists where each inner list contains the variations of the materials for a
+    given type. Their product describes all material combinations. E.g. if two powders P1 and P2, one liquid L and one
+    aggregate A were chosen, materials is [[P1, P2], [L], [A]] and the combinations are [(P1, L, A), (P2, L, A)].
+    Every combination is paired with every entry of the weight data, giving one row of the formulation each.
     """
 
     @classmethod
-    def formulation_to_df(cls, material_combinations, weight_data):
-        all_rows = []
-        for material_combination in material_combinations:
+    def count_rows(cls, materials, weight_data):
+        return math.prod(len(materials_for_type) for materials_for_type in materials) * len(weight_data)
+
+    @classmethod
+    def formulation_to_df(cls, materials, weight_data, selected_rows=None):
+        """
+        Create the formulation dataframe column by column. If selected_rows (a sorted array of row numbers in
+        [0, count_rows)) is given, only these rows are created and their row numbers are used as index. The columns
+        are the same as those of the full formulation, also if some materials are not part of the selected rows.
+
+        The properties of every material combination are collected once and repeated for all of its weights.
+        Weight dependent columns (costs and CO2 footprint) are computed by multiplying whole columns with the
+        corresponding weight column.
+        """
+        if selected_rows is not None and len(selected_rows) == 0 and cls.count_rows(materials, weight_data) > 0:
+            # Like DataFrame.sample without any rows, keep the columns of the full formulation
+            return cls.formulation_to_df(materials, weight_data, [0]).iloc[0:0]
+
+        weights = [[float(weight) for weight in entry.split('/')] for entry in weight_data]
+
+        combination_rows = []
+        weight_indices = []
+        types = []
+        for material_combination, indices in cls._select_combinations(materials, len(weight_data), selected_rows):
             full_dict, types, names = MaterialsFacade.materials_formulation_as_dict(material_combination)
-            material_names = {'Materials': ', '.join(names)}
-            full_dict = {**material_names, **full_dict}
-            original_dict = full_dict.copy()
-
-            for weights in weight_data:
-                weight_dict = {}
-                for i, weight in enumerate(weights.split('/')):
-                    weight_dict[f'{types[i]} (kg)'] = float(weight)
-
-                    costs_for_type = full_dict.get(f'costs ({types[i]})', None)
-                    if costs_for_type:
-                        full_dict[f'costs ({types[i]})'] = full_dict[f'costs ({types[i]})'] * float(weight)
-
-                    co2_footprint_for_type = full_dict.get(f'co2_footprint ({types[i]})', None)
-                    if co2_footprint_for_type:
-                        full_dict[f'co2_footprint ({types[i]})'] = full_dict[f'co2_footprint ({types[i]})'] * float(weight)
-
-                all_rows.append({**weight_dict, **full_dict})
-                full_dict = original_dict.copy()
-        dataframe = from_list_of_dicts(all_rows)
+            combination_rows.append({'Materials': ', '.join(names), **full_dict})
+            weight_indices.append(indices)
+
+        if len(combination_rows) == 0:
+            return cls._postprocess_dataframe(from_list_of_dicts([]))
+
+        # Repeat the properties of every combination once per weight entry
+        repeats = [len(indices) for indices in weight_indices]
+        properties_df = from_list_of_dicts(combination_rows)
+        if selected_rows is not None:
+            properties_df = properties_df.reindex(columns=cls._columns_of_all_combinations(materials))
+        properties_df = properties_df.take(np.repeat(np.arange(len(combination_rows)), repeats))
+        properties_df.reset_index(drop=True, inplace=True)
+        weights_of_rows = np.array(weights)[np.concatenate(weight_indices)]
+
+        weight_columns = {}
+        for i, material_type in enumerate(types[:weights_of_rows.shape[1]]):
+            weight_columns[f'{material_type} (kg)'] = weights_of_rows[:, i]
+
+            for weighted_property in [f'costs ({material_type})', f'co2_footprint ({material_type})']:
+                if weighted_property in properties_df.columns:
+                    properties_df[weighted_property] = properties_df[weighted_property] * weights_of_rows[:, i]
+
+        weights_df = pd.DataFrame(weight_columns)
+        # A property with the same name as a weight column keeps the position of the weight but overrides its value
+        for column in weights_df.columns.intersection(properties_df.columns):
+            weights_df[column] = properties_df.pop(column)
+        dataframe = pd.concat([weights_df, properties_df], axis=1)
         dataframe = cls._postprocess_dataframe(dataframe)
+        if selected_rows is not None:
+            dataframe.index = pd.Index(selected_rows)
         return dataframe
 
+    @classmethod
+    def _columns_of_all_combinations(cls, materials):
+        """
+        Return the properties of all material combinations in the order in which they first appear in
+        product(*materials), i.e. the columns of a dataframe created from all combinations.
+        A property only appears if at least one material has a value for it, so the combinations are only iterated
+        until all of these properties were found.
+        """
+        possible_columns = {'Materials'}
+        for materials_for_type in materials:
+            for material in materials_for_type:
+                possible_columns.update(MaterialsFacade.materials_formulation_as_dict([material])[0])
+
+        columns = {'Materials': None}
+        for material_combination in product(*materials):
+            columns.update(dict.fromkeys(MaterialsFacade.materials_formulation_as_dict(material_combination)[0]))
+            if len(columns) == len(possible_columns):
+                break
+        return list(columns)
+
+    @classmethod
+    def _select_combinations(cls, materials, number_of_weights, selected_rows):
+        """
+        Yield every material combination together with the indices of the weights of its selected rows.
+        Combinations without any selected row are skipped without being built.
+        """
+        if selected_rows is None:
+            all_weight_indices = np.arange(number_of_weights)
+            for material_combination in product(*materials):
+                yield material_combination, all_weight_indices
+            return
+
+        combination_indices, weight_indices = np.divmod(np.asarray(selected_rows), number_of_weights)
+        unique_combination_indices, starts = np.unique(combination_indices, return_index=True)
+        ends = np.append(starts[1:], len(combination_indices))
+        for combination_index, start, end in zip(unique_combination_indices, starts, ends):
+            yield cls._combination_at(materials, combination_index), weight_indices[start:end]
+
+    @classmethod
+    def _combination_at(cls, materials, combination_index):
+        """
+        Return the element at the given position of product(*materials) without iterating over the product.
+        """
+        combination = []
+        for materials_for_type in reversed(materials):
+            combination_index, material_index = divmod(int(combination_index), len(materials_for_type))
+            combination.append(materials_for_type[material_index])
+        return tuple(reversed(combination))
+
     @classmethod
     def _postprocess_dataframe(cls, dataframe):
-        dataframe['total costs'] = dataframe.apply(
-            lambda row: round(cls._compute_sum(row, 'costs') / 1000, 2), axis=1)
-        dataframe['total co2_footprint'] = dataframe.apply(
-            lambda row: round(cls._compute_sum(row, 'co2_footprint') / 1000, 2), axis=1)
-        dataframe['total delivery_time '] = dataframe.apply(cls._compute_max, axis=1)
+        dataframe['total costs'] = cls._round(cls._compute_sum(dataframe, 'costs') / 1000)
+        dataframe['total co2_footprint'] = cls._round(cls._compute_sum(dataframe, 'co2_footprint') / 1000)
+        dataframe['total delivery_time '] = cls._compute_max(dataframe, 'delivery_time')
         dataframe = dataframe.loc[:, ~dataframe.columns.str.startswith('costs')]
         dataframe = dataframe.loc[:, ~dataframe.columns.str.startswith('co2_footprint')]
         dataframe = dataframe.loc[:, ~dataframe.columns.str.startswith('delivery_time')]
         return dataframe
 
     @classmethod
-    def _compute_sum(cls, row, property_name):
-        entries_for_property_name = {k: v for k, v in dict(row).items() if property_name in k}
-        return sum(entries_for_property_name.values())
+    def _compute_sum(cls, dataframe, property_name):
+        # Add the columns one after another to get exactly the same floating point result as summing up each row.
+        # Missing values propagate to the sum.
+        total = pd.Series(0, index=dataframe.index)
+        for column in dataframe.columns:
+            if property_name in column:
+                total = total + dataframe[column]
+        return total
+
+    @classmethod
+    def _compute_max(cls, dataframe, property_name):
+        # Maximum of 0 and all entries of a row. Missing values are ignored because comparisons with NaN are false.
+        maximum = np.zeros(len(dataframe.index))
+        any_entry_larger = False
+        for column in dataframe.columns:
+            if property_name in column:
+                values = dataframe[column].to_numpy(dtype='float64')
+                larger = values > maximum
+                maximum = np.where(larger, values, maximum)
+                any_entry_larger |= larger.any()
+        if not any_entry_larger:
+            # As with the builtin max, the result stays the integer 0
+            return pd.Series(0, index=dataframe.index)
+        return pd.Series(maximum, index=dataframe.index)
 
     @classmethod
-    def _compute_max(cls, row):
-        delivery_time_entries = {k: v for k, v in dict(row).items() if 'delivery_time' in k}
-        return max([0] + list(delivery_time_entries.values()))
+    def _round(cls, values):
+        # Python's round on floats is exact, numpy's rounding may differ in the last digit
+        return pd.Series([round(value, 2) for value in values.tolist()], index=values.index, dtype='float64')
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from itertools import product
+
+import numpy as np
 
 from slamd.common.common_validators import validate_ranges
 from slamd.common.error_handling import ValueNotSupportedException, SlamdRequestTooLargeException, \
@@ -10,7 +11,7 @@ from slamd.discovery.processing.discovery_facade import DiscoveryFacade
 from slamd.discovery.processing.models.dataset import Dataset
 from slamd.formulations.processing.forms.weights_form import WeightsForm
 from slamd.formulations.processing.formulations_converter import FormulationsConverter
-from slamd.formulations.processing.weight_input_preprocessor import MAX_NUMBER_OF_WEIGHTS, WeightInputPreprocessor
+from slamd.formulations.processing.weight_input_preprocessor import WeightInputPreprocessor
 from slamd.materials.processing.materials_facade import MaterialsFacade, MaterialsForFormulations
 
 WEIGHT_FORM_DELIMITER = '/'
@@ -77,22 +78,18 @@ class BuildingMaterialStrategy(ABC):
         materials_formulation_config = weights_request_data['materials_formulation_configuration']
         weight_constraint = weights_request_data['weight_constraint']
 
-        # the result of the computation contains a list of lists with each containing the weights in terms of the
-        # various materials used for blending; for example weight_combinations =
-        # "[['18.2', '15.2', '66.6'], ['18.2', '20.3', '61.5'], ['28.7', '15.2', '56.1']]"
+        # the result of the computation is a numeric array with one row per combination containing the weights in
+        # terms of the various materials used for blending; for example weight_combinations =
+        # [[18.2, 15.2, 66.6], [18.2, 20.3, 61.5], [28.7, 15.2, 56.1]]
         if empty(weight_constraint):
             raise ValueNotSupportedException('You must set a non-empty weight constraint!')
         else:
             weight_combinations = cls._get_constrained_weights(materials_formulation_config, weight_constraint)
 
-        if len(weight_combinations) > MAX_NUMBER_OF_WEIGHTS:
-            raise SlamdRequestTooLargeException(
-                f'Too many weights were requested. At most {MAX_NUMBER_OF_WEIGHTS} weights can be created!')
-
         weights_form = WeightsForm()
-        for i, entry in enumerate(weight_combinations):
+        for i, entry in enumerate(weight_combinations.tolist()):
             ratio_form_entry = weights_form.all_weights_entries.append_entry()
-            ratio_form_entry.weights.data = WEIGHT_FORM_DELIMITER.join(entry)
+            ratio_form_entry.weights.data = WEIGHT_FORM_DELIMITER.join(str(weight) for weight in entry)
             ratio_form_entry.idx.data = str(i)
         return weights_form
 
@@ -219,19 +216,28 @@ class BuildingMaterialStrategy(ABC):
         if len(processes) > 0:
             materials.append(processes)
 
-        combinations_for_formulations = list(product(*materials))
+        # Check the size of the request before creating any formulation
+        number_of_all_rows = FormulationsConverter.count_rows(materials, weights_data)
+        # Same number of rows as DataFrame.sample(frac=sampling_size)
+        number_of_rows = round(number_of_all_rows * sampling_size) if sampling_size < 1 else number_of_all_rows
+
+        number_of_previous_rows = len(previous_batch_df.dataframe.index) if previous_batch_df else 0
+        if number_of_previous_rows + number_of_rows > MAX_DATASET_SIZE:
+            raise SlamdRequestTooLargeException(
+                f'Formulation is too large. At most {MAX_DATASET_SIZE} rows can be created!')
 
-        dataframe = FormulationsConverter.formulation_to_df(combinations_for_formulations, weights_data)
+        selected_rows = None
         if sampling_size < 1:
-            dataframe = dataframe.sample(frac=sampling_size)
+            selected_rows = cls._sample_rows(number_of_all_rows, number_of_rows)
+
+        dataframe = FormulationsConverter.formulation_to_df(materials, weights_data, selected_rows)
+        if selected_rows is not None:
+            # Like DataFrame.sample, return the sampled rows in random order
+            dataframe = dataframe.sample(frac=1)
 
         if previous_batch_df:
             dataframe = concat(previous_batch_df.dataframe, dataframe)
 
-        if len(dataframe.index) > MAX_DATASET_SIZE:
-            raise SlamdRequestTooLargeException(
-                f'Formulation is too large. At most {MAX_DATASET_SIZE} rows can be created!')
-
         dataframe['Idx_Sample'] = range(0, len(dataframe))
         dataframe.insert(0, 'Idx_Sample', dataframe.pop('Idx_Sample'))
 
@@ -240,6 +246,16 @@ class BuildingMaterialStrategy(ABC):
 
         return dataframe
 
+    @classmethod
+    def _sample_rows(cls, number_of_all_rows, sample_size):
+        """
+        Draw sample_size distinct row numbers out of number_of_all_rows without materialising all row numbers.
+        The row numbers are sorted so that the formulation can be created in a single pass.
+        The generator is seeded from the global random state, which DataFrame.sample uses as well.
+        """
+        rng = np.random.default_rng(np.random.randint(np.iinfo(np.int32).max))
+        return np.sort(rng.choice(number_of_all_rows, size=sample_size, replace=False))
+
     @classmethod
     def _create_min_max_form_entry_internal(cls, entries, uuids, name, type, req_types, disabled_type):
         entry = entries.append_entry()
@@ -1,4 +1,9 @@
-from slamd.materials.processing.materials_facade import MaterialsFacade
+import math
+from itertools import islice
+
+import numpy as np
+
+from slamd.common.error_handling import SlamdRequestTooLargeException
 
 MAX_NUMBER_OF_WEIGHTS = 10000
 
@@ -7,20 +12,37 @@ class WeightInputPreprocessor:
 
     @classmethod
     def collect_weights(cls, formulation_config):
-        # Skip last entry - dependent aggregate or powder
-        return [cls._create_weights(entry) for entry in formulation_config[:-1]]
+        """
+        Create one numeric axis of weights per material. The last entry is skipped as it is the dependent
+        aggregate or powder. The size of the full weight grid is checked before any axis is built.
+        """
+        independent_configurations = formulation_config[:-1]
+        lengths = [cls._count_weights(entry) for entry in independent_configurations]
+        if math.prod(lengths) > MAX_NUMBER_OF_WEIGHTS:
+            raise SlamdRequestTooLargeException(
+                f'Too many weights were requested. At most {MAX_NUMBER_OF_WEIGHTS} weights can be created!')
+
+        return [cls._create_weights(entry, length) for entry, length in zip(independent_configurations, lengths)]
+
+    @classmethod
+    def _count_weights(cls, material_configuration):
+        # Counting stops as soon as the axis alone exceeds the maximum, so that huge requests are rejected quickly
+        return sum(1 for _ in islice(cls._weight_values(material_configuration), MAX_NUMBER_OF_WEIGHTS + 1))
 
     @classmethod
-    def _create_weights(cls, material_configuration):
-        values_for_given_material = []
+    def _create_weights(cls, material_configuration, length):
+        return np.fromiter(islice(cls._weight_values(material_configuration), length), dtype='float64', count=length)
+
+    @classmethod
+    def _weight_values(cls, material_configuration):
         current_value = float(material_configuration['min'])
         max_value = float(material_configuration['max'])
         increment = float(material_configuration['increment'])
 
         while current_value <= max_value:
-            values_for_given_material.append(str(round(current_value, 2)))
+            yield round(current_value, 2)
 
-            # Round to prevent floating point errors - everything happens with 2 decimals of precision anyway
+            # Round to prevent floating point errors - everything happens with 2 decimals of precision anyway.
+            # The running rounding accumulates, e.g. an increment of 0.333 gives 0.1, 0.43, 0.76, so it is kept
+            # instead of computing min + index * increment.
             current_value = round(current_value + increment, 2)
-
-        return values_for_given_material
@@ -1,82 +1,49 @@
-from functools import reduce
-from itertools import product
-
-from slamd.materials.processing.materials_facade import MaterialsFacade
+import numpy as np
 
 
 class WeightsCalculator:
+    """
+    The weights of all materials are combined into a numeric grid with one row per combination and one column per
+    material. The columns are ordered like the materials and the rows like itertools.product of the weight axes.
+    The last column holds the dependent weight which is computed for all rows at once.
+    """
 
     @classmethod
     def compute_full_concrete_weights_product(cls, all_materials_weights, weight_constraint):
-        independent_weights_product = cls._compute_independent_weights_product_for_concrete(all_materials_weights)
-
-        full_weights_product = []
-
-        for item in independent_weights_product:
-            entry_list = list(item)
-            dependent_weight = cls._compute_dependent_concrete_weight(entry_list, weight_constraint)
-
-            entry_list.append(str(dependent_weight))
-            full_weights_product.append(entry_list)
+        # The liquid weights are given as ratios of the powder weights
+        grid = cls._create_grid(all_materials_weights)
+        grid[:, 1] = cls._round(grid[:, 1] * grid[:, 0])
 
-        return full_weights_product
+        dependent_weights = cls._round(float(weight_constraint) - cls._sum_columns(grid))
+        return np.column_stack([grid, dependent_weights])
 
     @classmethod
     def compute_full_binder_weights_product(cls, all_materials_weights, weight_constraint):
-        independent_weights_product = cls._compute_independent_weights_data_product_for_binder(all_materials_weights)
-
-        full_weights_product = []
-
-        for item in independent_weights_product:
-            entry_list = list(item)
-            dependent_weight = cls._compute_dependent_binder_weight(entry_list, weight_constraint)
-
-            entry_list[0] = str(round(float(entry_list[0]) * dependent_weight, 2))
+        # The first column contains the liquid ratios in relation to the dependent powder weight
+        grid = cls._create_grid(all_materials_weights)
+        liquid_ratios = grid[:, 0].copy()
 
-            entry_list.append(str(dependent_weight))
-            full_weights_product.append(entry_list)
-
-        return full_weights_product
+        powder_masses = (float(weight_constraint) - cls._sum_columns(grid[:, 1:])) / (1 + liquid_ratios)
+        dependent_weights = cls._round(powder_masses)
+        grid[:, 0] = cls._round(liquid_ratios * dependent_weights)
+        return np.column_stack([grid, dependent_weights])
 
     @classmethod
-    def _compute_independent_weights_product_for_concrete(cls, all_materials_weights):
-        # "independent" is a slight misnomer as the liquid weights are defined in relation to the powder weights
-        # However, they are independent in the sense that they do not depend on the mass constraint
-        powder_weights = all_materials_weights[0]
-        liquid_weight_ratios = all_materials_weights[1]
-        remaining_weights = all_materials_weights[2:]
-
-        weights_product = []
-
-        for pw in powder_weights:
-            # They're strings - cast to float for multiplication, round, then cast back to string
-            liquid_weights = [str(round(float(lwr) * float(pw), 2)) for lwr in liquid_weight_ratios]
-            weights_product += list(product([pw], liquid_weights, *remaining_weights))
-
-        return weights_product
-
-    @classmethod
-    def _compute_independent_weights_data_product_for_binder(cls, all_materials_weights):
-        liquid_weight_ratios = all_materials_weights[0]
-        remaining_weights = all_materials_weights[1:len(all_materials_weights)]
-
-        return list(product(liquid_weight_ratios, *remaining_weights))
+    def _create_grid(cls, all_materials_weights):
+        if len(all_materials_weights) == 0:
+            return np.empty((1, 0))
+        mesh = np.meshgrid(*all_materials_weights, indexing='ij')
+        return np.column_stack([axis.ravel() for axis in mesh])
 
     @classmethod
-    def _compute_dependent_concrete_weight(cls, entry_list, weight_constraint):
-        sum_of_all = 0
-        dependent_weight = weight_constraint
-        for ratios in entry_list:
-            pieces = ratios.split('/')
-            if len(pieces) == 0:
-                sum_of_all += float(ratios[0])
-            else:
-                sum_of_all += sum([float(piece) for piece in pieces])
-            dependent_weight = (round(float(weight_constraint) - sum_of_all, 2))
-        return dependent_weight
+    def _sum_columns(cls, grid):
+        # Add the columns one after another to get the same floating point result as summing up each row
+        total = np.zeros(grid.shape[0])
+        for i in range(grid.shape[1]):
+            total = total + grid[:, i]
+        return total
 
     @classmethod
-    def _compute_dependent_binder_weight(cls, entry_list, weight_constraint):
-        non_powder_or_liquid_masses = [float(w) for w in entry_list[1:]]
-        powder_mass = (float(weight_constraint) - sum(non_powder_or_liquid_masses)) / (1 + float(entry_list[0]))
-        return round(powder_mass, 2)
+    def _round(cls, values):
+        # Python's round on floats is exact, numpy's rounding may differ in the last digit
+        return np.array([round(value, 2) for value in values.tolist()], dtype='float64')
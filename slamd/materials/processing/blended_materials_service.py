@@ -1,9 +1,8 @@
-from itertools import product
-
 from slamd.common.common_validators import min_max_increment_config_valid
 from slamd.common.error_handling import MaterialNotFoundException, ValueNotSupportedException, \
     SlamdRequestTooLargeException
 from slamd.common.slamd_utils import not_numeric
+from slamd.materials.processing.ratio_enumerator import RatioEnumerator
 from slamd.materials.processing.ratio_parser import RatioParser
 from slamd.materials.processing.forms.base_material_selection_form import BaseMaterialSelectionForm
 from slamd.materials.processing.forms.blending_name_and_type_form import BlendingNameAndTypeForm
@@ -73,17 +72,14 @@ class BlendedMaterialsService(MaterialsService):
         if not min_max_increment_config_valid(min_max_values_with_increments, 100):
             raise ValueNotSupportedException('Configuration of ratios is not valid!')
 
+        # Only the ratios summing up to 100 are enumerated, the full Cartesian product is never created
         all_values = cls._prepare_values_for_cartesian_product(min_max_values_with_increments)
-        cartesian_product = product(*all_values)
-        cartesian_product_list = list(cartesian_product)
-        valid_cartesian_product_list = [cartesian_product for cartesian_product in cartesian_product_list if
-                                        sum(cartesian_product) == 100]
-        if len(valid_cartesian_product_list) > MAX_NUMBER_OF_RATIOS:
+        if RatioEnumerator.count_ratios(all_values, 100, limit=MAX_NUMBER_OF_RATIOS + 1) > MAX_NUMBER_OF_RATIOS:
             raise SlamdRequestTooLargeException(
                 f'Too many blends were requested. At most {MAX_NUMBER_OF_RATIOS} ratios can be created!')
 
         ratio_form = RatioForm()
-        for ratio in valid_cartesian_product_list:
+        for ratio in RatioEnumerator.enumerate_ratios(all_values, 100):
             ratio_as_string = RatioParser.ratio_list_to_ratio_string(ratio)
             ratio_form_entry = ratio_form.all_ratio_entries.append_entry()
             ratio_form_entry.ratio.data = ratio_as_string
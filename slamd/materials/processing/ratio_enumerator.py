@@ -0,0 +1,64 @@
+from bisect import bisect_left, bisect_right
+
+# Tolerance for pruning partial sums. Pruning must never drop a ratio whose entries sum up to the total exactly,
+# so partial sums are only discarded if they miss the total by more than the accumulated floating point error.
+PRUNING_TOLERANCE = 1e-6
+
+
+class RatioEnumerator:
+    """
+    Enumerates the ratios of the Cartesian product of the given value lists whose entries sum up to the total,
+    without creating the whole product.
+
+    Each value list must be sorted in ascending order. The ratios are created in the same order as
+    itertools.product and the sum of a ratio is computed like the builtin sum, i.e. by adding up the entries
+    from left to right. Partial sums which cannot reach the total with the remaining value lists are pruned.
+    """
+
+    @classmethod
+    def count_ratios(cls, all_values, total, limit=None):
+        """
+        Count the valid ratios. If a limit is given, counting stops as soon as the limit is reached, so checking
+        against a maximum number of ratios does not depend on the size of the Cartesian product.
+        """
+        count = 0
+        for _ in cls.enumerate_ratios(all_values, total):
+            count += 1
+            if limit is not None and count >= limit:
+                break
+        return count
+
+    @classmethod
+    def enumerate_ratios(cls, all_values, total):
+        if len(all_values) == 0 or any(len(values) == 0 for values in all_values):
+            return
+
+        # Smallest and largest sum that the value lists from position i onwards can contribute
+        min_rest = [0] * (len(all_values) + 1)
+        max_rest = [0] * (len(all_values) + 1)
+        for i in reversed(range(len(all_values))):
+            min_rest[i] = min_rest[i + 1] + all_values[i][0]
+            max_rest[i] = max_rest[i + 1] + all_values[i][-1]
+
+        yield from cls._enumerate_from(all_values, total, min_rest, max_rest, 0, [], 0)
+
+    @classmethod
+    def _enumerate_from(cls, all_values, total, min_rest, max_rest, position, prefix, partial_sum):
+        values = all_values[position]
+        if position == len(all_values) - 1:
+            # Only values close to the missing amount can complete the ratio, find them by bisection
+            missing = total - partial_sum
+            start = bisect_left(values, missing - PRUNING_TOLERANCE)
+            end = bisect_right(values, missing + PRUNING_TOLERANCE)
+            for value in values[start:end]:
+                if partial_sum + value == total:
+                    yield tuple(prefix + [value])
+            return
+
+        lowest_value = total - max_rest[position + 1] - partial_sum - PRUNING_TOLERANCE
+        highest_value = total - min_rest[position + 1] - partial_sum + PRUNING_TOLERANCE
+        start = bisect_left(values, lowest_value)
+        end = bisect_right(values, highest_value)
+        for value in values[start:end]:
+            yield from cls._enumerate_from(all_values, total, min_rest, max_rest, position + 1, prefix + [value],
+                                           partial_sum + value)
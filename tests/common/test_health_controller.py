@@ -0,0 +1,12 @@
+from slamd.discovery.processing.experiment.mlmodel.lolo_gateway import LoloGateway
+
+
+def test_health_reports_state_of_lolo_jvm(client, monkeypatch):
+    monkeypatch.setattr(LoloGateway, 'get_status',
+                        lambda: {'state': 'running', 'startup_seconds': 1.5, 'error': None})
+
+    response = client.get('/health')
+
+    assert response.status_code == 200
+    assert response.json == {'status': 'ok',
+                             'lolo_jvm': {'state': 'running', 'startup_seconds': 1.5, 'error': None}}
@@ -1,4 +1,10 @@
-from slamd.common.slamd_utils import empty, not_empty, join_all, not_numeric, float_if_not_empty, str_if_not_none
+import os
+import stat
+
+import pytest
+
+from slamd.common.slamd_utils import empty, not_empty, join_all, not_numeric, float_if_not_empty, str_if_not_none, \
+    create_private_directory
 
 
 def test_empty_returns_true_when_input_is_none():
@@ -87,3 +93,21 @@ def test_not_numeric_is_false_for_comma_float_as_string_input():
 
 def test_not_numeric_is_true_for_non_number_input():
     assert not_numeric('abc') is True
+
+
+def test_create_private_directory_restricts_access_to_user(tmp_path):
+    path = tmp_path / 'shared'
+    os.makedirs(path)
+    os.chmod(path, 0o777)
+
+    create_private_directory(path)
+
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o700
+
+
+def test_create_private_directory_refuses_symbolic_links(tmp_path):
+    os.makedirs(tmp_path / 'target')
+    os.symlink(tmp_path / 'target', tmp_path / 'link')
+
+    with pytest.raises(PermissionError):
+        create_private_directory(tmp_path / 'link')
@@ -2,6 +2,12 @@ import pytest
 from flask_cors import CORS
 
 from slamd import create_app
+from slamd.discovery.processing import dataset_store
+from slamd.discovery.processing.dataset_store import DatasetStore
+from slamd.discovery.processing.experiment.fitted_model_cache import FittedModelCache
+from slamd.discovery.processing.experiment.kernel_warm_start_store import KernelWarmStartStore
+from slamd.discovery.processing.experiment.tsne_embedding_cache import TSNEEmbeddingCache
+from slamd.discovery.processing.experiment.mlmodel import feature_selection_cache
 
 
 @pytest.fixture()
@@ -20,3 +26,29 @@ def client(app):
 @pytest.fixture()
 def runner(app):
     return app.test_cli_runner()
+
+
+@pytest.fixture(autouse=True)
+def clear_fitted_model_cache():
+    # Experiments must not reuse fits or kernel hyperparameters from other tests
+    FittedModelCache.clear()
+    KernelWarmStartStore.clear()
+    TSNEEmbeddingCache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def dataset_store_directory(monkeypatch, tmp_path):
+    # Stored datasets must neither leak into other tests nor into the real store directory
+    monkeypatch.setattr(dataset_store, 'STORE_DIRECTORY', str(tmp_path / 'datasets'))
+    DatasetStore.clear_cache()
+    yield tmp_path / 'datasets'
+    DatasetStore.clear_cache()
+
+
+@pytest.fixture(autouse=True)
+def feature_selection_cache_directory(monkeypatch, tmp_path):
+    # Cached feature selections must not be reused across tests
+    monkeypatch.setattr(feature_selection_cache, 'FEATURE_SELECTION_CACHE_DIRECTORY',
+                        str(tmp_path / 'feature_selection'))
+    yield tmp_path / 'feature_selection'
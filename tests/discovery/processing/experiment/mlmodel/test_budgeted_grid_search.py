@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from sklearn.model_selection import GridSearchCV
+from sklearn.tree import DecisionTreeRegressor
+
+from slamd.common.error_handling import ExperimentCancelledException, SlamdUnprocessableEntityException
+from slamd.discovery.processing.experiment.mlmodel.budgeted_grid_search import BudgetedGridSearch, TuningBudget
+
+PARAM_GRID = {'max_depth': [1, 3, 5], 'min_samples_leaf': [1, 4]}
+
+
+def _create_training_data():
+    rng = np.random.default_rng(42)
+    training_rows = rng.uniform(size=(40, 3))
+    training_labels = training_rows[:, 0] * 3 + np.sin(training_rows[:, 1] * 6) + rng.normal(0, 0.1, 40)
+    return training_rows, training_labels
+
+
+def _cost_key(params):
+    return params['max_depth'], -params['min_samples_leaf']
+
+
+def test_search_without_deadline_finds_same_parameters_as_grid_search():
+    training_rows, training_labels = _create_training_data()
+    estimator = DecisionTreeRegressor(random_state=42)
+
+    grid_search_cv = GridSearchCV(estimator, PARAM_GRID, scoring='r2', cv=4, refit=False)
+    grid_search_cv.fit(training_rows, training_labels)
+
+    best_params, summary = BudgetedGridSearch.search(estimator, PARAM_GRID, training_rows, training_labels,
+                                                     TuningBudget(), _cost_key)
+
+    assert best_params == grid_search_cv.best_params_
+    assert summary.truncated is False
+    assert summary.evaluated_candidates == summary.total_candidates == 6
+    assert summary.best_score == pytest.approx(grid_search_cv.best_score_)
+
+
+def test_search_raises_if_budget_expired_before_any_candidate_was_evaluated(monkeypatch):
+    training_rows, training_labels = _create_training_data()
+    budget = TuningBudget()
+    monkeypatch.setattr(budget, 'expired', lambda: True)
+
+    with pytest.raises(SlamdUnprocessableEntityException):
+        BudgetedGridSearch.search(DecisionTreeRegressor(), PARAM_GRID, training_rows, training_labels, budget,
+                                  _cost_key)
+
+
+def test_search_stops_when_budget_runs_out_and_keeps_best_candidate_so_far(monkeypatch):
+    training_rows, training_labels = _create_training_data()
+    budget = TuningBudget()
+    calls = 0
+
+    def mock_expired():
+        # Enough time for the cross validation of two candidates with 4 splits each
+        nonlocal calls
+        calls += 1
+        return calls > 10
+
+    monkeypatch.setattr(budget, 'expired', mock_expired)
+
+    best_params, summary = BudgetedGridSearch.search(DecisionTreeRegressor(random_state=42), PARAM_GRID,
+                                                     training_rows, training_labels, budget, _cost_key)
+
+    assert summary.truncated is True
+    assert summary.evaluated_candidates == 2
+    assert best_params in [{'max_depth': 1, 'min_samples_leaf': 4}, {'max_depth': 1, 'min_samples_leaf': 1}]
+
+
+def test_search_raises_if_cancelled():
+    training_rows, training_labels = _create_training_data()
+    budget = TuningBudget()
+    budget.cancel()
+
+    with pytest.raises(ExperimentCancelledException):
+        BudgetedGridSearch.search(DecisionTreeRegressor(), PARAM_GRID, training_rows, training_labels, budget,
+                                  _cost_key)
+
+
+def test_tuning_budget_expires_after_given_seconds(monkeypatch):
+    assert TuningBudget().start().expired() is False
+    assert TuningBudget(0).start().expired() is False
+    assert TuningBudget(1e-9).start().expired() is True
+
+
+def test_tuning_budget_does_not_expire_before_it_was_started():
+    assert TuningBudget(1e-9).expired() is False
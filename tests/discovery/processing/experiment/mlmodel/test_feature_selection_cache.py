@@ -0,0 +1,98 @@
+import os
+import stat
+
+import numpy as np
+import pytest
+from mlxtend.feature_selection import SequentialFeatureSelector
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.model_selection import GridSearchCV
+from sklearn.pipeline import Pipeline
+
+from slamd.discovery.processing.experiment.mlmodel import feature_selection_cache
+from slamd.discovery.processing.experiment.mlmodel.feature_selection_cache import FeatureSelectionCache
+from slamd.discovery.processing.experiment.mlmodel.tuned_gaussian_process_regressor import \
+    TunedGaussianProcessRegressor
+from slamd.discovery.processing.experiment.mlmodel.tuned_random_forest import TunedRandomForest
+
+selector_fits = 0
+
+
+class CountingSequentialFeatureSelector(SequentialFeatureSelector):
+
+    def fit(self, X, y, groups=None, **fit_params):
+        global selector_fits
+        selector_fits += 1
+        return super().fit(X, y, groups, **fit_params)
+
+
+def _create_training_data():
+    rng = np.random.default_rng(42)
+    training_rows = rng.uniform(size=(24, 4))
+    training_labels = training_rows[:, 0] * 3 - training_rows[:, 2] + rng.normal(0, 0.1, 24)
+    return training_rows, training_labels
+
+
+def _run_grid_search(memory):
+    selector = CountingSequentialFeatureSelector(estimator=LinearRegression(), forward=True, floating=False,
+                                                 scoring='r2', cv=None)
+    pipe = Pipeline([('sfs', selector), ('ridge', Ridge())], memory=memory)
+    grid_search_cv = GridSearchCV(estimator=pipe,
+                                  param_grid={'sfs__k_features': [1, 2], 'ridge__alpha': [0.1, 1.0, 10.0]},
+                                  scoring='r2',
+                                  cv=4,
+                                  refit=False)
+    training_rows, training_labels = _create_training_data()
+    return grid_search_cv.fit(training_rows, training_labels)
+
+
+def test_grid_points_share_feature_selection_of_each_fold():
+    global selector_fits
+    selector_fits = 0
+
+    uncached = _run_grid_search(None)
+    uncached_fits = selector_fits
+
+    selector_fits = 0
+    cached = _run_grid_search(FeatureSelectionCache.memory())
+
+    # 2 values for k_features x 4 folds instead of 6 grid points x 4 folds
+    assert uncached_fits == 24
+    assert selector_fits == 8
+    assert cached.best_params_ == uncached.best_params_
+    np.testing.assert_allclose(cached.cv_results_['mean_test_score'], uncached.cv_results_['mean_test_score'])
+
+
+def test_repeated_search_reuses_all_feature_selections():
+    global selector_fits
+    _run_grid_search(FeatureSelectionCache.memory())
+
+    selector_fits = 0
+    _run_grid_search(FeatureSelectionCache.memory())
+
+    assert selector_fits == 0
+
+
+def test_cache_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(feature_selection_cache, 'MAX_FEATURE_SELECTION_CACHE_BYTES', 0)
+
+    assert FeatureSelectionCache.memory() is None
+    FeatureSelectionCache.reduce_size()
+
+
+def test_tuned_models_cache_feature_selection():
+    assert TunedGaussianProcessRegressor._create_pipeline().memory is not None
+    assert TunedRandomForest._create_pipeline().memory is not None
+
+
+def test_cache_directory_is_private(feature_selection_cache_directory):
+    FeatureSelectionCache.memory()
+
+    assert stat.S_IMODE(os.stat(feature_selection_cache_directory).st_mode) == 0o700
+
+
+def test_cache_directory_of_other_user_is_refused(monkeypatch, feature_selection_cache_directory):
+    os.makedirs(feature_selection_cache_directory)
+    monkeypatch.setattr(os, 'getuid', lambda: os.stat(feature_selection_cache_directory).st_uid + 1)
+
+    with pytest.raises(PermissionError):
+        FeatureSelectionCache.memory()
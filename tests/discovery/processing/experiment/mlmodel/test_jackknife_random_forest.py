@@ -0,0 +1,73 @@
+import numpy as np
+from sklearn.base import clone
+
+from slamd.discovery.processing.experiment.mlmodel.jackknife_random_forest import JackknifeRandomForest, MIN_TREES
+
+
+def _create_data(n_rows, noise=0.05, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = rng.uniform(size=(n_rows, 3))
+    labels = np.sin(3 * rows[:, 0]) + rows[:, 1] ** 2 + rng.normal(0, noise, n_rows)
+    return rows, labels
+
+
+def _jackknife_variance_with_loops(regressor, rows):
+    tree_predictions = np.array([tree.predict(rows) for tree in regressor.estimators_])
+    counts = regressor.in_bag_counts_
+    n_trees, n_training_rows = counts.shape
+    prediction = tree_predictions.mean(axis=0)
+    tree_variance = ((tree_predictions - prediction) ** 2).sum(axis=0) / n_trees ** 2
+
+    variance_ij = -n_training_rows * tree_variance
+    out_of_bag_means = []
+    for i in range(n_training_rows):
+        covariance = np.mean((counts[:, i, None] - counts[:, i].mean()) * (tree_predictions - prediction), axis=0)
+        variance_ij += covariance ** 2
+        if np.any(counts[:, i] == 0):
+            out_of_bag_means.append(tree_predictions[counts[:, i] == 0].mean(axis=0))
+    out_of_bag_means = np.array(out_of_bag_means)
+    n = len(out_of_bag_means)
+    variance_j = (n - 1) / n * ((out_of_bag_means - prediction) ** 2).sum(axis=0) - \
+        (np.e - 1) * n_training_rows * tree_variance
+    return np.clip((variance_ij + variance_j) / 2, 0, None)
+
+
+def test_jackknife_std_equals_definition():
+    training_rows, training_labels = _create_data(30)
+    test_rows, _ = _create_data(10, seed=1)
+
+    regressor = JackknifeRandomForest(random_state=42).fit(training_rows, training_labels)
+    prediction, std = regressor.predict(test_rows, return_std=True)
+
+    assert len(regressor.estimators_) == MIN_TREES
+    np.testing.assert_allclose(prediction, np.mean([tree.predict(test_rows) for tree in regressor.estimators_], 0))
+    np.testing.assert_allclose(std ** 2, _jackknife_variance_with_loops(regressor, test_rows), atol=1e-12)
+    np.testing.assert_array_equal(regressor.predict(test_rows), prediction)
+
+
+def test_random_forest_is_accurate_and_std_grows_with_noise():
+    test_rows, test_labels = _create_data(100, noise=0, seed=1)
+    stds = []
+    for noise in [0.01, 0.3]:
+        training_rows, training_labels = _create_data(200, noise=noise)
+        regressor = JackknifeRandomForest(max_features=1.0, random_state=42).fit(training_rows, training_labels)
+        prediction, std = regressor.predict(test_rows, return_std=True)
+        stds.append(std.mean())
+
+        assert len(regressor.estimators_) == 200
+        assert np.sqrt(np.mean((prediction - test_labels) ** 2)) < 0.2
+        assert np.all(std >= 0)
+
+    assert stds[0] < stds[1]
+
+
+def test_forest_does_not_depend_on_number_of_workers():
+    training_rows, training_labels = _create_data(50)
+
+    first = JackknifeRandomForest(n_estimators=20, n_jobs=1, random_state=42).fit(training_rows, training_labels)
+    second = clone(first).set_params(n_jobs=2).fit(training_rows, training_labels)
+
+    np.testing.assert_array_equal(first.in_bag_counts_, second.in_bag_counts_)
+    for first_result, second_result in zip(first.predict(training_rows, return_std=True),
+                                           second.predict(training_rows, return_std=True)):
+        np.testing.assert_array_equal(first_result, second_result)
@@ -0,0 +1,67 @@
+from base64 import standard_b64encode
+
+import numpy as np
+from lolopy.learners import RandomForestRegressor
+from py4j import protocol
+
+from slamd.discovery.processing.experiment.mlmodel.lolo_array_transfer import LoloArrayTransfer
+from slamd.discovery.processing.experiment.mlmodel.slamd_random_forest import SlamdRandomForest
+
+
+def test_encode_returns_contiguous_little_endian_float64_bytes():
+    rows = np.arange(12, dtype=np.int32).reshape(3, 4)[:, ::2]
+
+    encoded = LoloArrayTransfer.encode(rows)
+
+    np.testing.assert_array_equal(np.frombuffer(encoded, dtype='<f8'), [0, 2, 4, 6, 8, 10])
+
+
+def test_decode_bytes_equals_decoding_of_py4j():
+    payload = np.linspace(-1, 1, 100).tobytes()
+    encoded = standard_b64encode(payload).decode('ascii')
+
+    decoded = LoloArrayTransfer.decode_bytes(encoded)
+
+    assert decoded == protocol.decode_bytearray(encoded) == payload
+    assert type(decoded) is type(protocol.decode_bytearray(encoded))
+
+
+def test_fast_byte_decoding_is_limited_to_calls_within_context(monkeypatch):
+    gateway = SlamdRandomForest().gateway
+    values_java = LoloArrayTransfer.send_1d_array(gateway, np.linspace(0, 1, 50))
+    decoded = []
+    monkeypatch.setattr(LoloArrayTransfer, 'decode_bytes',
+                        lambda encoded, gateway_client=None: decoded.append(encoded) or protocol.decode_bytearray(encoded))
+
+    outside = gateway.jvm.io.citrine.lolo.util.LoloPyDataLoader.send1DArray(values_java)
+    with LoloArrayTransfer.fast_byte_decoding():
+        inside = gateway.jvm.io.citrine.lolo.util.LoloPyDataLoader.send1DArray(values_java)
+    gateway.detach(values_java)
+
+    assert len(decoded) == 1
+    assert inside == outside
+
+
+def test_arrays_arrive_unchanged_in_jvm():
+    gateway = SlamdRandomForest().gateway
+    values = np.linspace(0, 1, 50).reshape(-1, 1)
+
+    values_java = LoloArrayTransfer.send_1d_array(gateway, values)
+    returned = gateway.jvm.io.citrine.lolo.util.LoloPyDataLoader.send1DArray(values_java)
+    gateway.detach(values_java)
+
+    np.testing.assert_array_equal(np.frombuffer(returned, 'float'), values.ravel())
+
+
+def test_random_forest_predicts_same_as_lolopy():
+    rng = np.random.default_rng(0)
+    training_rows = rng.uniform(size=(30, 4))
+    training_labels = training_rows.sum(axis=1).reshape(-1, 1)
+    test_rows = rng.uniform(size=(10, 4))
+
+    regressor = SlamdRandomForest().fit(training_rows, training_labels)
+    expected = RandomForestRegressor().fit(training_rows, training_labels.ravel(), random_seed=42)
+
+    for result, expected_result in zip(regressor.predict(test_rows, return_std=True),
+                                       expected.predict(test_rows, return_std=True)):
+        np.testing.assert_array_equal(result, expected_result)
@@ -0,0 +1,89 @@
+import threading
+import time
+
+import lolopy.loloserver
+import pytest
+
+from slamd.common.error_handling import LoloNotAvailableException
+from slamd.discovery.processing.experiment.mlmodel import lolo_gateway
+from slamd.discovery.processing.experiment.mlmodel.lolo_gateway import LoloGateway
+
+
+class FakeGateway:
+
+    def __init__(self):
+        self.shut_down = False
+
+    def shutdown(self):
+        self.shut_down = True
+
+
+@pytest.fixture
+def stopped_gateway(monkeypatch):
+    # Do not touch the JVM that other tests share
+    for attribute in ['_gateway', '_state', '_error', '_startup_seconds']:
+        monkeypatch.setattr(LoloGateway, attribute, getattr(LoloGateway, attribute))
+    monkeypatch.setattr(lolopy.loloserver, '_lolopy_gateway', lolopy.loloserver._lolopy_gateway)
+    monkeypatch.setattr(LoloGateway, '_gateway', None)
+    monkeypatch.setattr(LoloGateway, '_state', lolo_gateway.STOPPED)
+    monkeypatch.setattr(LoloGateway, '_startup_seconds', None)
+
+    launches = []
+
+    def mock_launch_gateway(**kwargs):
+        time.sleep(0.05)
+        launches.append(kwargs)
+        return FakeGateway()
+
+    monkeypatch.setattr(lolo_gateway.JavaGateway, 'launch_gateway', mock_launch_gateway)
+    return launches
+
+
+def test_get_starts_a_single_gateway_for_all_threads(stopped_gateway):
+    assert LoloGateway.get_status()['state'] == lolo_gateway.STOPPED
+
+    gateways = []
+    threads = [threading.Thread(target=lambda: gateways.append(LoloGateway.get())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(stopped_gateway) == 1
+    assert len(set(map(id, gateways))) == 1
+    assert lolopy.loloserver._lolopy_gateway is gateways[0]
+    status = LoloGateway.get_status()
+    assert status['state'] == lolo_gateway.RUNNING
+    assert status['startup_seconds'] > 0
+
+
+def test_get_raises_exception_and_retries_if_start_fails(stopped_gateway, monkeypatch):
+    def mock_launch_gateway(**kwargs):
+        raise OSError('java not found')
+
+    with monkeypatch.context() as context:
+        context.setattr(lolo_gateway.JavaGateway, 'launch_gateway', mock_launch_gateway)
+        with pytest.raises(LoloNotAvailableException):
+            LoloGateway.get()
+
+    assert LoloGateway.get_status() == {'state': lolo_gateway.FAILED, 'startup_seconds': None,
+                                        'error': 'java not found'}
+    assert isinstance(LoloGateway.get(), FakeGateway)
+    assert LoloGateway.get_status()['state'] == lolo_gateway.RUNNING
+
+
+def test_warm_up_starts_gateway_in_background(stopped_gateway):
+    LoloGateway.warm_up().join()
+
+    assert len(stopped_gateway) == 1
+    assert LoloGateway.get_status()['state'] == lolo_gateway.RUNNING
+
+
+def test_shutdown_stops_gateway(stopped_gateway):
+    gateway = LoloGateway.get()
+
+    LoloGateway.shutdown()
+
+    assert gateway.shut_down
+    assert LoloGateway.get_status()['state'] == lolo_gateway.STOPPED
+    assert lolopy.loloserver._lolopy_gateway is None
@@ -5,10 +5,16 @@ from sklearn.pipeline import Pipeline
 
 from slamd.discovery.processing.experiment.experiment_data import ExperimentData
 from slamd.discovery.processing.experiment.experiment_model import ExperimentModel
+from slamd.discovery.processing.experiment.mlmodel.budgeted_grid_search import TuningBudget
+from slamd.discovery.processing.experiment.mlmodel.jackknife_random_forest import JackknifeRandomForest
 from slamd.discovery.processing.experiment.mlmodel.mlmodel_factory import MLModelFactory
+from slamd.discovery.processing.experiment.mlmodel.slamd_gaussian_process_regressor import SlamdGaussianProcessRegressor
 from slamd.discovery.processing.experiment.mlmodel.slamd_random_forest import SlamdRandomForest
+from slamd.discovery.processing.experiment.mlmodel.sparse_gaussian_process_regressor import \
+    SparseGaussianProcessRegressor
 from slamd.discovery.processing.experiment.mlmodel.tuned_gaussian_process_regressor import TunedGaussianProcessRegressor
 from slamd.discovery.processing.experiment.mlmodel.tuned_random_forest import TunedRandomForest
+from slamd.discovery.processing.models.tuning_summary import TuningSummary
 
 
 def _get_experiment_data(model):
@@ -27,7 +33,8 @@ def _get_experiment_data(model):
 
 def test_mlmodel_factory_returns_correct_model_type():
     models = ExperimentModel.get_all_models()
-    expected_types = [SlamdRandomForest, GaussianProcessRegressor, Pipeline, Pipeline]
+    expected_types = [SlamdRandomForest, SlamdGaussianProcessRegressor, Pipeline, Pipeline,
+                      SparseGaussianProcessRegressor, JackknifeRandomForest]
     assert len(models) == len(expected_types)
 
     for (model, expected_type) in zip(models, expected_types):
@@ -66,3 +73,19 @@ def test_mlmodel_factory_returns_correct_tuned_random_forest_regressor(monkeypat
     result = MLModelFactory.initialize_model(exp)
     assert type(result) == Pipeline
     assert mock_find_best_model_called is True
+
+
+def test_mlmodel_factory_tunes_model_within_budget_and_stores_summary(monkeypatch):
+    summary = TuningSummary(evaluated_candidates=2, total_candidates=4, truncated=True, best_score=0.5)
+    budget = TuningBudget(10)
+
+    def mock_find_best_model_within_budget(training_rows, training_labels, tuning_budget):
+        assert tuning_budget is budget
+        return Pipeline(('gp2', GaussianProcessRegressor())), summary
+
+    monkeypatch.setattr(TunedRandomForest, 'find_best_model_within_budget', mock_find_best_model_within_budget)
+
+    exp = _get_experiment_data(ExperimentModel.TUNED_RANDOM_FOREST.value)
+    result = MLModelFactory.initialize_model(exp, budget)
+    assert type(result) == Pipeline
+    assert exp.tuning_summary is summary
@@ -0,0 +1,115 @@
+import numpy as np
+from sklearn.base import clone
+from sklearn.decomposition import PCA
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.gaussian_process.kernels import RBF, ConstantKernel
+from sklearn.pipeline import Pipeline
+
+from slamd.discovery.processing.experiment.mlmodel import slamd_gaussian_process_regressor
+from slamd.discovery.processing.experiment.mlmodel.slamd_gaussian_process_regressor import \
+    SlamdGaussianProcessRegressor
+
+
+def _create_training_data():
+    rng = np.random.default_rng(42)
+    training_rows = rng.uniform(size=(30, 3))
+    training_labels = np.sin(3 * training_rows[:, 0]) + training_rows[:, 1] ** 2 + rng.normal(0, 0.05, 30)
+    return training_rows, training_labels
+
+
+def _create_kernel():
+    return ConstantKernel(1.0, (1e-3, 1e3)) * RBF(10, (1e-2, 1e2))
+
+
+def test_parallel_restarts_give_same_result_as_sklearn():
+    training_rows, training_labels = _create_training_data()
+
+    expected = GaussianProcessRegressor(kernel=_create_kernel(), n_restarts_optimizer=5, random_state=42)
+    expected.fit(training_rows, training_labels)
+    regressor = SlamdGaussianProcessRegressor(kernel=_create_kernel(), n_restarts_optimizer=5, random_state=42,
+                                              n_jobs=3)
+    regressor.fit(training_rows, training_labels)
+
+    np.testing.assert_array_equal(regressor.kernel_.theta, expected.kernel_.theta)
+    assert regressor.log_marginal_likelihood_value_ == expected.log_marginal_likelihood_value_
+    np.testing.assert_array_equal(regressor.predict(training_rows, return_std=True),
+                                  expected.predict(training_rows, return_std=True))
+
+
+def test_serial_restarts_give_same_result_as_sklearn():
+    training_rows, training_labels = _create_training_data()
+
+    expected = GaussianProcessRegressor(kernel=_create_kernel(), n_restarts_optimizer=2, random_state=42)
+    expected.fit(training_rows, training_labels)
+    regressor = SlamdGaussianProcessRegressor(kernel=_create_kernel(), n_restarts_optimizer=2, random_state=42,
+                                              n_jobs=1)
+    regressor.fit(training_rows, training_labels)
+
+    np.testing.assert_array_equal(regressor.kernel_.theta, expected.kernel_.theta)
+
+
+def test_regressor_can_be_refitted_and_used_in_pipeline():
+    training_rows, training_labels = _create_training_data()
+
+    expected = Pipeline([('pca', PCA(n_components=0.99)),
+                         ('pred', GaussianProcessRegressor(kernel=_create_kernel(), n_restarts_optimizer=3,
+                                                           random_state=42))])
+    regressor = Pipeline([('pca', PCA(n_components=0.99)),
+                          ('pred', SlamdGaussianProcessRegressor(kernel=_create_kernel(), n_restarts_optimizer=3,
+                                                                 random_state=42, n_jobs=2))])
+    expected.fit(training_rows, training_labels)
+    clone(regressor).fit(training_rows[:10], training_labels[:10])
+    regressor.fit(training_rows[:10], training_labels[:10])
+    regressor.fit(training_rows, training_labels)
+
+    assert regressor.get_params()['pred__n_jobs'] == 2
+    np.testing.assert_array_equal(regressor.predict(training_rows, return_std=True),
+                                  expected.predict(training_rows, return_std=True))
+
+
+def test_parallel_and_serial_restarts_give_identical_hyperparameters():
+    training_rows, training_labels = _create_training_data()
+
+    serial = SlamdGaussianProcessRegressor(kernel=_create_kernel(), n_restarts_optimizer=9, random_state=42,
+                                           n_jobs=1)
+    serial.fit(training_rows, training_labels)
+    parallel = SlamdGaussianProcessRegressor(kernel=_create_kernel(), n_restarts_optimizer=9, random_state=42,
+                                             n_jobs=4)
+    parallel.fit(training_rows, training_labels)
+
+    np.testing.assert_array_equal(parallel.kernel_.theta, serial.kernel_.theta)
+    assert parallel.log_marginal_likelihood_value_ == serial.log_marginal_likelihood_value_
+    np.testing.assert_array_equal(parallel.alpha_, serial.alpha_)
+
+
+def test_parallel_restarts_draw_from_given_random_state_like_sklearn():
+    training_rows, training_labels = _create_training_data()
+    expected_random_state = np.random.RandomState(7)
+    random_state = np.random.RandomState(7)
+
+    expected = GaussianProcessRegressor(kernel=_create_kernel(), n_restarts_optimizer=3,
+                                        random_state=expected_random_state)
+    expected.fit(training_rows, training_labels)
+    regressor = SlamdGaussianProcessRegressor(kernel=_create_kernel(), n_restarts_optimizer=3,
+                                              random_state=random_state, n_jobs=2)
+    regressor.fit(training_rows, training_labels)
+
+    np.testing.assert_array_equal(regressor.kernel_.theta, expected.kernel_.theta)
+    assert regressor.log_marginal_likelihood_value_ == expected.log_marginal_likelihood_value_
+
+
+def test_parallel_restarts_use_given_optimizer():
+    training_rows, training_labels = _create_training_data()
+    initial_thetas = []
+
+    def optimizer(obj_func, initial_theta, bounds):
+        initial_thetas.append(initial_theta)
+        return initial_theta, obj_func(initial_theta, eval_gradient=False)
+
+    regressor = SlamdGaussianProcessRegressor(kernel=_create_kernel(), optimizer=optimizer, n_restarts_optimizer=3,
+                                              random_state=42, n_jobs=2)
+    regressor.fit(training_rows, training_labels)
+
+    # The runs start concurrently, so their order is not fixed
+    assert len(initial_thetas) == 4
+    assert any(np.array_equal(theta, _create_kernel().theta) for theta in initial_thetas)
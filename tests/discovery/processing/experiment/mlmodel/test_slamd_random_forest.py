@@ -0,0 +1,21 @@
+import pickle
+
+import joblib
+import numpy as np
+
+from slamd.discovery.processing.experiment.mlmodel.slamd_random_forest import SlamdRandomForest
+
+
+def test_pickling_keeps_learner_usable():
+    training_rows = np.arange(30, dtype=float).reshape(10, 3)
+    training_labels = training_rows[:, 0]
+
+    regressor = SlamdRandomForest()
+    joblib.hash(regressor)
+    regressor.fit(training_rows, training_labels)
+    expected = regressor.predict(training_rows[:2])
+
+    unpickled = pickle.loads(pickle.dumps(regressor))
+
+    np.testing.assert_array_equal(regressor.predict(training_rows[:2]), expected)
+    np.testing.assert_array_equal(unpickled.predict(training_rows[:2]), expected)
@@ -0,0 +1,66 @@
+import numpy as np
+from sklearn.base import clone
+from sklearn.gaussian_process import GaussianProcessRegressor
+
+from slamd.discovery.processing.experiment.mlmodel.sparse_gaussian_process_regressor import \
+    SparseGaussianProcessRegressor
+
+
+def _create_data(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = rng.uniform(size=(n_rows, 2))
+    labels = np.sin(3 * rows[:, 0]) + rows[:, 1] ** 2 + rng.normal(0, 0.05, n_rows)
+    return rows, labels
+
+
+def test_sparse_gaussian_process_with_all_rows_as_inducing_points_equals_exact_one():
+    training_rows, training_labels = _create_data(60)
+    test_rows, _ = _create_data(20, seed=1)
+
+    regressor = SparseGaussianProcessRegressor(n_inducing=100, random_state=42)
+    regressor.fit(training_rows, training_labels.reshape(-1, 1))
+    exact = GaussianProcessRegressor(kernel=regressor.kernel_, alpha=regressor.noise_level_, optimizer=None,
+                                     normalize_y=True)
+    exact.fit(training_rows, training_labels)
+
+    prediction, std = regressor.predict(test_rows, return_std=True)
+    expected_prediction, expected_std = exact.predict(test_rows, return_std=True)
+
+    np.testing.assert_allclose(prediction, expected_prediction, atol=1e-3)
+    np.testing.assert_allclose(std, expected_std, atol=1e-3)
+
+
+def test_sparse_gaussian_process_with_few_inducing_points_is_accurate():
+    training_rows, training_labels = _create_data(400)
+    test_rows, test_labels = _create_data(100, seed=1)
+
+    regressor = SparseGaussianProcessRegressor(n_inducing=20, n_hyperparameter_rows=100, random_state=42)
+    regressor.fit(training_rows, training_labels)
+
+    assert len(regressor.inducing_points_) == 20
+    prediction, std = regressor.predict(test_rows, return_std=True)
+    assert np.sqrt(np.mean((prediction - test_labels) ** 2)) < 0.1
+    assert np.all(std >= 0)
+    np.testing.assert_array_equal(regressor.predict(test_rows), prediction)
+
+
+def test_std_grows_to_prior_std_far_away_from_training_data():
+    training_rows, training_labels = _create_data(100)
+
+    regressor = SparseGaussianProcessRegressor(n_inducing=10, random_state=42).fit(training_rows, training_labels)
+
+    _, near_std = regressor.predict(training_rows[:5], return_std=True)
+    _, far_std = regressor.predict(np.full((1, 2), 1000.0), return_std=True)
+    prior_std = np.sqrt(regressor.kernel_.diag(np.zeros((1, 2)))[0]) * np.std(training_labels)
+    assert np.all(near_std < far_std)
+    np.testing.assert_allclose(far_std, prior_std, rtol=1e-6)
+
+
+def test_fit_is_reproducible_for_random_state():
+    training_rows, training_labels = _create_data(200)
+
+    first = SparseGaussianProcessRegressor(n_inducing=15, random_state=42).fit(training_rows, training_labels)
+    second = clone(first).fit(training_rows, training_labels)
+
+    np.testing.assert_array_equal(first.inducing_points_, second.inducing_points_)
+    np.testing.assert_array_equal(first.predict(training_rows), second.predict(training_rows))
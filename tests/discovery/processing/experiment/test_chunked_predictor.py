@@ -0,0 +1,60 @@
+import numpy as np
+from sklearn.gaussian_process import GaussianProcessRegressor
+
+from slamd.discovery.processing.experiment import chunked_predictor
+from slamd.discovery.processing.experiment.chunked_predictor import ChunkedPredictor
+
+
+class RecordingRegressor:
+
+    def __init__(self):
+        self.chunk_sizes = []
+
+    def predict(self, X, return_std=False):
+        self.chunk_sizes.append(len(X))
+        return X.sum(axis=1).reshape(-1, 1), X.max(axis=1)
+
+
+def _create_fitted_gpr():
+    rng = np.random.default_rng(42)
+    training_rows = rng.uniform(size=(20, 2))
+    return GaussianProcessRegressor(random_state=42).fit(training_rows, training_rows.sum(axis=1))
+
+
+def test_predict_splits_rows_into_chunks():
+    regressor = RecordingRegressor()
+    rows = np.arange(20.0).reshape(10, 2)
+
+    prediction, uncertainty = ChunkedPredictor.predict(regressor, rows, chunk_size=4)
+
+    assert regressor.chunk_sizes == [4, 4, 2]
+    np.testing.assert_array_equal(prediction, rows.sum(axis=1))
+    np.testing.assert_array_equal(uncertainty, rows.max(axis=1))
+
+
+def test_predict_uses_configured_chunk_size(monkeypatch):
+    monkeypatch.setattr(chunked_predictor, 'PREDICTION_CHUNK_SIZE', 3)
+    regressor = RecordingRegressor()
+
+    ChunkedPredictor.predict(regressor, np.ones((7, 2)))
+
+    assert regressor.chunk_sizes == [3, 3, 1]
+
+
+def test_chunked_prediction_of_gaussian_process_equals_full_prediction():
+    regressor = _create_fitted_gpr()
+    rows = np.random.default_rng(0).uniform(size=(101, 2))
+
+    expected_prediction, expected_uncertainty = regressor.predict(rows, return_std=True)
+    for n_jobs in [1, 3]:
+        prediction, uncertainty = ChunkedPredictor.predict(regressor, rows, chunk_size=10, n_jobs=n_jobs)
+
+        np.testing.assert_allclose(prediction, expected_prediction, rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose(uncertainty, expected_uncertainty, rtol=1e-9, atol=1e-9)
+
+
+def test_predict_returns_empty_arrays_for_no_rows():
+    prediction, uncertainty = ChunkedPredictor.predict(_create_fitted_gpr(), np.empty((0, 2)))
+
+    assert prediction.shape == (0,)
+    assert uncertainty.shape == (0,)
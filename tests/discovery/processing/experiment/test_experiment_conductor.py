@@ -1,8 +1,18 @@
 import pandas as pd
 import numpy as np
+from scipy.spatial import distance_matrix
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
 
+from slamd.discovery.processing.experiment import experiment_conductor, fitted_model_cache
 from slamd.discovery.processing.experiment.experiment_conductor import ExperimentConductor
 from slamd.discovery.processing.experiment.experiment_data import ExperimentData
+from slamd.discovery.processing.experiment.experiment_model import ExperimentModel
+from slamd.discovery.processing.experiment.fitted_model_cache import FittedModelCache
+from slamd.discovery.processing.experiment.kernel_warm_start_store import KernelWarmStartStore
+from slamd.discovery.processing.experiment.mlmodel.mlmodel_factory import MLModelFactory
+from slamd.discovery.processing.experiment.mlmodel.slamd_gaussian_process_regressor import \
+    SlamdGaussianProcessRegressor
 
 
 def test_clip_predictions_for_one_target_no_threshold():
@@ -74,3 +84,88 @@ def test_clip_predictions_for_two_targets_partial_threshold():
     })
 
     assert np.array_equal(expected_output.values, clipped_prediction.values)
+
+
+class _MeanRegressor:
+
+    def fit(self, X, y):
+        self.mean = y.mean()
+
+    def predict(self, X, return_std=False):
+        return np.full(len(X), self.mean), np.full(len(X), 0.5)
+
+
+def test_fit_model_and_predict_fills_partially_labelled_rows(monkeypatch):
+    df = pd.DataFrame({
+        'x': [1, 2, 3, 4, 5, 6],
+        'y': [2, np.nan, np.nan, 4, np.nan, 6],
+        'z': [10, np.nan, 30, np.nan, np.nan, 20]
+    })
+    experiment = ExperimentData(dataframe=df, target_names=['y', 'z'], feature_names=['x'])
+    monkeypatch.setattr(MLModelFactory, 'initialize_model', lambda exp, tuning_budget=None: _MeanRegressor())
+
+    ExperimentConductor._fit_model_and_predict(experiment)
+
+    assert list(experiment.prediction.index) == [1, 2, 3, 4]
+    assert np.array_equal(experiment.prediction['y'].values, [4, 4, 4, 4])
+    assert np.array_equal(experiment.prediction['z'].values, [20, 30, 20, 20])
+    assert np.array_equal(experiment.uncertainty['y'].values, [0.5, 0.5, 0, 0.5])
+    assert np.array_equal(experiment.uncertainty['z'].values, [0.5, 0, 0.5, 0.5])
+
+
+def test_fit_model_and_predict_in_parallel_matches_serial_fit(monkeypatch):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.random((20, 5)), columns=['a', 'b', 'c', 'y', 'z'])
+    df.loc[8:, 'y'] = np.nan
+    df.loc[12:, 'z'] = np.nan
+
+    # Both runs must fit the targets, neither reuse the first fit nor start from its kernel hyperparameters
+    monkeypatch.setattr(fitted_model_cache, 'MAX_CACHED_FITS', 0)
+    fit_all_targets = ExperimentConductor._fit_all_targets
+    n_fits = 0
+
+    def count_fits(*args, **kwargs):
+        nonlocal n_fits
+        n_fits += 1
+        return fit_all_targets(*args, **kwargs)
+
+    monkeypatch.setattr(ExperimentConductor, '_fit_all_targets', count_fits)
+
+    def run_with_workers(max_workers):
+        monkeypatch.setattr(experiment_conductor, 'MAX_TARGET_WORKERS', max_workers)
+        KernelWarmStartStore.clear()
+        experiment = ExperimentData(dataframe=df, model=ExperimentModel.GAUSSIAN_PROCESS.value,
+                                    target_names=['y', 'z'], feature_names=['a', 'b', 'c'])
+        ExperimentConductor._fit_model_and_predict(experiment)
+        return experiment
+
+    serial = run_with_workers(1)
+    parallel = run_with_workers(2)
+
+    assert n_fits == 2
+    assert FittedModelCache.stats()['hits'] == 0
+    assert np.array_equal(serial.prediction.values, parallel.prediction.values)
+    assert np.array_equal(serial.uncertainty.values, parallel.uncertainty.values)
+
+
+def test_calculate_min_distances_matches_full_distance_matrix(monkeypatch):
+    rng = np.random.default_rng(0)
+    monkeypatch.setattr(experiment_conductor, 'NOVELTY_CHUNK_SIZE', 2000)
+    for n_dimensions in [3, 8, 16, 30]:
+        points = rng.random((2000, n_dimensions))
+        reference_points = rng.random((40, n_dimensions))
+        expected = distance_matrix(points, reference_points).min(axis=1)
+
+        min_distances = ExperimentConductor._calculate_min_distances(points, reference_points)
+
+        np.testing.assert_array_equal(min_distances, expected)
+
+
+def test_regressors_fit_without_nested_parallelism_when_targets_run_in_parallel():
+    regressor = Pipeline([('scale', StandardScaler()),
+                          ('pred', SlamdGaussianProcessRegressor(n_restarts_optimizer=3, n_jobs=4))])
+
+    single_worker_regressor = ExperimentConductor._without_nested_parallelism(regressor)
+
+    assert single_worker_regressor.get_params()['pred__n_jobs'] == 1
+    assert regressor.get_params()['pred__n_jobs'] == 4
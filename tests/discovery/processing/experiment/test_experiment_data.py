@@ -40,3 +40,40 @@ def test_index_predicted():
     data = _get_experiment_data()
 
     assert tuple(data.index_predicted) == (1, 2, 3, 4)
+
+
+def test_label_indexes_are_computed_once(monkeypatch):
+    data = _get_experiment_data()
+    isnull_calls = 0
+    original_isnull = pd.DataFrame.isnull
+
+    def counting_isnull(self):
+        nonlocal isnull_calls
+        isnull_calls += 1
+        return original_isnull(self)
+
+    monkeypatch.setattr(pd.DataFrame, 'isnull', counting_isnull)
+
+    for _ in range(3):
+        assert tuple(data.index_predicted) == (1, 2, 3, 4)
+        assert tuple(data.index_partially_labelled) == (2, 3)
+        assert tuple(data.index_all_labelled) == (0, 5)
+    assert isnull_calls == 1
+
+
+def test_invalidate_derived_views_recomputes_views_after_dataframe_changes():
+    data = _get_experiment_data()
+    assert tuple(data.index_none_labelled) == (1, 4)
+
+    data.dataframe.loc[1, 'y'] = 7
+    data.invalidate_derived_views()
+
+    assert tuple(data.index_none_labelled) == (4,)
+    assert tuple(data.index_partially_labelled) == (1, 2, 3)
+
+
+def test_normalized_features_df_uses_std_of_1_for_constant_features():
+    df = pd.DataFrame({'x': [1.0, 2.0, 3.0], 'c': [4.0, 4.0, 4.0], 'y': [1.0, np.nan, np.nan]})
+    data = ExperimentData(dataframe=df, target_names=['y'], feature_names=['x', 'c'])
+
+    assert data.normalized_features_df.to_dict(orient='list') == {'x': [-1.0, 0.0, 1.0], 'c': [0.0, 0.0, 0.0]}
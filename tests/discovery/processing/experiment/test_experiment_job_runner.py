@@ -0,0 +1,215 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from slamd.common.error_handling import ExperimentJobNotFoundException, SequentialLearningException, \
+    ExperimentQueueFullException
+from slamd.discovery.processing.experiment import experiment_job_runner
+from slamd.discovery.processing.experiment.experiment_conductor import ExperimentConductor
+from slamd.discovery.processing.experiment.experiment_data import ExperimentData
+from slamd.discovery.processing.experiment.experiment_job_runner import ExperimentJobRunner
+from slamd.discovery.processing.experiment.mlmodel import budgeted_grid_search
+from slamd.discovery.processing.models.tuning_summary import TuningSummary
+
+
+@pytest.fixture(autouse=True)
+def clear_jobs():
+    ExperimentJobRunner.clear()
+    yield
+    ExperimentJobRunner.clear()
+
+
+def _create_experiment():
+    dataframe = pd.DataFrame({'Feature': [1.0, 2.0, 3.0], 'Target 1': [1.0, None, 2.0], 'Target 2': [3.0, None, 4.0]})
+    return ExperimentData(dataframe=dataframe, feature_names=['Feature'], target_names=['Target 1', 'Target 2'])
+
+
+def _wait_for(owner, job_id, statuses=('finished', 'failed', 'cancelled')):
+    for _ in range(500):
+        status = ExperimentJobRunner.get_status(owner, job_id)
+        if status['status'] in statuses:
+            return status
+        time.sleep(0.01)
+    raise AssertionError('The job did not finish in time')
+
+
+def test_submit_runs_experiment_in_background_and_reports_progress(monkeypatch):
+    def mock_run(exp, report_progress, tuning_budget):
+        report_progress('fit', 1, 2)
+        report_progress('fit', 2, 2)
+        return 'dataframe', 'scatter plot', 'tsne plot data'
+
+    monkeypatch.setattr(ExperimentConductor, 'run', mock_run)
+
+    experiment = _create_experiment()
+    job_id = ExperimentJobRunner.submit('owner', 'dataset', 'fingerprint', {}, experiment)
+    status = _wait_for('owner', job_id)
+
+    assert status['job_id'] == job_id
+    assert status['status'] == 'finished'
+    assert status['error'] is None
+    assert {'name': 'fit', 'completed': 2, 'total': 2} in status['stages']
+
+    job = ExperimentJobRunner.find_job('owner', job_id)
+    assert job.experiment is experiment
+    assert job.dataframe == 'dataframe'
+    assert job.scatter_plot == 'scatter plot'
+    assert job.tsne_plot_data == 'tsne plot data'
+
+
+def test_get_status_shows_queued_stages_before_job_runs(monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+
+    def mock_run(exp, report_progress, tuning_budget):
+        started.set()
+        release.wait(5)
+        return None, None, None
+
+    monkeypatch.setattr(ExperimentConductor, 'run', mock_run)
+
+    job_id = ExperimentJobRunner.submit('owner', 'dataset', 'fingerprint', {}, _create_experiment())
+    started.wait(5)
+    status = ExperimentJobRunner.get_status('owner', job_id)
+    release.set()
+
+    assert status['status'] == 'running'
+    assert [stage['name'] for stage in status['stages']] == ['preprocess', 'fit', 'utility', 'novelty', 'plots']
+    assert status['stages'][1] == {'name': 'fit', 'completed': 0, 'total': 2}
+    _wait_for('owner', job_id)
+
+
+def test_tuning_budget_starts_when_queued_job_runs(monkeypatch):
+    monkeypatch.setattr(experiment_job_runner, 'MAX_EXPERIMENT_JOB_WORKERS', 1)
+    monkeypatch.setattr(ExperimentJobRunner, '_executor', None)
+    monkeypatch.setattr(budgeted_grid_search, 'TUNING_TIME_BUDGET_SECONDS', 60)
+    release = threading.Event()
+    deadlines = []
+
+    def mock_run(exp, report_progress, tuning_budget):
+        deadlines.append(tuning_budget.deadline)
+        release.wait(5)
+        return None, None, None
+
+    monkeypatch.setattr(ExperimentConductor, 'run', mock_run)
+
+    first_job_id = ExperimentJobRunner.submit('owner', 'dataset', 'fingerprint', {}, _create_experiment())
+    queued_job_id = ExperimentJobRunner.submit('owner', 'dataset', 'fingerprint', {}, _create_experiment())
+    queued_job = ExperimentJobRunner.find_job('owner', queued_job_id)
+    assert queued_job.tuning_budget.deadline is None
+
+    time.sleep(0.1)
+    submitted = time.monotonic()
+    release.set()
+    _wait_for('owner', first_job_id)
+    _wait_for('owner', queued_job_id)
+
+    assert deadlines[1] >= submitted + 60
+
+
+def test_failed_job_reports_error_message(monkeypatch):
+    def mock_run(exp, report_progress, tuning_budget):
+        raise SequentialLearningException('Something went wrong')
+
+    monkeypatch.setattr(ExperimentConductor, 'run', mock_run)
+
+    job_id = ExperimentJobRunner.submit('owner', 'dataset', 'fingerprint', {}, _create_experiment())
+    status = _wait_for('owner', job_id)
+
+    assert status['status'] == 'failed'
+    assert status['error'] == 'Something went wrong'
+
+
+def test_failed_job_hides_unknown_errors(monkeypatch):
+    def mock_run(exp, report_progress, tuning_budget):
+        raise ValueError('internal details')
+
+    monkeypatch.setattr(ExperimentConductor, 'run', mock_run)
+
+    job_id = ExperimentJobRunner.submit('owner', 'dataset', 'fingerprint', {}, _create_experiment())
+    status = _wait_for('owner', job_id)
+
+    assert status['status'] == 'failed'
+    assert 'internal details' not in status['error']
+
+
+def test_cancel_stops_running_job(monkeypatch):
+    started = threading.Event()
+
+    def mock_run(exp, report_progress, tuning_budget):
+        started.set()
+        for _ in range(500):
+            report_progress('fit', 0, 2)
+            time.sleep(0.01)
+        return None, None, None
+
+    monkeypatch.setattr(ExperimentConductor, 'run', mock_run)
+
+    job_id = ExperimentJobRunner.submit('owner', 'dataset', 'fingerprint', {}, _create_experiment())
+    started.wait(5)
+    ExperimentJobRunner.cancel('owner', job_id)
+    status = _wait_for('owner', job_id)
+
+    assert status['status'] == 'cancelled'
+    assert status['error'] == 'The experiment was cancelled.'
+
+
+def test_status_contains_tuning_summary(monkeypatch):
+    def mock_run(exp, report_progress, tuning_budget):
+        exp.tuning_summary = TuningSummary(evaluated_candidates=1, total_candidates=4, truncated=True, best_score=0.5)
+        return None, None, None
+
+    monkeypatch.setattr(ExperimentConductor, 'run', mock_run)
+
+    job_id = ExperimentJobRunner.submit('owner', 'dataset', 'fingerprint', {}, _create_experiment())
+    status = _wait_for('owner', job_id)
+
+    assert status['tuning'] == {'evaluated_candidates': 1, 'total_candidates': 4, 'truncated': True,
+                                'best_score': 0.5}
+
+
+def test_jobs_of_other_owners_are_not_found(monkeypatch):
+    monkeypatch.setattr(ExperimentConductor, 'run', lambda exp, report_progress, tuning_budget: (None, None, None))
+
+    job_id = ExperimentJobRunner.submit('owner', 'dataset', 'fingerprint', {}, _create_experiment())
+
+    with pytest.raises(ExperimentJobNotFoundException):
+        ExperimentJobRunner.get_status('other owner', job_id)
+    with pytest.raises(ExperimentJobNotFoundException):
+        ExperimentJobRunner.find_job('owner', 'unknown job')
+
+
+def test_oldest_finished_jobs_are_removed(monkeypatch):
+    monkeypatch.setattr(experiment_job_runner, 'MAX_EXPERIMENT_JOBS', 2)
+    monkeypatch.setattr(ExperimentConductor, 'run', lambda exp, report_progress, tuning_budget: (None, None, None))
+
+    job_ids = []
+    for _ in range(3):
+        job_ids.append(ExperimentJobRunner.submit('owner', 'dataset', 'fingerprint', {}, _create_experiment()))
+        _wait_for('owner', job_ids[-1])
+
+    with pytest.raises(ExperimentJobNotFoundException):
+        ExperimentJobRunner.find_job('owner', job_ids[0])
+    assert ExperimentJobRunner.get_status('owner', job_ids[2])['status'] == 'finished'
+
+
+def test_submit_is_rejected_while_too_many_jobs_are_queued_or_running(monkeypatch):
+    monkeypatch.setattr(experiment_job_runner, 'MAX_ACTIVE_EXPERIMENT_JOBS', 1)
+    release = threading.Event()
+
+    def mock_run(exp, report_progress, tuning_budget):
+        release.wait(5)
+        return None, None, None
+
+    monkeypatch.setattr(ExperimentConductor, 'run', mock_run)
+
+    job_id = ExperimentJobRunner.submit('owner', 'dataset', 'fingerprint', {}, _create_experiment())
+    with pytest.raises(ExperimentQueueFullException):
+        ExperimentJobRunner.submit('other owner', 'dataset', 'fingerprint', {}, _create_experiment())
+
+    release.set()
+    _wait_for('owner', job_id)
+    next_job_id = ExperimentJobRunner.submit('other owner', 'dataset', 'fingerprint', {}, _create_experiment())
+    assert _wait_for('other owner', next_job_id)['status'] == 'finished'
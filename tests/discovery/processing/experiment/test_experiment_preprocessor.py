@@ -121,6 +121,20 @@ def test_filter_apriori_thresholds():
     assert np.array_equal(result['v'].values, np.array([1, 4, 5, 7, 8]))
     assert np.array_equal(np.nan_to_num(result['x'].values), np.array([0, 4, 0, 7, 8]))
     assert np.array_equal(np.nan_to_num(result['y'].values), np.array([1, 0, 0, 0, 8]))
+    assert experiment.orig_data is result
+    assert len(df.index) == 8
+
+
+def test_filter_apriori_thresholds_invalidates_label_indexes():
+    df = pd.DataFrame({'u': [1, 2, 3, 4], 'x': [1, np.nan, np.nan, 4]})
+    experiment = ExperimentData(dataframe=df, target_names=['x'], apriori_names=['u'],
+                                apriori_thresholds=[3], apriori_max_or_min=['max'])
+    assert tuple(experiment.index_predicted) == (1, 2)
+
+    ExperimentPreprocessor.filter_apriori_with_thresholds_and_update_orig_data(experiment)
+
+    assert tuple(experiment.index_predicted) == (1,)
+    assert tuple(experiment.index_all_labelled) == (0, 2)
 
 
 def test_encode_categoricals_multiple():
@@ -142,6 +156,9 @@ def test_encode_categoricals_multiple():
     assert np.array_equal(experiment.dataframe['v'].values, input_df['v'].values)
     assert np.array_equal(experiment.dataframe['w'].values, np.array([0, 1, 2]))
     assert np.array_equal(experiment.dataframe['x'].values, np.array([0, 1, 2]))
+    # The input dataframe is shared with the dataset and must not be changed
+    assert list(input_df['w']) == ['a', 'b', 'c']
+    assert list(experiment.orig_data['w']) == ['a', 'b', 'c']
 
 
 def test_encode_categoricals_none():
@@ -202,4 +219,8 @@ def test_filter_missing_inputs_multiple():
 
     ExperimentPreprocessor.filter_missing_inputs(experiment)
 
-    assert tuple(experiment.dataframe.columns) == ('u', 'w')
+    assert experiment.feature_names == ['u', 'w']
+    assert tuple(experiment.features_df.columns) == ('u', 'w')
+    # Columns are not dropped from the dataframe shared with the dataset
+    assert experiment.dataframe is input_df
+    assert tuple(input_df.columns) == ('u', 'v', 'w', 'x')
@@ -0,0 +1,58 @@
+import json
+from base64 import b64decode
+
+import numpy as np
+import pandas as pd
+
+from slamd.discovery.processing.experiment.figure_json_encoder import FigureJsonEncoder
+
+
+def _decode(typed_array):
+    return np.frombuffer(b64decode(typed_array['bdata']), dtype=typed_array['dtype'])
+
+
+def test_typed_array_keeps_supported_dtypes():
+    values = np.array([1.5, -2.25, np.nan], dtype=np.float32)
+
+    typed_array = FigureJsonEncoder.typed_array(values)
+
+    assert typed_array['dtype'] == 'f4'
+    np.testing.assert_array_equal(_decode(typed_array), values)
+
+
+def test_typed_array_converts_int64_to_int32_if_possible():
+    assert FigureJsonEncoder.typed_array(pd.Series([0, 5, 2 ** 31 - 1]))['dtype'] == 'i4'
+
+    typed_array = FigureJsonEncoder.typed_array(np.array([0, 2 ** 40]))
+    assert typed_array['dtype'] == 'f8'
+    np.testing.assert_array_equal(_decode(typed_array), [0, 2 ** 40])
+
+
+def test_typed_array_writes_shape_of_multidimensional_arrays():
+    values = np.arange(6, dtype=np.int16).reshape(3, 2)
+
+    typed_array = FigureJsonEncoder.typed_array(values)
+
+    assert typed_array['shape'] == '3,2'
+    np.testing.assert_array_equal(_decode(typed_array).reshape(3, 2), values)
+
+
+def test_dumps_writes_compact_json():
+    figure = {'data': [{'x': FigureJsonEncoder.typed_array(np.zeros(2))}], 'layout': {'height': 1000}}
+
+    assert FigureJsonEncoder.dumps(figure) == \
+        '{"data":[{"x":{"dtype":"f8","bdata":"AAAAAAAAAAAAAAAAAAAAAA=="}}],"layout":{"height":1000}}'
+    assert json.loads(FigureJsonEncoder.dumps(figure)) == figure
+
+
+def test_dumps_writes_arrays_used_by_several_traces_once():
+    shared = np.arange(3.0)
+    figure = {'data': [{'x': FigureJsonEncoder.typed_array(shared), 'y': FigureJsonEncoder.typed_array(np.ones(3))},
+                       {'x': FigureJsonEncoder.typed_array(shared), 'marker': {'color': FigureJsonEncoder.typed_array(shared)}}],
+              'layout': {}}
+
+    output = json.loads(FigureJsonEncoder.dumps(figure))
+
+    assert output['sharedArrays'] == [FigureJsonEncoder.typed_array(shared)]
+    assert output['data'] == [{'x': {'sharedArray': 0}, 'y': FigureJsonEncoder.typed_array(np.ones(3))},
+                              {'x': {'sharedArray': 0}, 'marker': {'color': {'sharedArray': 0}}}]
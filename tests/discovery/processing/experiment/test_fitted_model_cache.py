@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from slamd.discovery.processing.experiment import fitted_model_cache
+from slamd.discovery.processing.experiment.experiment_conductor import ExperimentConductor
+from slamd.discovery.processing.experiment.experiment_data import ExperimentData
+from slamd.discovery.processing.experiment.fitted_model_cache import CachedFit, FittedModelCache
+from slamd.discovery.processing.experiment.mlmodel.mlmodel_factory import MLModelFactory
+
+
+def _create_key(model='model', features=None):
+    features = np.arange(6.0).reshape(3, 2) if features is None else features
+    return FittedModelCache.create_key(model, ['a', 'b'], ['y'], features, np.array([[1.0], [np.nan], [2.0]]))
+
+
+def test_create_key_depends_on_data_and_model():
+    assert _create_key() == _create_key()
+    assert _create_key() != _create_key(model='other model')
+    assert _create_key() != _create_key(features=np.arange(6.0).reshape(2, 3))
+    assert _create_key() != _create_key(features=np.arange(1.0, 7.0).reshape(3, 2))
+
+
+def test_get_counts_hits_and_misses():
+    key = _create_key()
+    assert FittedModelCache.get(key) is None
+
+    FittedModelCache.put(key, CachedFit([], np.zeros((2, 1)), np.ones((2, 1))))
+    cached_fit = FittedModelCache.get(key)
+
+    assert np.array_equal(cached_fit.predictions, np.zeros((2, 1)))
+    assert np.array_equal(cached_fit.uncertainties, np.ones((2, 1)))
+    assert FittedModelCache.stats() == {'hits': 1, 'misses': 1, 'size': 1}
+
+
+def test_put_evicts_least_recently_used_entry(monkeypatch):
+    monkeypatch.setattr(fitted_model_cache, 'MAX_CACHED_FITS', 2)
+    for key in ['first', 'second']:
+        FittedModelCache.put(key, CachedFit([], np.zeros(1), np.zeros(1)))
+    FittedModelCache.get('first')
+    FittedModelCache.put('third', CachedFit([], np.zeros(1), np.zeros(1)))
+
+    assert FittedModelCache.get('second') is None
+    assert FittedModelCache.get('first') is not None
+    assert FittedModelCache.get('third') is not None
+
+
+def test_fit_model_and_predict_reuses_cached_fit(monkeypatch):
+    initialize_model_calls = 0
+
+    class ConstantRegressor:
+        def fit(self, X, y):
+            pass
+
+        def predict(self, X, return_std=False):
+            return np.ones(len(X)), np.zeros(len(X))
+
+    def mock_initialize_model(exp, tuning_budget=None):
+        nonlocal initialize_model_calls
+        initialize_model_calls += 1
+        return ConstantRegressor()
+
+    monkeypatch.setattr(MLModelFactory, 'initialize_model', mock_initialize_model)
+    df = pd.DataFrame({'x': [1, 2, 3], 'y': [4, np.nan, 6]})
+
+    for curiosity in [1, 2]:
+        experiment = ExperimentData(dataframe=df, curiosity=curiosity, target_names=['y'], feature_names=['x'])
+        ExperimentConductor._fit_model_and_predict(experiment)
+
+    assert initialize_model_calls == 1
+    assert FittedModelCache.stats() == {'hits': 1, 'misses': 1, 'size': 1}
+    assert list(experiment.prediction['y']) == [1]
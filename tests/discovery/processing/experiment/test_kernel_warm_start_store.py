@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import PCA
+from sklearn.gaussian_process.kernels import RBF, ConstantKernel
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import Pipeline
+
+from slamd.discovery.processing.experiment import kernel_warm_start_store
+from slamd.discovery.processing.experiment.experiment_conductor import ExperimentConductor
+from slamd.discovery.processing.experiment.experiment_data import ExperimentData
+from slamd.discovery.processing.experiment.experiment_model import ExperimentModel
+from slamd.discovery.processing.experiment.kernel_warm_start_store import KernelWarmStartStore
+from slamd.discovery.processing.experiment.mlmodel.slamd_gaussian_process_regressor import \
+    SlamdGaussianProcessRegressor
+
+
+def _create_regressor():
+    kernel = ConstantKernel(1.0, (1e-3, 1e3)) * RBF(10, (1e-2, 1e2))
+    return SlamdGaussianProcessRegressor(kernel=kernel, n_restarts_optimizer=9, random_state=42)
+
+
+def _training_rows(n_rows, n_features=1):
+    return np.linspace(0, 1, n_rows * n_features).reshape(n_rows, n_features) ** np.arange(1, n_features + 1)
+
+
+def _fit_regressor(n_rows):
+    training_rows = _training_rows(n_rows)
+    return _create_regressor().fit(training_rows, np.sin(6 * training_rows).ravel())
+
+
+def _create_pca_pipeline():
+    return Pipeline([('pca', PCA(n_components=0.99)), ('pred', _create_regressor())])
+
+
+def test_warm_start_without_stored_kernel_keeps_regressor():
+    regressor = _create_regressor()
+
+    warm_started = KernelWarmStartStore.warm_start(('lineage', 'y'), regressor, _training_rows(10))
+
+    assert warm_started.kernel is regressor.kernel
+    assert warm_started.n_restarts_optimizer == 9
+
+
+def test_warm_start_uses_previous_optimum_and_fewer_restarts_if_few_rows_were_added():
+    fitted_regressor = _fit_regressor(10)
+    KernelWarmStartStore.remember(('lineage', 'y'), fitted_regressor, 10)
+
+    warm_started = KernelWarmStartStore.warm_start(('lineage', 'y'), _create_regressor(), _training_rows(11))
+
+    np.testing.assert_array_equal(warm_started.kernel.theta, fitted_regressor.kernel_.theta)
+    assert warm_started.n_restarts_optimizer == kernel_warm_start_store.WARM_START_RESTARTS
+
+
+def test_warm_start_keeps_restarts_if_data_changed_a_lot():
+    fitted_regressor = _fit_regressor(10)
+    KernelWarmStartStore.remember(('lineage', 'y'), fitted_regressor, 10)
+
+    more_rows = KernelWarmStartStore.warm_start(('lineage', 'y'), _create_regressor(), _training_rows(20))
+    fewer_rows = KernelWarmStartStore.warm_start(('lineage', 'y'), _create_regressor(), _training_rows(9))
+
+    np.testing.assert_array_equal(more_rows.kernel.theta, fitted_regressor.kernel_.theta)
+    assert more_rows.n_restarts_optimizer == 9
+    assert fewer_rows.n_restarts_optimizer == 9
+
+
+def test_warm_start_ignores_other_models_and_missing_lineage():
+    KernelWarmStartStore.remember(('lineage', 'y'), _fit_regressor(10), 10)
+    pipeline = Pipeline([('pca', PCA(n_components=0.99)), ('pred', LinearRegression())])
+
+    assert KernelWarmStartStore.create_key(None, 'model', ['x'], 'y') is None
+    assert KernelWarmStartStore.warm_start(('lineage', 'y'), pipeline, _training_rows(10)) is pipeline
+    assert KernelWarmStartStore.warm_start(None, _create_regressor(), _training_rows(10)).n_restarts_optimizer == 9
+
+
+def test_warm_start_seeds_gaussian_process_after_pca():
+    training_rows = _training_rows(10, n_features=3)
+    fitted_pipeline = _create_pca_pipeline().fit(training_rows, np.sin(6 * training_rows[:, 0]))
+    KernelWarmStartStore.remember(('lineage', 'y'), fitted_pipeline, 10)
+
+    warm_started = KernelWarmStartStore.warm_start(('lineage', 'y'), _create_pca_pipeline(), training_rows)
+
+    np.testing.assert_array_equal(warm_started.get_params()['pred__kernel'].theta,
+                                  fitted_pipeline.named_steps['pred'].kernel_.theta)
+    assert warm_started.get_params()['pred__n_restarts_optimizer'] == kernel_warm_start_store.WARM_START_RESTARTS
+
+
+def test_warm_start_after_pca_requires_same_number_of_components():
+    training_rows = _training_rows(10, n_features=3)
+    fitted_pipeline = _create_pca_pipeline().fit(training_rows, np.sin(6 * training_rows[:, 0]))
+    n_components = fitted_pipeline.named_steps['pca'].n_components_
+    KernelWarmStartStore.remember(('lineage', 'y'), fitted_pipeline, 10)
+    pipeline = _create_pca_pipeline().set_params(pca__n_components=n_components - 1)
+
+    warm_started = KernelWarmStartStore.warm_start(('lineage', 'y'), pipeline, training_rows)
+
+    assert warm_started.get_params()['pred__kernel'] is pipeline.get_params()['pred__kernel']
+    assert warm_started.get_params()['pred__n_restarts_optimizer'] == 9
+
+
+def test_remember_evicts_least_recently_used_entry(monkeypatch):
+    monkeypatch.setattr(kernel_warm_start_store, 'MAX_WARM_STARTS', 2)
+    fitted_regressor = _fit_regressor(5)
+    for key in ['first', 'second', 'third']:
+        KernelWarmStartStore.remember(key, fitted_regressor, 5)
+
+    assert list(KernelWarmStartStore._entries) == [('second', 1), ('third', 1)]
+
+
+def test_repeated_experiment_on_same_lineage_is_warm_started():
+    df = pd.DataFrame({'x': np.linspace(0, 1, 12), 'y': np.sin(6 * np.linspace(0, 1, 12))})
+    df.loc[[3, 7], 'y'] = np.nan
+    model = ExperimentModel.GAUSSIAN_PROCESS.value
+
+    first = ExperimentData(dataframe=df, model=model, dataset_lineage='store/dataset', target_names=['y'],
+                           feature_names=['x'])
+    ExperimentConductor._fit_model_and_predict(first)
+
+    df_with_new_label = df.copy()
+    df_with_new_label.loc[3, 'y'] = 0.5
+    second = ExperimentData(dataframe=df_with_new_label, model=model, dataset_lineage='store/dataset',
+                            target_names=['y'], feature_names=['x'])
+    ExperimentConductor._fit_model_and_predict(second)
+
+    stored = KernelWarmStartStore._entries[(KernelWarmStartStore.create_key('store/dataset', model, ['x'], 'y'), 1)]
+    assert stored.n_training_rows == 11
+    assert len(second.prediction) == 1
@@ -1,9 +1,12 @@
 import json
+from base64 import b64decode
 
 import numpy as np
 import pandas as pd
 
+from slamd.discovery.processing.experiment import plot_generator
 from slamd.discovery.processing.experiment.plot_generator import PlotGenerator
+from slamd.discovery.processing.experiment.tsne_embedding_cache import TSNEEmbeddingCache
 from tests.discovery.processing.experiment.test_plot_json_data import SCATTER_1DIM_JSON, SCATTER_2DIM_JSON, TSNE_3DIM_JSON
 
 
@@ -32,11 +35,32 @@ def _plot_df_factory():
     return plot_df
 
 
+def _decode_plot_json(plot_json):
+    plot_json = json.loads(plot_json)
+    shared_arrays = plot_json.pop('sharedArrays', [])
+    return _decode_typed_arrays(plot_json, shared_arrays)
+
+
+def _decode_typed_arrays(value, shared_arrays):
+    if isinstance(value, dict) and 'sharedArray' in value:
+        value = shared_arrays[value['sharedArray']]
+    if isinstance(value, dict) and 'bdata' in value:
+        array = np.frombuffer(b64decode(value['bdata']), dtype=value['dtype'])
+        if 'shape' in value:
+            array = array.reshape([int(size) for size in value['shape'].split(',')])
+        return array.tolist()
+    if isinstance(value, dict):
+        return {key: _decode_typed_arrays(item, shared_arrays) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode_typed_arrays(item, shared_arrays) for item in value]
+    return value
+
+
 def test_create_target_scatter_plot_1dim():
     plot_df = _plot_df_factory().loc[:, ['t1', 'Uncertainty (t1)', 'Utility', 'Row number']]
 
     expected_output = SCATTER_1DIM_JSON
-    actual_output = json.loads(PlotGenerator.create_target_scatter_plot(plot_df))
+    actual_output = _decode_plot_json(PlotGenerator.create_target_scatter_plot(plot_df))
 
     assert expected_output == actual_output
 
@@ -45,15 +69,76 @@ def test_create_target_scatter_plot_2dim():
     plot_df = _plot_df_factory().loc[:, ['t1', 't2',  'Uncertainty (t1)', 'Uncertainty (t2)', 'Utility', 'Row number']]
 
     expected_output = SCATTER_2DIM_JSON
-    actual_output = json.loads(PlotGenerator.create_target_scatter_plot(plot_df))
+    actual_output = _decode_plot_json(PlotGenerator.create_target_scatter_plot(plot_df))
 
     assert expected_output == actual_output
 
 
 def test_create_tsne_input_space_plot():
-    plot_df = _plot_df_factory().loc[:, ['f1', 'f2', 'f3', 'Utility', 'Row number', 'is_train_data']]
+    plot_df = _plot_df_factory().loc[:, ['Row number', 'Utility', 'is_train_data']]
+    embedding = TSNEEmbeddingCache.compute(_plot_df_factory().loc[:, ['f1', 'f2', 'f3']])
+    plot_df['t-SNE-1'], plot_df['t-SNE-2'] = embedding[:, 0], embedding[:, 1]
 
     expected_output = TSNE_3DIM_JSON
-    actual_output = json.loads(PlotGenerator.create_tsne_input_space_plot(plot_df))
+    actual_output = _decode_plot_json(PlotGenerator.create_tsne_input_space_plot(plot_df))
 
     assert expected_output == actual_output
+
+
+def test_create_target_scatter_plot_writes_data_as_typed_arrays():
+    plot_df = _plot_df_factory().loc[:, ['t1', 't2', 't3', 'Uncertainty (t1)', 'Utility', 'Row number']]
+
+    output = json.loads(PlotGenerator.create_target_scatter_plot(plot_df))
+
+    assert [(trace['xaxis'], trace['yaxis']) for trace in output['data']] == [('x', 'y'), ('x3', 'y3'), ('x4', 'y4')]
+    # Every column is only written once, even if it is used by several subplots:
+    # t1 (with the same values as Row number), t2, t3, Utility and Uncertainty (t1)
+    shared_arrays = output['sharedArrays']
+    assert len(shared_arrays) == len({shared_array['bdata'] for shared_array in shared_arrays}) == 5
+    assert {shared_array['dtype'] for shared_array in shared_arrays} == {'i4', 'f8'}
+    assert output['data'][0]['marker']['color'] == output['data'][1]['marker']['color'] == \
+        output['data'][2]['marker']['color'] == {'sharedArray': 2}
+
+
+def _large_plot_df(n_rows):
+    rng = np.random.default_rng(0)
+    plot_df = pd.DataFrame({'t1': rng.normal(size=n_rows), 't2': rng.normal(size=n_rows),
+                            'Uncertainty (t1)': rng.uniform(size=n_rows), 'Utility': rng.normal(size=n_rows)})
+    plot_df = plot_df.sort_values(by='Utility', ascending=False)
+    plot_df.insert(loc=0, column='Row number', value=list(range(1, n_rows + 1)))
+    return plot_df
+
+
+def test_create_target_scatter_plot_downsamples_large_sets_of_rows(monkeypatch):
+    monkeypatch.setattr(plot_generator, 'PLOT_TOP_UTILITY_ROWS', 50)
+    monkeypatch.setattr(plot_generator, 'WEBGL_POINT_THRESHOLD', 100)
+    plot_df = _large_plot_df(3000)
+
+    output = _decode_plot_json(PlotGenerator.create_target_scatter_plot(plot_df, point_budget=300))
+
+    trace = output['data'][0]
+    assert trace['type'] == 'scattergl'
+    assert 200 < len(trace['customdata']) <= 300
+    assert set(range(1, 51)) <= set(trace['customdata'])
+    # The row numbers still belong to the plotted values
+    plotted_df = plot_df.set_index('Row number').loc[trace['customdata']]
+    np.testing.assert_array_equal(trace['x'], plotted_df['t1'])
+    np.testing.assert_array_equal(trace['error_x']['array'], plotted_df['Uncertainty (t1)'])
+    # The grid keeps rows in the outer cells, which preserves the outline of the point cloud
+    assert np.ptp(trace['x']) > 0.9 * np.ptp(plot_df['t1'])
+    assert output['layout']['title']['text'].endswith(f'({len(trace["customdata"])} of 3000 rows shown)')
+
+
+def test_create_tsne_input_space_plot_keeps_labelled_rows(monkeypatch):
+    monkeypatch.setattr(plot_generator, 'PLOT_TOP_UTILITY_ROWS', 10)
+    plot_df = _large_plot_df(300).rename(columns={'t1': 't-SNE-1', 't2': 't-SNE-2'})
+    plot_df['is_train_data'] = 'Predicted'
+    plot_df.loc[plot_df.index[-30:], 'is_train_data'] = 'Labelled'
+
+    output = _decode_plot_json(PlotGenerator.create_tsne_input_space_plot(plot_df, point_budget=100))
+
+    predicted, labelled = output['data']
+    assert [trace['type'] for trace in output['data']] == ['scatter', 'scatter']
+    assert len(predicted['customdata']) + len(labelled['customdata']) <= 100
+    assert sorted(row for [row] in labelled['customdata']) == list(range(271, 301))
+    assert set(range(1, 11)) <= {row for [row] in predicted['customdata']}
@@ -0,0 +1,143 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from slamd.discovery.processing.experiment import tsne_embedding_cache
+from slamd.discovery.processing.experiment.tsne_embedding_cache import TSNEEmbeddingCache
+
+
+def _features(offset=0.0):
+    return pd.DataFrame({'f1': np.arange(10) + offset, 'f2': np.linspace(0, 1, 10)})
+
+
+def _count_computations(monkeypatch):
+    computed = []
+
+    def mock_compute(features):
+        computed.append(features)
+        return features[:, :2] * 2
+
+    monkeypatch.setattr(TSNEEmbeddingCache, 'compute', mock_compute)
+    return computed
+
+
+def test_create_key_depends_on_values_only():
+    assert TSNEEmbeddingCache.create_key(_features()) == TSNEEmbeddingCache.create_key(_features().to_numpy())
+    assert TSNEEmbeddingCache.create_key(_features()) != TSNEEmbeddingCache.create_key(_features(offset=1))
+
+
+def test_submitted_embedding_is_computed_once(monkeypatch):
+    computed = _count_computations(monkeypatch)
+
+    key = TSNEEmbeddingCache.submit(_features())
+    assert TSNEEmbeddingCache.submit(_features()) == key
+
+    embedding = TSNEEmbeddingCache.get(key)
+    embedding[0, 0] = -1
+    np.testing.assert_array_equal(TSNEEmbeddingCache.get(key), _features().to_numpy() * 2)
+    np.testing.assert_array_equal(TSNEEmbeddingCache.embed(_features()), _features().to_numpy() * 2)
+    assert len(computed) == 1
+
+
+def test_least_recently_used_embedding_is_removed(monkeypatch):
+    monkeypatch.setattr(tsne_embedding_cache, 'MAX_CACHED_EMBEDDINGS', 2)
+    _count_computations(monkeypatch)
+
+    first_key = TSNEEmbeddingCache.submit(_features())
+    second_key = TSNEEmbeddingCache.submit(_features(offset=1))
+    TSNEEmbeddingCache.get(first_key)
+    third_key = TSNEEmbeddingCache.submit(_features(offset=2))
+
+    assert TSNEEmbeddingCache.get(second_key) is None
+    assert TSNEEmbeddingCache.get(first_key) is not None
+    assert TSNEEmbeddingCache.get(third_key) is not None
+
+
+def test_queued_embeddings_are_cancelled_when_removed(monkeypatch):
+    monkeypatch.setattr(tsne_embedding_cache, 'MAX_CACHED_EMBEDDINGS', 2)
+    started = threading.Event()
+    release = threading.Event()
+    computed = []
+
+    def mock_compute(features):
+        started.set()
+        release.wait(10)
+        computed.append(features)
+        return features[:, :2]
+
+    monkeypatch.setattr(TSNEEmbeddingCache, 'compute', mock_compute)
+    running_key = TSNEEmbeddingCache.submit(_features())
+    started.wait(10)
+    evicted_future = TSNEEmbeddingCache._entries[TSNEEmbeddingCache.submit(_features(offset=1))]
+    TSNEEmbeddingCache.submit(_features(offset=2))
+    cleared_future = TSNEEmbeddingCache._entries[TSNEEmbeddingCache.submit(_features(offset=3))]
+    running_future = TSNEEmbeddingCache._entries.get(running_key)
+
+    TSNEEmbeddingCache.clear()
+    release.set()
+
+    assert evicted_future.cancelled()
+    assert cleared_future.cancelled()
+    assert running_future is None
+    assert len(computed) <= 1
+
+
+def test_embedding_removed_while_waiting_for_it_is_computed_again(monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+
+    def mock_compute(features):
+        if features[0, 0] == 0:
+            started.set()
+            release.wait(10)
+        return features[:, :2] * 2
+
+    monkeypatch.setattr(TSNEEmbeddingCache, 'compute', mock_compute)
+    TSNEEmbeddingCache.submit(_features())
+    started.wait(10)
+    key = TSNEEmbeddingCache.submit(_features(offset=1))
+    results = []
+    waiting = threading.Thread(target=lambda: results.append(TSNEEmbeddingCache.get(key)))
+    waiting.start()
+    time.sleep(0.1)
+
+    TSNEEmbeddingCache.clear()
+    waiting.join(10)
+    release.set()
+
+    assert results == [None]
+    np.testing.assert_array_equal(TSNEEmbeddingCache.embed(_features(offset=1)), _features(offset=1).to_numpy() * 2)
+
+
+def test_failed_embedding_is_computed_again(monkeypatch):
+    def mock_compute(features):
+        raise ValueError('perplexity must be less than n_samples')
+
+    monkeypatch.setattr(TSNEEmbeddingCache, 'compute', mock_compute)
+    key = TSNEEmbeddingCache.submit(_features())
+
+    with pytest.raises(ValueError):
+        TSNEEmbeddingCache.get(key)
+    assert TSNEEmbeddingCache.get(key) is None
+
+
+def test_embed_computes_embedding_if_caching_is_disabled(monkeypatch):
+    monkeypatch.setattr(tsne_embedding_cache, 'MAX_CACHED_EMBEDDINGS', 0)
+    computed = _count_computations(monkeypatch)
+
+    key = TSNEEmbeddingCache.submit(_features())
+    embedding = TSNEEmbeddingCache.embed(_features())
+
+    assert TSNEEmbeddingCache.get(key) is None
+    np.testing.assert_array_equal(embedding, _features().to_numpy() * 2)
+    assert len(computed) == 1
+
+
+def test_compute_returns_two_dimensional_embedding():
+    embedding = TSNEEmbeddingCache.compute(_features())
+
+    assert embedding.shape == (10, 2)
+    np.testing.assert_array_equal(embedding, TSNEEmbeddingCache.compute(_features()))
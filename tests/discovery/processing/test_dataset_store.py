@@ -0,0 +1,150 @@
+import os
+import pickle
+import stat
+import time
+
+import pandas as pd
+import pytest
+
+from slamd.discovery.processing import dataset_store
+from slamd.discovery.processing.dataset_store import DatasetStore
+from slamd.discovery.processing.models.dataset import Dataset
+
+
+def _create_dataset(name='test dataset'):
+    dataframe = pd.DataFrame({'Feature': [1.0, 2.0, None], 'Material': ['a', 'b', 'c']})
+    return Dataset(name=name, target_columns=['Feature'], dataframe=dataframe)
+
+
+def test_load_returns_saved_object_from_disk():
+    dataset = _create_dataset()
+    DatasetStore.save('store', 'id', dataset)
+    DatasetStore.clear_cache()
+
+    loaded = DatasetStore.load('store', 'id')
+
+    assert loaded is not dataset
+    assert loaded.name == dataset.name
+    assert loaded.target_columns == dataset.target_columns
+    pd.testing.assert_frame_equal(loaded.dataframe, dataset.dataframe)
+
+
+def test_load_returns_cached_object_without_reading_file(monkeypatch):
+    dataset = _create_dataset()
+    DatasetStore.save('store', 'id', dataset)
+
+    def mock_pickle_load(file):
+        raise AssertionError('The cached object must be used')
+
+    monkeypatch.setattr(pickle, 'load', mock_pickle_load)
+
+    assert DatasetStore.load('store', 'id').name == dataset.name
+
+
+def test_loaded_objects_are_not_shared():
+    dataset = _create_dataset()
+    DatasetStore.save('store', 'id', dataset)
+    dataset.dataframe.loc[0, 'Feature'] = -1.0
+
+    first = DatasetStore.load('store', 'id')
+    first.dataframe.loc[1, 'Feature'] = -2.0
+    second = DatasetStore.load('store', 'id')
+
+    assert first is not second
+    pd.testing.assert_frame_equal(second.dataframe, _create_dataset().dataframe)
+
+
+def test_load_reads_object_again_if_file_was_changed_by_other_process():
+    DatasetStore.save('store', 'id', _create_dataset('old'))
+
+    # Simulate another process writing the file
+    path = os.path.join(dataset_store.STORE_DIRECTORY, 'store', 'id.pkl')
+    modification_time = os.stat(path).st_mtime_ns
+    with open(path, 'wb') as file:
+        pickle.dump(_create_dataset('new'), file)
+    os.utime(path, ns=(modification_time, modification_time + 1000000000))
+
+    assert DatasetStore.load('store', 'id').name == 'new'
+
+
+def test_load_returns_none_for_unknown_or_deleted_objects():
+    DatasetStore.save('store', 'id', _create_dataset())
+    DatasetStore.delete('store', 'id')
+
+    assert DatasetStore.load('store', 'id') is None
+    assert DatasetStore.load('store', 'unknown') is None
+    assert DatasetStore.load('unknown', 'id') is None
+
+
+def test_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(dataset_store, 'MAX_CACHED_OBJECTS', 2)
+
+    for i in range(3):
+        DatasetStore.save('store', f'id {i}', _create_dataset(f'dataset {i}'))
+
+    assert [key for key in DatasetStore._entries] == [('store', 'id 1'), ('store', 'id 2')]
+    assert DatasetStore.load('store', 'id 0').name == 'dataset 0'
+
+
+def test_delete_store_removes_all_objects_of_store(dataset_store_directory):
+    DatasetStore.save('store', 'id 1', _create_dataset())
+    DatasetStore.save('store', 'id 2', _create_dataset())
+    DatasetStore.save('other store', 'id 1', _create_dataset())
+
+    DatasetStore.delete_store('store')
+
+    assert DatasetStore.load('store', 'id 1') is None
+    assert DatasetStore.load('store', 'id 2') is None
+    assert DatasetStore.load('other store', 'id 1') is not None
+    assert os.listdir(dataset_store_directory) == ['other store']
+
+
+def test_remove_old_stores_removes_only_unused_stores(dataset_store_directory):
+    DatasetStore.save('old store', 'id', _create_dataset())
+    DatasetStore.save('new store', 'id', _create_dataset())
+    two_days_ago = time.time() - 2 * 24 * 60 * 60
+    os.utime(dataset_store_directory / 'old store', (two_days_ago, two_days_ago))
+
+    removed = DatasetStore.remove_old_stores(max_age_seconds=24 * 60 * 60)
+
+    assert removed == ['old store']
+    assert DatasetStore.load('old store', 'id') is None
+    assert os.listdir(dataset_store_directory) == ['new store']
+
+
+def test_load_marks_store_as_used(dataset_store_directory):
+    DatasetStore.save('store', 'id', _create_dataset())
+    two_days_ago = time.time() - 2 * 24 * 60 * 60
+    os.utime(dataset_store_directory / 'store', (two_days_ago, two_days_ago))
+
+    DatasetStore.load('store', 'id')
+
+    assert DatasetStore.remove_old_stores(max_age_seconds=24 * 60 * 60) == []
+
+
+def test_save_removes_old_stores_at_most_once_per_interval(monkeypatch):
+    removals = []
+    monkeypatch.setattr(DatasetStore, '_last_cleanup', None)
+    monkeypatch.setattr(DatasetStore, 'remove_old_stores', lambda: removals.append(True))
+
+    DatasetStore.save('store', 'id 1', _create_dataset())
+    DatasetStore.save('store', 'id 2', _create_dataset())
+
+    assert len(removals) == 1
+
+
+def test_store_directory_is_private(dataset_store_directory):
+    DatasetStore.save('store', 'id', _create_dataset())
+
+    assert stat.S_IMODE(os.stat(dataset_store_directory).st_mode) == 0o700
+    assert stat.S_IMODE(os.stat(dataset_store_directory / 'store').st_mode) == 0o700
+
+
+def test_store_directory_of_other_user_is_refused(monkeypatch, dataset_store_directory):
+    os.makedirs(dataset_store_directory / 'store')
+    with open(dataset_store_directory / 'store' / 'id.pkl', 'wb') as file:
+        pickle.dump(_create_dataset('planted'), file)
+    monkeypatch.setattr(os, 'getuid', lambda: os.stat(dataset_store_directory).st_uid + 1)
+
+    with pytest.raises(PermissionError):
+        DatasetStore.load('store', 'id')
@@ -72,6 +72,43 @@ def test_slamd_runs_experiment_and_shows_result(client, monkeypatch):
     assert '<td>4</td>' in template
 
 
+def test_slamd_submits_experiment_job(client, monkeypatch):
+    monkeypatch.setattr(DiscoveryService, 'submit_experiment', lambda dataset_name, request: 'job id')
+
+    response = client.post('/materials/discovery/test_dataset/jobs', data=b'{}')
+
+    assert response.status_code == 202
+    assert json.loads(response.data.decode('utf-8')) == {'job_id': 'job id'}
+
+
+def test_slamd_returns_status_of_unfinished_experiment_job(client, monkeypatch):
+    status = {'job_id': 'job id', 'status': 'running', 'stages': [], 'error': None}
+    monkeypatch.setattr(DiscoveryService, 'collect_experiment_job_result', lambda job_id: None)
+    monkeypatch.setattr(DiscoveryService, 'get_experiment_job_status', lambda job_id: status)
+
+    status_response = client.get('/materials/discovery/experiment_jobs/job id')
+    result_response = client.get('/materials/discovery/experiment_jobs/job id/result')
+
+    assert status_response.status_code == 200
+    assert json.loads(status_response.data.decode('utf-8')) == status
+    assert result_response.status_code == 202
+    assert json.loads(result_response.data.decode('utf-8')) == status
+
+
+def test_slamd_shows_result_of_finished_experiment_job(client, monkeypatch):
+    def mock_collect_experiment_job_result(job_id):
+        return pd.DataFrame.from_dict({'feature': [1, 2], 'prediction': [3, 4]}), None
+
+    monkeypatch.setattr(DiscoveryService, 'collect_experiment_job_result', mock_collect_experiment_job_result)
+
+    response = client.get('/materials/discovery/experiment_jobs/job id/result')
+
+    assert response.status_code == 200
+    template = json.loads(response.data.decode('utf-8'))['template']
+    assert 'id="formulations_dataframe"' in template
+    assert '<th>prediction</th>' in template
+
+
 def test_slamd_generates_tsne_plot(client, monkeypatch):
     def mock_create_tsne_plot():
         return json.dumps({'mock tsne': 1})
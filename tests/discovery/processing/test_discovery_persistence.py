@@ -1,8 +1,31 @@
+from flask import session
+
+from slamd.discovery.processing.dataset_store import DatasetStore
 from slamd.discovery.processing.discovery_persistence import DiscoveryPersistence
 from slamd.discovery.processing.models.dataset import Dataset
+from slamd.discovery.processing.models.prediction import Prediction
+
+
+def _mock_dataset_store(monkeypatch, stored_objects):
+    def mock_save(store_id, object_id, obj):
+        stored_objects[(store_id, object_id)] = obj
+
+    def mock_load(store_id, object_id):
+        return stored_objects.get((store_id, object_id), None)
+
+    def mock_delete(store_id, object_id):
+        stored_objects.pop((store_id, object_id), None)
+
+    monkeypatch.setattr(DatasetStore, 'save', mock_save)
+    monkeypatch.setattr(DatasetStore, 'load', mock_load)
+    monkeypatch.setattr(DatasetStore, 'delete', mock_delete)
+    monkeypatch.setattr(DiscoveryPersistence, 'get_session_store_id', lambda: 'test store')
 
 
 def test_save_dataset_sets_new_dataset(monkeypatch):
+    stored_objects = {}
+    _mock_dataset_store(monkeypatch, stored_objects)
+
     def mock_get_session_property():
         return {}
 
@@ -18,18 +41,24 @@ def test_save_dataset_sets_new_dataset(monkeypatch):
 
     dataset = Dataset(name='test name')
     DiscoveryPersistence.save_dataset(dataset)
-    assert mock_set_session_property_called_with == {dataset.name: dataset}
+
+    dataset_id = mock_set_session_property_called_with[dataset.name]
+    assert list(mock_set_session_property_called_with.keys()) == [dataset.name]
+    assert stored_objects == {('test store', dataset_id): dataset}
 
 
 def test_save_dataset_appends_dataset_to_existing_ones(monkeypatch):
+    stored_objects = {}
+    _mock_dataset_store(monkeypatch, stored_objects)
+
     def mock_get_session_property():
-        return [Dataset('test dataset')]
+        return {'test dataset': 'id of test dataset'}
 
     mock_extend_session_property_called_with = None
 
-    def mock_extend_session_property(dataset):
+    def mock_extend_session_property(dataset_name, dataset_id):
         nonlocal mock_extend_session_property_called_with
-        mock_extend_session_property_called_with = dataset
+        mock_extend_session_property_called_with = dataset_name, dataset_id
         return None
 
     monkeypatch.setattr(DiscoveryPersistence, 'get_session_property', mock_get_session_property)
@@ -37,34 +66,48 @@ def test_save_dataset_appends_dataset_to_existing_ones(monkeypatch):
 
     dataset = Dataset(name='test new dataset')
     DiscoveryPersistence.save_dataset(dataset)
-    assert mock_extend_session_property_called_with == dataset
+
+    dataset_name, dataset_id = mock_extend_session_property_called_with
+    assert dataset_name == dataset.name
+    assert dataset_id != 'id of test dataset'
+    assert stored_objects == {('test store', dataset_id): dataset}
+
+
+def test_save_dataset_overwrites_dataset_with_same_name(monkeypatch):
+    stored_objects = {('test store', 'id of test dataset'): Dataset('test dataset')}
+    _mock_dataset_store(monkeypatch, stored_objects)
+    monkeypatch.setattr(DiscoveryPersistence, 'get_session_property', lambda: {'test dataset': 'id of test dataset'})
+    monkeypatch.setattr(DiscoveryPersistence, 'extend_session_property', lambda dataset_name, dataset_id: None)
+
+    dataset = Dataset(name='test dataset', target_columns=['new target'])
+    DiscoveryPersistence.save_dataset(dataset)
+
+    assert stored_objects == {('test store', 'id of test dataset'): dataset}
 
 
 def test_delete_dataset_by_name_removes_dataset_of_specified_name(monkeypatch):
-    to_be_removed = Dataset('to be removed')
     to_be_kept = Dataset('to be kept')
+    stored_objects = {('test store', 'id 1'): Dataset('to be removed'), ('test store', 'id 2'): to_be_kept}
+    _mock_dataset_store(monkeypatch, stored_objects)
 
-    mock_get_session_property_called = False
+    datasets = {'to be removed': 'id 1', 'to be kept': 'id 2'}
+    monkeypatch.setattr(DiscoveryPersistence, 'get_session_property', lambda: datasets)
 
-    def mock_get_session_property():
-        nonlocal mock_get_session_property_called
-        mock_get_session_property_called = True
-        return {'to be removed': to_be_removed, 'to be kept': to_be_kept}
-
-    monkeypatch.setattr(DiscoveryPersistence, 'get_session_property', mock_get_session_property)
+    deleted_dataset_id = DiscoveryPersistence.delete_dataset_by_name('to be removed')
 
-    deleted_dataset = DiscoveryPersistence.delete_dataset_by_name('to be removed')
-    assert mock_get_session_property_called is True
-    assert deleted_dataset == to_be_removed
+    assert deleted_dataset_id == 'id 1'
+    assert datasets == {'to be kept': 'id 2'}
+    assert stored_objects == {('test store', 'id 2'): to_be_kept}
 
 
 def test_query_dataset_by_name_calls_session(monkeypatch):
+    _mock_dataset_store(monkeypatch, {('test store', 'id 1'): Dataset('test dataset')})
     mock_get_session_property_called = False
 
     def mock_get_session_property():
         nonlocal mock_get_session_property_called
         mock_get_session_property_called = True
-        return {'test dataset': Dataset('test dataset')}
+        return {'test dataset': 'id 1'}
 
     monkeypatch.setattr(DiscoveryPersistence, 'get_session_property', mock_get_session_property)
     result = DiscoveryPersistence.query_dataset_by_name('test dataset')
@@ -75,13 +118,15 @@ def test_query_dataset_by_name_calls_session(monkeypatch):
 
 def test_query_dataset_by_name_returns_dataset_of_specified_name(monkeypatch):
     to_be_returned = Dataset('to be returned')
+    _mock_dataset_store(monkeypatch, {('test store', 'id 1'): to_be_returned,
+                                      ('test store', 'id 2'): Dataset('another dataset')})
 
     mock_get_session_property_called = False
 
     def mock_get_session_property():
         nonlocal mock_get_session_property_called
         mock_get_session_property_called = True
-        return {'to be returned': to_be_returned, 'another dataset': Dataset('another dataset')}
+        return {'to be returned': 'id 1', 'another dataset': 'id 2'}
 
     monkeypatch.setattr(DiscoveryPersistence, 'get_session_property', mock_get_session_property)
 
@@ -91,14 +136,15 @@ def test_query_dataset_by_name_returns_dataset_of_specified_name(monkeypatch):
 
 
 def test_query_dataset_by_name_returns_none_if_not_found(monkeypatch):
-    to_be_returned = Dataset('to be returned')
+    _mock_dataset_store(monkeypatch, {('test store', 'id 1'): Dataset('to be returned'),
+                                      ('test store', 'id 2'): Dataset('another dataset')})
 
     mock_get_session_property_called = False
 
     def mock_get_session_property():
         nonlocal mock_get_session_property_called
         mock_get_session_property_called = True
-        return {'to be returned': to_be_returned, 'another dataset': Dataset('another dataset')}
+        return {'to be returned': 'id 1', 'another dataset': 'id 2'}
 
     monkeypatch.setattr(DiscoveryPersistence, 'get_session_property', mock_get_session_property)
 
@@ -108,6 +154,7 @@ def test_query_dataset_by_name_returns_none_if_not_found(monkeypatch):
 
 
 def test_find_all_datasets_returns_empty_list_at_start(monkeypatch):
+    _mock_dataset_store(monkeypatch, {})
     mock_get_session_property_called = False
 
     def mock_get_session_property():
@@ -124,12 +171,14 @@ def test_find_all_datasets_returns_empty_list_at_start(monkeypatch):
 
 
 def test_find_all_datasets_returns_datasets_as_list(monkeypatch):
+    _mock_dataset_store(monkeypatch, {('test store', 'id 1'): Dataset('dataset 1'),
+                                      ('test store', 'id 2'): Dataset('dataset 2')})
     mock_get_session_property_called = False
 
     def mock_get_session_property():
         nonlocal mock_get_session_property_called
         mock_get_session_property_called = True
-        return {'dataset 1': Dataset('dataset 1'), 'dataset 2': Dataset('dataset 2')}
+        return {'dataset 1': 'id 1', 'dataset 2': 'id 2'}
 
     monkeypatch.setattr(DiscoveryPersistence, 'get_session_property', mock_get_session_property)
 
@@ -137,3 +186,33 @@ def test_find_all_datasets_returns_datasets_as_list(monkeypatch):
     assert len(result) == 2
     assert result == [Dataset('dataset 1'), Dataset('dataset 2')]
     assert mock_get_session_property_called is True
+
+
+def test_datasets_of_sessions_created_before_dataset_store_are_moved_to_store(app):
+    app.secret_key = 'test'
+    dataset = Dataset(name='test name')
+
+    with app.test_request_context():
+        session['datasets'] = {'test name': dataset}
+        session['sequential_learning_predictions'] = Prediction('test name', None, {})
+
+        assert DiscoveryPersistence.query_dataset_by_name('test name').name == 'test name'
+        assert DiscoveryPersistence.query_prediction().dataset_used_for_prediction == 'test name'
+        assert isinstance(session['datasets']['test name'], str)
+        assert isinstance(session['sequential_learning_predictions'], str)
+        assert DiscoveryPersistence.query_prediction().dataset_used_for_prediction == 'test name'
+
+
+def test_delete_session_store_removes_stored_objects(app, dataset_store_directory):
+    app.secret_key = 'test'
+
+    with app.test_request_context():
+        DiscoveryPersistence.save_dataset(Dataset(name='test name'))
+        DiscoveryPersistence.save_prediction('prediction')
+        store_id = DiscoveryPersistence.get_session_store_id()
+
+        DiscoveryPersistence.delete_session_store()
+
+        assert not (dataset_store_directory / store_id).exists()
+        assert DiscoveryPersistence.find_all_datasets() == []
+        assert DiscoveryPersistence.query_prediction() == {}
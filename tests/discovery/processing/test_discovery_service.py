@@ -1,5 +1,6 @@
 from io import BytesIO
 
+import numpy as np
 import pandas as pd
 import pytest
 from pandas import DataFrame
@@ -9,7 +10,9 @@ from slamd import create_app
 from slamd.common.error_handling import DatasetNotFoundException, PlotDataNotFoundException
 from slamd.discovery.processing.discovery_persistence import DiscoveryPersistence
 from slamd.discovery.processing.discovery_service import DiscoveryService
+from slamd.discovery.processing.experiment.experiment_data import ExperimentData
 from slamd.discovery.processing.experiment.plot_generator import PlotGenerator
+from slamd.discovery.processing.experiment.tsne_embedding_cache import TSNEEmbeddingCache
 from slamd.discovery.processing.forms.upload_dataset_form import UploadDatasetForm
 from slamd.discovery.processing.models.dataset import Dataset
 from slamd.discovery.processing.models.prediction import Prediction
@@ -149,7 +152,8 @@ def test_create_tsne_plot_calls_generator_with_proper_data(monkeypatch):
         nolabel_index = pd.Index([0, 1], dtype='int64')
         partially_labelled_index = pd.Index([0], dtype='int64')
         return TSNEPlotData(utility=utility,
-                            features_df=features_df,
+                            embedding_key='embedding key',
+                            index=features_df.index,
                             index_all_labelled=label_index,
                             index_none_labelled=nolabel_index,
                             index_partially_labelled=partially_labelled_index)
@@ -161,13 +165,14 @@ def test_create_tsne_plot_calls_generator_with_proper_data(monkeypatch):
         mock_create_tsne_input_space_plot_called_with = plot_df
 
     monkeypatch.setattr(DiscoveryPersistence, 'get_session_tsne_plot_data', mock_get_session_tsne_plot_data)
+    monkeypatch.setattr(TSNEEmbeddingCache, 'get', _mock_get_embedding)
     monkeypatch.setattr(PlotGenerator, 'create_tsne_input_space_plot', mock_create_tsne_input_space_plot)
 
     DiscoveryService.create_tsne_plot()
 
     assert mock_create_tsne_input_space_plot_called_with.to_dict() == {'Row number': {1: 1, 0: 2},
-                                                                       0: {1: 0.7071067811865475,
-                                                                           0: -0.7071067811865475},
+                                                                       't-SNE-1': {1: 1.0, 0: -1.0},
+                                                                       't-SNE-2': {1: -2.0, 0: 2.0},
                                                                        'is_train_data': {1: 'Labelled', 0: 'Predicted'},
                                                                        'Utility': {1: 1, 0: 0}}
 
@@ -180,7 +185,8 @@ def test_create_tsne_plot_calls_generator_with_proper_data(monkeypatch):
         nolabel_index = pd.Index([0, 1], dtype='int64')
         partially_labelled_index = pd.Index([0], dtype='int64')
         return TSNEPlotData(utility=utility,
-                            features_df=features_df,
+                            embedding_key='embedding key',
+                            index=features_df.index,
                             index_all_labelled=label_index,
                             index_none_labelled=nolabel_index,
                             index_partially_labelled=partially_labelled_index)
@@ -192,13 +198,14 @@ def test_create_tsne_plot_calls_generator_with_proper_data(monkeypatch):
         mock_create_tsne_input_space_plot_called_with = plot_df
 
     monkeypatch.setattr(DiscoveryPersistence, 'get_session_tsne_plot_data', mock_get_session_tsne_plot_data)
+    monkeypatch.setattr(TSNEEmbeddingCache, 'get', _mock_get_embedding)
     monkeypatch.setattr(PlotGenerator, 'create_tsne_input_space_plot', mock_create_tsne_input_space_plot)
 
     DiscoveryService.create_tsne_plot()
 
     assert mock_create_tsne_input_space_plot_called_with.to_dict() == {'Row number': {1: 1, 0: 2},
-                                                                       0: {1: 0.7071067811865475,
-                                                                           0: -0.7071067811865475},
+                                                                       't-SNE-1': {1: 1.0, 0: -1.0},
+                                                                       't-SNE-2': {1: -2.0, 0: 2.0},
                                                                        'is_train_data': {1: 'Labelled', 0: 'Predicted'},
                                                                        'Utility': {1: 1, 0: 0}}
 
@@ -211,7 +218,8 @@ def test_create_tsne_plot_creates_plot_for_mutually_exclusively_labelled_date(mo
         nolabel_index = pd.Index([], dtype='int64')
         partially_labelled_index = pd.Index([0, 1], dtype='int64')
         return TSNEPlotData(utility=utility,
-                            features_df=features_df,
+                            embedding_key='embedding key',
+                            index=features_df.index,
                             index_all_labelled=label_index,
                             index_none_labelled=nolabel_index,
                             index_partially_labelled=partially_labelled_index)
@@ -223,12 +231,56 @@ def test_create_tsne_plot_creates_plot_for_mutually_exclusively_labelled_date(mo
         mock_create_tsne_input_space_plot_called_with = plot_df
 
     monkeypatch.setattr(DiscoveryPersistence, 'get_session_tsne_plot_data', mock_get_session_tsne_plot_data)
+    monkeypatch.setattr(TSNEEmbeddingCache, 'get', _mock_get_embedding)
     monkeypatch.setattr(PlotGenerator, 'create_tsne_input_space_plot', mock_create_tsne_input_space_plot)
 
     DiscoveryService.create_tsne_plot()
 
     assert mock_create_tsne_input_space_plot_called_with.to_dict() == {'Row number': {1: 1, 0: 2},
-                                                                       0: {1: 0.7071067811865475,
-                                                                           0: -0.7071067811865475},
+                                                                       't-SNE-1': {1: 1.0, 0: -1.0},
+                                                                       't-SNE-2': {1: -2.0, 0: 2.0},
                                                                        'is_train_data': {1: 'Predicted', 0: 'Predicted'},
-                                                                       'Utility': {1: 1, 0: 0}}
\ No newline at end of file
+                                                                       'Utility': {1: 1, 0: 0}}
+
+
+def test_create_tsne_plot_computes_embedding_from_last_experiment_if_not_cached(monkeypatch):
+    features_df = pd.DataFrame({'f1': [1.0, 2.0], 'f2': [3.0, 3.0]})
+    experiment = ExperimentData(dataframe=features_df, feature_names=['f1', 'f2'])
+    tsne_plot_data = TSNEPlotData(utility=pd.Series([0.5]), embedding_key='evicted key',
+                                  index=features_df.index, index_all_labelled=pd.Index([1], dtype='int64'),
+                                  index_none_labelled=pd.Index([0], dtype='int64'),
+                                  index_partially_labelled=pd.Index([], dtype='int64'))
+
+    mock_embed_called_with = None
+
+    def mock_embed(features):
+        nonlocal mock_embed_called_with
+        mock_embed_called_with = features
+        return _mock_get_embedding('embedding key')
+
+    monkeypatch.setattr(DiscoveryPersistence, 'get_session_tsne_plot_data', lambda: tsne_plot_data)
+    monkeypatch.setattr(DiscoveryPersistence, 'query_experiment', lambda: experiment)
+    monkeypatch.setattr(TSNEEmbeddingCache, 'embed', mock_embed)
+    monkeypatch.setattr(PlotGenerator, 'create_tsne_input_space_plot', lambda plot_df: plot_df)
+
+    plot_df = DiscoveryService.create_tsne_plot()
+
+    assert mock_embed_called_with.to_dict(orient='list') == {'f1': [-0.7071067811865475, 0.7071067811865475],
+                                                             'f2': [0.0, 0.0]}
+    assert plot_df.to_dict(orient='list') == {'Row number': [1, 2], 't-SNE-1': [-1.0, 1.0], 't-SNE-2': [2.0, -2.0],
+                                              'is_train_data': ['Predicted', 'Labelled'], 'Utility': [0.5, -np.inf]}
+
+
+def test_create_tsne_plot_raises_exception_when_embedding_and_experiment_are_missing(monkeypatch):
+    tsne_plot_data = TSNEPlotData(utility=pd.Series([0]), embedding_key='evicted key', index=pd.Index([0]))
+
+    monkeypatch.setattr(DiscoveryPersistence, 'get_session_tsne_plot_data', lambda: tsne_plot_data)
+    monkeypatch.setattr(DiscoveryPersistence, 'query_experiment', lambda: None)
+
+    with pytest.raises(PlotDataNotFoundException):
+        DiscoveryService.create_tsne_plot()
+
+
+def _mock_get_embedding(key):
+    assert key == 'embedding key'
+    return np.array([[-1.0, 2.0], [1.0, -2.0]])
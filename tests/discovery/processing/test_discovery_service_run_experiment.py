@@ -1,9 +1,17 @@
+import time
+
 import numpy as np
 import pandas as pd
+import pytest
 
+from slamd.common.error_handling import SlamdUnprocessableEntityException
 from slamd.discovery.processing.discovery_persistence import DiscoveryPersistence
 from slamd.discovery.processing.discovery_service import DiscoveryService
+from slamd.discovery.processing.experiment.experiment_conductor import ExperimentConductor
+from slamd.discovery.processing.experiment.fitted_model_cache import FittedModelCache
+from slamd.discovery.processing.experiment.kernel_warm_start_store import KernelWarmStartStore
 from slamd.discovery.processing.experiment.plot_generator import PlotGenerator
+from slamd.discovery.processing.experiment.tsne_embedding_cache import TSNEEmbeddingCache
 from slamd.discovery.processing.models.dataset import Dataset
 from tests.discovery.processing.test_dataframe_dicts import *
 
@@ -37,8 +45,8 @@ def test_run_experiment_with_gauss_without_thresholds_and_saves_result(monkeypat
     assert scatter_plot == 'Dummy Plot'
 
     assert mock_save_tsne_plot_data_called_with.utility.replace({np.nan: None}).to_dict() == TEST_GAUSS_TSNE_PLOT_UTILITY
-    assert mock_save_tsne_plot_data_called_with.features_df.replace(
-        {np.nan: None}).to_dict() == TEST_TSNE_PLOT_FEATURES_INDEX
+    assert mock_save_tsne_plot_data_called_with.embedding_key == _normalized_features_key(TEST_TSNE_PLOT_FEATURES_INDEX)
+    assert list(mock_save_tsne_plot_data_called_with.index) == list(range(13))
     assert list(mock_save_tsne_plot_data_called_with.index_all_labelled.values) == [0, 1, 2, 3]
     assert list(mock_save_tsne_plot_data_called_with.index_none_labelled.values) == [4, 5, 6, 7, 8, 9, 10, 11, 12]
 
@@ -72,8 +80,8 @@ def test_run_experiment_with_random_forest_without_thresholds_and_saves_result(m
     assert scatter_plot == 'Dummy Plot'
 
     assert mock_save_tsne_plot_data_called_with.utility.replace({np.nan: None}).to_dict() == TEST_RF_TSNE_PLOT_UTILITY
-    assert mock_save_tsne_plot_data_called_with.features_df.replace(
-        {np.nan: None}).to_dict() == TEST_TSNE_PLOT_FEATURES_INDEX
+    assert mock_save_tsne_plot_data_called_with.embedding_key == _normalized_features_key(TEST_TSNE_PLOT_FEATURES_INDEX)
+    assert list(mock_save_tsne_plot_data_called_with.index) == list(range(13))
     assert list(mock_save_tsne_plot_data_called_with.index_all_labelled.values) == [0, 1, 2, 3]
     assert list(mock_save_tsne_plot_data_called_with.index_none_labelled.values) == [4, 5, 6, 7, 8, 9, 10, 11, 12]
 
@@ -130,6 +138,110 @@ def test_run_experiment_with_partially_labelled_data(monkeypatch):
     assert mock_save_prediction_called_with.metadata == TEST_GAUSS_WITH_PART_LABELS_CONFIG
 
 
+def test_rerank_experiment_reuses_last_experiment(monkeypatch):
+    _mock_dataset_and_plot(monkeypatch, TEST_GAUSS_WITHOUT_THRESH_INPUT, 'Target: X')
+    _mock_experiment_persistence(monkeypatch)
+    DiscoveryService.run_experiment('test_data', TEST_GAUSS_WITHOUT_THRESH_CONFIG)
+
+    new_config = {**TEST_GAUSS_WITHOUT_THRESH_CONFIG, 'curiosity': '0.2',
+                  'a_priori_information_configurations': [{'max_or_min': 'max', 'weight': '0.50', 'threshold': ''}]}
+    expected_df, _ = DiscoveryService.run_experiment('test_data', new_config)
+
+    mock_run_called = False
+
+    def mock_run(exp):
+        nonlocal mock_run_called
+        mock_run_called = True
+
+    monkeypatch.setattr(ExperimentConductor, 'run', mock_run)
+    df_with_prediction, scatter_plot = DiscoveryService.rerank_experiment('test_data', new_config)
+
+    assert mock_run_called is False
+    assert df_with_prediction.replace({np.nan: None}).to_dict() == expected_df.replace({np.nan: None}).to_dict()
+    assert scatter_plot == 'Dummy Plot'
+
+
+def test_rerank_experiment_reuses_last_experiment_if_feature_has_missing_values(monkeypatch):
+    data = {**TEST_GAUSS_WITHOUT_THRESH_INPUT, 'Incomplete': {index: 1.0 for index in range(12)}}
+    config = {**TEST_GAUSS_WITHOUT_THRESH_CONFIG,
+              'materials_data_input': TEST_GAUSS_WITHOUT_THRESH_CONFIG['materials_data_input'] + ['Incomplete']}
+    _mock_dataset_and_plot(monkeypatch, data, 'Target: X')
+    _mock_experiment_persistence(monkeypatch)
+    DiscoveryService.run_experiment('test_data', config)
+
+    new_config = {**config, 'curiosity': '0.2',
+                  'materials_data_input': TEST_GAUSS_WITHOUT_THRESH_CONFIG['materials_data_input'] + ['Incomplete']}
+    mock_run_called = False
+
+    def mock_run(exp):
+        nonlocal mock_run_called
+        mock_run_called = True
+
+    monkeypatch.setattr(ExperimentConductor, 'run', mock_run)
+    DiscoveryService.rerank_experiment('test_data', new_config)
+
+    assert config['materials_data_input'][-1] == 'Incomplete'
+    assert mock_run_called is False
+
+
+def test_rerank_experiment_keeps_last_experiment_if_configuration_is_invalid(monkeypatch):
+    _mock_dataset_and_plot(monkeypatch, TEST_GAUSS_WITHOUT_THRESH_INPUT, 'Target: X')
+    _mock_experiment_persistence(monkeypatch)
+    DiscoveryService.run_experiment('test_data', TEST_GAUSS_WITHOUT_THRESH_CONFIG)
+    last_experiment = DiscoveryPersistence.query_experiment()
+
+    invalid_config = {**TEST_GAUSS_WITHOUT_THRESH_CONFIG, 'curiosity': '0.2',
+                      'target_configurations': [{'max_or_min': 'max', 'weight': '1.00', 'threshold': ''},
+                                                {'max_or_min': 'max', 'weight': '1.00', 'threshold': ''}]}
+    with pytest.raises(SlamdUnprocessableEntityException):
+        DiscoveryService.rerank_experiment('test_data', invalid_config)
+
+    assert DiscoveryPersistence.query_experiment() is last_experiment
+    assert last_experiment.curiosity == 1.48450244698206
+    assert last_experiment.target_weights == [1.0]
+
+
+def test_rerank_experiment_runs_experiment_if_model_changed(monkeypatch):
+    _mock_dataset_and_plot(monkeypatch, TEST_GAUSS_WITHOUT_THRESH_INPUT, 'Target: X')
+    _mock_experiment_persistence(monkeypatch)
+    DiscoveryService.run_experiment('test_data', TEST_GAUSS_WITHOUT_THRESH_CONFIG)
+
+    df_with_prediction, _ = DiscoveryService.rerank_experiment('test_data', TEST_RF_WITHOUT_THRESH_CONFIG)
+
+    assert df_with_prediction.replace({np.nan: None}).to_dict() == TEST_RF_WITHOUT_THRESH_PRED
+
+
+def test_experiment_job_returns_same_result_as_run_experiment(monkeypatch):
+    _mock_dataset_and_plot(monkeypatch, TEST_GAUSS_WITHOUT_THRESH_INPUT, 'Target: X')
+    _mock_experiment_persistence(monkeypatch)
+    expected_df, _ = DiscoveryService.run_experiment('test_data', TEST_GAUSS_WITHOUT_THRESH_CONFIG)
+    FittedModelCache.clear()
+    KernelWarmStartStore.clear()
+    monkeypatch.setattr(DiscoveryPersistence, 'save_prediction', lambda prediction: None)
+
+    job_id = DiscoveryService.submit_experiment('test_data', TEST_GAUSS_WITHOUT_THRESH_CONFIG)
+    result = None
+    for _ in range(1000):
+        result = DiscoveryService.collect_experiment_job_result(job_id)
+        if result is not None:
+            break
+        time.sleep(0.01)
+
+    df_with_prediction, scatter_plot = result
+    assert DiscoveryService.get_experiment_job_status(job_id)['status'] == 'finished'
+    assert df_with_prediction.replace({np.nan: None}).to_dict() == expected_df.replace({np.nan: None}).to_dict()
+    assert scatter_plot == 'Dummy Plot'
+
+
+def _mock_experiment_persistence(monkeypatch):
+    saved = {}
+    monkeypatch.setattr(DiscoveryPersistence, 'save_prediction', lambda prediction: saved.update(prediction=prediction))
+    monkeypatch.setattr(DiscoveryPersistence, 'save_experiment', lambda experiment: saved.update(experiment=experiment))
+    monkeypatch.setattr(DiscoveryPersistence, 'save_tsne_plot_data', lambda tsne_plot_data: None)
+    monkeypatch.setattr(DiscoveryPersistence, 'query_prediction', lambda: saved.get('prediction'))
+    monkeypatch.setattr(DiscoveryPersistence, 'query_experiment', lambda: saved.get('experiment'))
+
+
 def _mock_dataset_and_plot(monkeypatch, data, target_names):
     def mock_query_dataset_by_name(dataset_name):
         test_df = pd.DataFrame.from_dict(data)
@@ -143,4 +255,11 @@ def _mock_dataset_and_plot(monkeypatch, data, target_names):
         return 'Dummy Plot'
 
     monkeypatch.setattr(DiscoveryPersistence, 'query_dataset_by_name', mock_query_dataset_by_name)
+    monkeypatch.setattr(DiscoveryPersistence, 'get_session_store_id', lambda: 'test store')
+    monkeypatch.setattr(DiscoveryPersistence, 'save_experiment', lambda experiment: None)
     monkeypatch.setattr(PlotGenerator, 'create_target_scatter_plot', mock_create_target_scatter_plot)
+
+
+def _normalized_features_key(features):
+    features_df = pd.DataFrame(features)
+    return TSNEEmbeddingCache.create_key((features_df - features_df.mean()) / features_df.std().replace(0, 1))
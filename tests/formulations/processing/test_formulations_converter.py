@@ -0,0 +1,32 @@
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from slamd.formulations.processing.formulations_converter import FormulationsConverter
+
+
+def test_combination_at_returns_element_of_product():
+    materials = [['P1', 'P2'], ['L1'], ['A1', 'A2', 'A3']]
+
+    combinations = [FormulationsConverter._combination_at(materials, i) for i in range(6)]
+
+    assert combinations == list(product(*materials))
+
+
+def test_postprocess_dataframe_computes_totals_with_missing_values():
+    dataframe = pd.DataFrame({
+        'Powder (kg)': [100.0, 200.0, 300.0],
+        'costs (Powder)': [1000.0, 2000.0, 3000.0],
+        'costs (Liquid)': [5.0, np.nan, 1.0],
+        'co2_footprint (Powder)': [1234.0, 10.0, 0.0],
+        'delivery_time (Powder)': [3.0, np.nan, np.nan],
+        'delivery_time (Liquid)': [np.nan, 7.0, np.nan],
+    })
+
+    result = FormulationsConverter._postprocess_dataframe(dataframe)
+
+    assert list(result.columns) == ['Powder (kg)', 'total costs', 'total co2_footprint', 'total delivery_time ']
+    assert result['total costs'].replace({np.nan: None}).tolist() == [1.0, None, 3.0]
+    assert result['total co2_footprint'].tolist() == [1.23, 0.01, 0.0]
+    assert result['total delivery_time '].tolist() == [3.0, 7.0, 0.0]
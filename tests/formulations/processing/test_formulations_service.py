@@ -8,7 +8,9 @@ from slamd.common.error_handling import ValueNotSupportedException, SlamdRequest
 from slamd.discovery.processing.discovery_facade import DiscoveryFacade
 from slamd.discovery.processing.models.dataset import Dataset
 from slamd.formulations.processing.building_materials_factory import BuildingMaterialsFactory
+from slamd.formulations.processing.formulations_converter import FormulationsConverter
 from slamd.formulations.processing.strategies.binder_strategy import BinderStrategy
+from slamd.formulations.processing.strategies.concrete_strategy import ConcreteStrategy
 from slamd.formulations.processing.formulations_service import FormulationsService
 from slamd.materials.processing.materials_facade import MaterialsFacade, MaterialsForFormulations
 from slamd.materials.processing.models.aggregates import Aggregates
@@ -205,6 +207,96 @@ def test_create_materials_formulations_creates_initial_formulation_batch_for_con
     assert mock_save_and_overwrite_dataset_called_with[1] == 'temporary_concrete.csv'
 
 
+def test_create_materials_formulations_samples_rows_of_full_formulation(monkeypatch):
+    _mock_formulation_batch_dependencies(monkeypatch)
+    full_df = FormulationsService.create_materials_formulations(_create_formulations_data(1), 'concrete')
+
+    sampled_df = FormulationsService.create_materials_formulations(_create_formulations_data(0.5), 'concrete')
+
+    assert len(sampled_df) == 4
+    assert list(sampled_df['Idx_Sample']) == [0, 1, 2, 3]
+    full_rows = full_df.drop(columns='Idx_Sample').replace({np.nan: None}).to_dict(orient='records')
+    for row in sampled_df.drop(columns='Idx_Sample').replace({np.nan: None}).to_dict(orient='records'):
+        assert row in full_rows
+
+
+def test_create_materials_formulations_keeps_all_columns_and_shuffles_sampled_rows(monkeypatch):
+    _mock_formulation_batch_dependencies(monkeypatch)
+    full_df = FormulationsService.create_materials_formulations(_create_formulations_data(1), 'concrete')
+
+    sorted_samples = 0
+    for seed in range(10):
+        np.random.seed(seed)
+        sampled_df = FormulationsService.create_materials_formulations(_create_formulations_data(0.5), 'concrete')
+
+        assert list(sampled_df.columns) == list(full_df.columns)
+        pd.testing.assert_frame_equal(sampled_df.drop(columns='Idx_Sample'),
+                                      full_df.drop(columns='Idx_Sample').loc[sampled_df.index], check_dtype=False)
+        sorted_samples += sampled_df.index.is_monotonic_increasing
+    assert sorted_samples < 10
+
+
+def test_create_materials_formulations_keeps_columns_of_materials_that_were_not_sampled(monkeypatch):
+    _mock_formulation_batch_dependencies(monkeypatch)
+    full_df = FormulationsService.create_materials_formulations(_create_formulations_data(1), 'concrete')
+    # Only rows with the second powder, which has fewer properties than the first one
+    monkeypatch.setattr(ConcreteStrategy, '_sample_rows',
+                        lambda number_of_all_rows, sample_size: np.arange(sample_size, number_of_all_rows))
+
+    sampled_df = FormulationsService.create_materials_formulations(_create_formulations_data(0.5), 'concrete')
+
+    assert set(sampled_df['Materials']) == {full_df['Materials'][7]}
+    assert list(sampled_df.columns) == list(full_df.columns)
+    assert sorted(sampled_df.index) == [4, 5, 6, 7]
+
+
+def test_create_materials_formulations_rejects_too_large_formulation_before_creating_it(monkeypatch):
+    _mock_formulation_batch_dependencies(monkeypatch)
+
+    def mock_formulation_to_df(materials, weight_data, selected_rows=None):
+        raise AssertionError('Formulation should not be created')
+
+    monkeypatch.setattr(FormulationsConverter, 'formulation_to_df', mock_formulation_to_df)
+    formulations_data = _create_formulations_data(1)
+    formulations_data['weights_request_data']['all_weights'] *= 2000
+
+    with pytest.raises(SlamdRequestTooLargeException):
+        FormulationsService.create_materials_formulations(formulations_data, 'concrete')
+
+
+def _mock_formulation_batch_dependencies(monkeypatch):
+    def mock_get_material(material_type, uuid):
+        if material_type == 'Powder':
+            if uuid == 'additional':
+                return _create_additional_powder()
+            return prepare_test_base_powders_for_blending(material_type, uuid)
+        elif material_type == 'Liquid':
+            return prepare_test_base_liquids_for_blending(material_type, uuid)
+        return prepare_test_base_aggregates_for_blending(material_type, uuid)
+
+    monkeypatch.setattr(DiscoveryFacade, 'query_dataset_by_name', lambda filename: None)
+    monkeypatch.setattr(DiscoveryFacade, 'save_and_overwrite_dataset', lambda dataset, filename: None)
+    monkeypatch.setattr(MaterialsFacade, 'get_material', mock_get_material)
+
+
+def _create_formulations_data(sampling_size):
+    return {
+        'materials_request_data': {
+            'materials_formulation_configuration': [
+                {'uuids': 'uuid1,additional', 'type': 'Powder'},
+                {'uuids': 'uuid2', 'type': 'Liquid'},
+                {'uuids': 'uuid3', 'type': 'Aggregates'}]
+        },
+        'weights_request_data': {
+            'all_weights': ['200.0/20.0/780.0', '200.0/30.0/770.0', '300.0/20.0/680.0', '300.0/30.0/670.0']
+        },
+        'processes_request_data': {
+            'processes': []
+        },
+        'sampling_size': sampling_size
+    }
+
+
 # As we already tested details of the creation of a batch for concrete we choose to only check the basic data flow here
 def test_create_materials_formulations_creates_initial_formulation_batch_for_binder(monkeypatch):
     mock_create_building_material_strategy_called_with = None
@@ -0,0 +1,59 @@
+import pytest
+
+from slamd.common.error_handling import SlamdRequestTooLargeException
+from slamd.formulations.processing.weight_input_preprocessor import WeightInputPreprocessor
+
+
+def test_collect_weights_creates_rounded_axes_and_skips_dependent_material():
+    formulation_config = [
+        {'min': 18.2, 'max': 40, 'increment': 10.5},
+        {'min': 0.1, 'max': 0.3, 'increment': 0.1},
+        {'min': 5, 'max': 4, 'increment': 1},
+        {'min': 67.6, 'max': 35, 'increment': None}
+    ]
+
+    weights = WeightInputPreprocessor.collect_weights(formulation_config)
+
+    assert [axis.tolist() for axis in weights] == [[18.2, 28.7, 39.2], [0.1, 0.2, 0.3], []]
+
+
+def test_collect_weights_raises_exception_before_creating_too_many_weights(monkeypatch):
+    def mock_create_weights(material_configuration, length):
+        raise AssertionError('Weights must not be created')
+
+    monkeypatch.setattr(WeightInputPreprocessor, '_create_weights', mock_create_weights)
+    formulation_config = [
+        {'min': 0, 'max': 1000000, 'increment': 0.01},
+        {'min': 0, 'max': 0, 'increment': None}
+    ]
+
+    with pytest.raises(SlamdRequestTooLargeException):
+        WeightInputPreprocessor.collect_weights(formulation_config)
+
+
+@pytest.mark.parametrize('min_value, max_value, increment', [
+    (0.1, 1.5, 0.333),
+    (0.15, 0.5, 0.125),
+    (0.105, 0.3, 0.05),
+    (18.2, 40, 10.5),
+    (0, 10, 0.01),
+])
+def test_collect_weights_matches_running_rounding(min_value, max_value, increment):
+    formulation_config = [
+        {'min': min_value, 'max': max_value, 'increment': increment},
+        {'min': 0, 'max': 0, 'increment': None}
+    ]
+
+    [weights] = WeightInputPreprocessor.collect_weights(formulation_config)
+
+    assert weights.tolist() == _create_weights_with_running_rounding(min_value, max_value, increment)
+
+
+def _create_weights_with_running_rounding(min_value, max_value, increment):
+    # The weights as they were created before the weight grid was computed numerically
+    values = []
+    current_value = float(min_value)
+    while current_value <= float(max_value):
+        values.append(round(current_value, 2))
+        current_value = round(current_value + float(increment), 2)
+    return values
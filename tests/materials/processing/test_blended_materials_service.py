@@ -80,6 +80,14 @@ def test_create_ratio_form_raises_exception_when_too_many_ratios_are_requested()
             BlendedMaterialsService.create_ratio_form(ratio_request)
 
 
+def test_create_ratio_form_raises_exception_for_many_base_materials_without_creating_the_full_product():
+    with app.test_request_context('/materials/blended/add_ratios'):
+        with pytest.raises(SlamdRequestTooLargeException):
+            ratio_request = [{'idx': i, 'min': 0, 'max': 100, 'increment': 1} for i in range(6)]
+
+            BlendedMaterialsService.create_ratio_form(ratio_request)
+
+
 def test_save_blended_materials_throws_exception_when_name_is_not_set():
     with app.test_request_context('/materials/blended'):
         form = MultiDict()
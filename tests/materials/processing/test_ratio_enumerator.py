@@ -0,0 +1,24 @@
+from itertools import product
+
+from slamd.materials.processing.ratio_enumerator import RatioEnumerator
+
+
+def test_enumerate_ratios_returns_ratios_of_product_summing_up_to_total_in_product_order():
+    all_values = [[0, 10, 20, 30], [5, 10, 15, 20, 25], [50, 60, 70, 80, 90]]
+
+    ratios = list(RatioEnumerator.enumerate_ratios(all_values, 100))
+
+    assert ratios == [ratio for ratio in product(*all_values) if sum(ratio) == 100]
+    assert len(ratios) == 8
+
+
+def test_enumerate_ratios_returns_nothing_for_empty_values():
+    assert list(RatioEnumerator.enumerate_ratios([], 100)) == []
+    assert list(RatioEnumerator.enumerate_ratios([[50], []], 100)) == []
+
+
+def test_count_ratios_stops_at_limit():
+    all_values = [list(range(101)) for _ in range(5)]
+
+    assert RatioEnumerator.count_ratios(all_values, 100, limit=101) == 101
+    assert RatioEnumerator.count_ratios(all_values[:2], 100) == 101